@@ -0,0 +1,310 @@
+"""
+Cache em dois níveis para endpoints de leitura pesada.
+
+L1 é um LRU com prazo (CACHE_L1_SIZE, CACHE_L1_SECONDS) no próprio processo;
+L2 é o cache configurado do Django (settings.CACHES) e, quando ele não
+responde (ex.: Redis fora do ar), um cache em memória local. As entradas são
+marcadas com tags, normalmente por usuário ('finance:<id>'). Invalidar uma tag
+descarta as entradas do L1 do processo e troca a versão da tag no L2: as
+chaves das entradas antigas deixam de ser usadas por todos os processos, cujo
+L1 expira em até CACHE_L1_SECONDS.
+
+A invalidação é feita pelos sinais dos modelos (invalidate_on) ou
+explicitamente (invalidate_user) nos caminhos que gravam em lote.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Valor ausente (None pode ser um valor guardado)
+MISSING = object()
+
+# Remove a chave só se ela ainda guarda o valor informado (Redis)
+COMPARE_AND_DELETE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def compare_and_delete(backend, key, value):
+    """
+    Remove a chave do backend se ela ainda guarda o valor. No Redis a
+    comparação e a remoção são um único script; nos demais backends, leitura
+    seguida de remoção.
+    """
+    from django.core.cache.backends.redis import RedisCache
+
+    if isinstance(backend, RedisCache):
+        key = backend.make_and_validate_key(key)
+        client = backend._cache.get_client(key, write=True)
+        return bool(client.eval(COMPARE_AND_DELETE, 1, key, backend._cache._serializer.dumps(value)))
+
+    if backend.get(key) != value:
+        return False
+    return backend.delete(key)
+
+
+class LRUCache:
+    """LRU com prazo por entrada e índice de tags, seguro entre threads."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, timeout, max_size):
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + timeout, value, tuple(tags))
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > max_size:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class TieredCache:
+    """
+    L1 no processo sobre o cache do Django (L2), com invalidação por tags.
+    Falhas do L2 são registradas e o cache em memória local o substitui por
+    CACHE_L2_RETRY_SECONDS antes de uma nova tentativa.
+    """
+
+    def __init__(self, alias='default', prefix='tiered'):
+        self.alias = alias
+        self.prefix = prefix
+        self.l1 = LRUCache()
+        self._fallback = LocMemCache(f'{prefix}-fallback', {})
+        self._l2_down_until = 0.0
+
+    def get(self, key, tags=()):
+        """Valor guardado para a chave ou MISSING."""
+        value = self.l1.get(key)
+        if value is not MISSING:
+            return value
+
+        value = self._l2('get', self._l2_key(key, tags), MISSING)
+        if value is not MISSING:
+            self.l1.set(key, value, tags, settings.CACHE_L1_SECONDS, settings.CACHE_L1_SIZE)
+        return value
+
+    def set(self, key, value, tags=(), timeout=None):
+        """Guarda o valor nos dois níveis."""
+        if timeout is None:
+            timeout = settings.CACHE_DEFAULT_SECONDS
+        self._l2('set', self._l2_key(key, tags), value, timeout)
+        self.l1.set(key, value, tags, min(timeout, settings.CACHE_L1_SECONDS), settings.CACHE_L1_SIZE)
+
+    def get_or_set(self, key, compute, tags=(), timeout=None):
+        """Valor guardado para a chave, calculado com compute() se ausente."""
+        value = self.get(key, tags)
+        if value is MISSING:
+            value = compute()
+            self.set(key, value, tags, timeout)
+        return value
+
+    def add(self, key, value, timeout):
+        """
+        Grava o valor apenas no L2 (ou no cache local de contingência) se a
+        chave ainda não existir, como uma trava. Retorna se gravou.
+        """
+        return self._l2('add', self._raw_key(key), value, timeout)
+
+    def delete(self, key):
+        """Remove uma chave gravada com add()."""
+        self._l2('delete', self._raw_key(key))
+
+    def delete_if(self, key, value):
+        """
+        Remove uma chave gravada com add() apenas se ela ainda guarda o valor
+        (ex.: o token de quem obteve a trava). Retorna se removeu.
+        """
+        raw_key = self._raw_key(key)
+        return self._l2_call(lambda backend: compare_and_delete(backend, raw_key, value))
+
+    def invalidate(self, tags):
+        """Descarta as entradas marcadas com as tags informadas."""
+        tags = list(tags)
+        if not tags:
+            return
+        self.l1.invalidate(tags)
+        # Versão nova (e não incremento): sobrevive à perda da chave de versão
+        version = time.time_ns()
+        self._l2('set_many', {self._tag_key(tag): version for tag in tags}, None)
+
+    def clear(self):
+        """
+        Esvazia o L1 e o cache local de contingência. O L2 compartilhado não é
+        apagado: entradas antigas deixam de ser lidas pela versão das tags.
+        """
+        self.l1.clear()
+        self._fallback.clear()
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}:tag:{tag}'
+
+    def _raw_key(self, key):
+        return f'{self.prefix}:raw:{hashlib.sha1(key.encode()).hexdigest()}'
+
+    def _l2_key(self, key, tags):
+        """Chave do L2: a chave lógica com as versões atuais das tags."""
+        versions = []
+        if tags:
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            stored = self._l2('get_many', tag_keys)
+            for tag_key in tag_keys:
+                if tag_key not in stored:
+                    # add() não sobrescreve a versão gravada por outro processo
+                    self._l2('add', tag_key, time.time_ns(), None)
+                    stored[tag_key] = self._l2('get', tag_key, 0)
+            versions = [str(stored[tag_key]) for tag_key in tag_keys]
+        digest = hashlib.sha1(':'.join([key, *versions]).encode()).hexdigest()
+        return f'{self.prefix}:{digest}'
+
+    def _l2(self, method, *args):
+        """Executa a operação no L2, usando o cache local se ele falhar."""
+        return self._l2_call(lambda backend: getattr(backend, method)(*args))
+
+    def _l2_call(self, operation):
+        """Executa operation(backend) no L2, usando o cache local se ele falhar."""
+        backend = self._fallback
+        if time.monotonic() >= self._l2_down_until:
+            backend = caches[self.alias]
+        try:
+            return operation(backend)
+        except Exception:
+            if backend is self._fallback:
+                raise
+            logger.warning('Cache L2 indisponível; usando cache em memória local', exc_info=True)
+            self._l2_down_until = time.monotonic() + settings.CACHE_L2_RETRY_SECONDS
+            return operation(self._fallback)
+
+
+tiered_cache = TieredCache()
+
+
+def user_tag(scope, user_id):
+    """Tag dos dados de um usuário em um escopo (ex.: 'finance', 'sales')."""
+    return f'{scope}:{user_id}'
+
+
+def invalidate_user(scope, user_id):
+    """
+    Invalida os dados em cache do usuário no escopo. Dentro de uma transação
+    invalida de novo no commit, para descartar o que foi recalculado com os
+    dados anteriores enquanto ela estava aberta.
+    """
+    tags = [user_tag(scope, user_id)]
+    tiered_cache.invalidate(tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: tiered_cache.invalidate(tags))
+
+
+def invalidate_on(model, scope, user_id, signals=(post_save, post_delete)):
+    """
+    Invalida o escopo do usuário user_id(instance) quando uma instância do
+    modelo ('app_label.Model') é gravada ou excluída. Instâncias sem usuário
+    (user_id None) são ignoradas.
+    """
+    def receiver(sender, instance, **kwargs):
+        owner_id = user_id(instance)
+        if owner_id is not None:
+            invalidate_user(scope, owner_id)
+
+    for signal in signals:
+        signal.connect(
+            receiver,
+            sender=model,
+            weak=False,
+            dispatch_uid=f'invalidate_{scope}_{model}_{signal is post_save}'
+        )
+
+
+class _UncachedResponse(Exception):
+    """Resposta diferente de 200: devolvida ao chamador sem ir para o cache."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def cached_action(*scopes, timeout=None):
+    """
+    Guarda em cache as respostas 200 de uma action de viewset, por usuário e
+    parâmetros da query string, marcadas com as tags do usuário nos escopos
+    informados. Requisições simultâneas sem cache calculam a resposta uma
+    única vez (apps.core.singleflight).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            from .singleflight import single_flight
+
+            user_id = request.user.pk
+            tags = [user_tag(scope, user_id) for scope in scopes]
+            params = '&'.join(
+                f'{name}={value}' for name, value in sorted(request.query_params.items())
+            )
+            key = f'{type(self).__module__}.{type(self).__name__}.{method.__name__}:{user_id}:{params}'
+
+            def compute():
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    raise _UncachedResponse(response)
+                return response.data
+
+            try:
+                return Response(single_flight.run(key, compute, tags, timeout))
+            except _UncachedResponse as uncached:
+                return uncached.response
+        return wrapper
+    return decorator
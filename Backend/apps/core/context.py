@@ -0,0 +1,44 @@
+"""
+Contexto do usuário carregado uma vez por requisição.
+
+Saldo, sessão de jogo e perfil são lidos pela view, pelos serializers e por
+métodos de modelo na mesma requisição. O usuário autenticado é carregado com
+essas relações em uma única consulta (select_related) e fica em request.user;
+quem acessa request.user.balance, .game_session ou .profile recebe as mesmas
+instâncias, sem novas consultas.
+"""
+
+from django.contrib.auth import get_user_model
+
+# Relações um-para-um do usuário carregadas junto com ele
+USER_CONTEXT_RELATIONS = ('balance', 'game_session', 'profile')
+
+
+def user_context_queryset():
+    """Usuários com as relações do contexto da requisição."""
+    return get_user_model().objects.select_related(*USER_CONTEXT_RELATIONS)
+
+
+def has_user_context(user):
+    """Indica se o usuário já está com as relações do contexto carregadas."""
+    return all(
+        user._meta.get_field(relation).is_cached(user)
+        for relation in USER_CONTEXT_RELATIONS
+    )
+
+
+def load_user_context(request):
+    """
+    Usuário da requisição com saldo, sessão de jogo e perfil carregados.
+
+    Com a autenticação JWT o usuário já chega assim; nos demais casos
+    (sessão do Django, force_authenticate) ele é recarregado uma vez e
+    substitui request.user.
+    """
+    user = request.user
+    if not user.is_authenticated or has_user_context(user):
+        return user
+
+    user = user_context_queryset().get(pk=user.pk)
+    request.user = user
+    return user
@@ -4,7 +4,11 @@ Debug personalizado para JWT authentication.
 
 import logging
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .context import user_context_queryset
 
 logger = logging.getLogger(__name__)
 
@@ -43,3 +47,28 @@ class DebugJWTAuthentication(JWTAuthentication):
         except Exception as e:
             logger.error(f"JWT Authentication failed - Unexpected error: {str(e)}")
             return None
+
+    def get_user(self, validated_token):
+        """
+        Carrega o usuário do token já com o contexto da requisição (saldo,
+        sessão de jogo e perfil) na mesma consulta.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token sem identificação de usuário')
+
+        try:
+            user = user_context_queryset().get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('Usuário não encontrado', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('Usuário inativo', code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed('A senha do usuário foi alterada', code='password_changed')
+
+        return user
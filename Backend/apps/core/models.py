@@ -4,6 +4,7 @@ Modelos base para o projeto.
 
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+import copy
 import uuid
 
 
@@ -34,9 +35,124 @@ class BaseModel(TimeStampedModel, UUIDModel):
     """
     is_active = models.BooleanField(default=True, verbose_name='Ativo')
 
+    # Com True, save() sem campos alterados não grava nada (nem dispara sinais).
+    # Também pode ser pedido por chamada: save(skip_unchanged=True)
+    skip_unchanged_save = False
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields(field_names)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is not None:
+            fields = [self._meta.get_field(name).attname for name in fields]
+        self._snapshot_fields(fields)
+
+    def _snapshot_fields(self, attnames=None):
+        """Guarda os valores atuais dos campos para detectar alterações."""
+        if attnames is None:
+            attnames = [field.attname for field in self._meta.concrete_fields]
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        for attname in attnames:
+            if attname in self.__dict__:
+                value = self.__dict__[attname]
+                # Só valores mutáveis precisam de cópia
+                loaded[attname] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def get_dirty_fields(self):
+        """
+        Retorna os nomes dos campos alterados desde o carregamento ou o último
+        save(), ou None para instâncias que ainda não foram gravadas.
+        """
+        loaded = self.__dict__.get('_loaded_values')
+        if loaded is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            attname = field.attname
+            # Campos adiados (only/defer) que não foram lidos não mudaram
+            if attname not in self.__dict__:
+                continue
+            if attname not in loaded or loaded[attname] != self.__dict__[attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def save(self, *args, **kwargs):
+        """
+        Salva apenas os campos alterados quando update_fields não é informado.
+        Instâncias novas, mudança de chave primária e force_insert/force_update
+        mantêm o comportamento padrão do Django.
+        """
+        skip_unchanged = kwargs.pop('skip_unchanged', self.skip_unchanged_save)
+        update_fields = kwargs.get('update_fields')
+
+        if (
+            update_fields is None
+            and not args
+            and not self._state.adding
+            and not kwargs.get('force_insert')
+            and not kwargs.get('force_update')
+        ):
+            dirty = self.get_dirty_fields()
+            if dirty is not None and self._meta.pk.name not in dirty:
+                if not dirty and skip_unchanged:
+                    return
+                auto_now = [
+                    field.name for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False) and field.name not in dirty
+                ]
+                kwargs['update_fields'] = dirty + auto_now
+
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = [self._meta.get_field(name).attname for name in update_fields]
+        self._snapshot_fields(update_fields)
+
+    def apply_delta(self, field_name, delta, minimum=None, maximum=None):
+        """
+        Soma delta a um campo numérico com um único UPDATE condicional
+        (campo = campo + delta WHERE minimum <= campo + delta <= maximum), sem
+        ler e regravar a linha. minimum/maximum aceitam valores ou expressões
+        como F('max_stock').
+
+        Retorna o novo valor gravado, ou None se a condição não foi satisfeita
+        (nenhuma linha afetada). O valor em memória e os campos auto_now
+        passam a refletir o banco.
+        """
+        from django.db import transaction
+
+        field = self._meta.get_field(field_name)
+        conditions = {}
+        if minimum is not None:
+            conditions[f'{field_name}__gte'] = minimum - delta
+        if maximum is not None:
+            conditions[f'{field_name}__lte'] = maximum - delta
+
+        auto_now = [
+            other for other in self._meta.concrete_fields
+            if getattr(other, 'auto_now', False)
+        ]
+        changes = {other.name: other.pre_save(self, False) for other in auto_now}
+        changes[field_name] = models.F(field_name) + delta
+
+        manager = type(self)._base_manager
+        with transaction.atomic():
+            if not manager.filter(pk=self.pk, **conditions).update(**changes):
+                return None
+            value = manager.filter(pk=self.pk).values_list(field_name, flat=True).get()
+
+        setattr(self, field.attname, value)
+        self._snapshot_fields([field.attname] + [other.attname for other in auto_now])
+        return value
+
     def soft_delete(self):
         """Executa um soft delete marcando is_active como False"""
         self.is_active = False
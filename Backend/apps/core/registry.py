@@ -0,0 +1,108 @@
+"""
+Registro em memória de dados de referência do sistema.
+
+Categorias do sistema, categorias de produtos e fornecedores são poucas linhas,
+lidas a cada venda, compra e folha de pagamento e alteradas raramente. Cada
+registro guarda essas linhas no processo, indexadas por uma chave (o nome, por
+padrão), e é esvaziado pelos sinais post_save/post_delete do modelo. Como os
+sinais só chegam ao processo que fez a alteração, REFERENCE_CACHE_SECONDS
+limita o tempo em que os demais processos podem ver dados antigos.
+
+As instâncias devolvidas são compartilhadas: servem para chaves estrangeiras e
+leitura, não devem ser alteradas.
+"""
+
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+# Registros criados no processo, para limpar todos de uma vez (ex.: nos testes)
+_registries = []
+
+
+class ReferenceRegistry:
+    """
+    Linhas de um modelo de referência em memória, indexadas por `key`.
+
+    `filters` restringe as linhas carregadas; `defaults` mapeia chaves que o
+    sistema precisa ter aos valores usados para criá-las quando ainda não
+    existem no banco.
+    """
+
+    def __init__(self, model, key='name', filters=None, defaults=None):
+        self.model = model
+        self.key = key
+        self.filters = filters or {}
+        self.defaults = defaults or {}
+        self._entries = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        for signal in (post_save, post_delete):
+            signal.connect(
+                self._invalidate,
+                sender=model,
+                weak=False,
+                dispatch_uid=f'reference_registry_{id(self)}_{signal is post_save}'
+            )
+        _registries.append(self)
+
+    def get(self, key):
+        """
+        Linha com a chave informada. Chaves com valores padrão são criadas
+        quando ainda não existem; as demais retornam None se não existirem.
+        """
+        entry = self._load().get(key)
+        if entry is None and key in self.defaults:
+            model = apps.get_model(self.model)
+            entry, _ = model.objects.get_or_create(
+                **self.filters, **{self.key: key}, defaults=self.defaults[key]
+            )
+        return entry
+
+    def all(self):
+        """Todas as linhas do registro."""
+        return list(self._load().values())
+
+    def clear(self):
+        """Descarta as linhas guardadas; a próxima leitura consulta o banco."""
+        with self._lock:
+            self._generation += 1
+            self._entries = None
+
+    def _invalidate(self, sender, **kwargs):
+        self.clear()
+
+    def _load(self):
+        entries = self._entries
+        if entries is not None and time.monotonic() - self._loaded_at < settings.REFERENCE_CACHE_SECONDS:
+            return entries
+
+        generation = self._generation
+        model = apps.get_model(self.model)
+        entries = {
+            getattr(instance, self.key): instance
+            for instance in model.objects.filter(**self.filters)
+        }
+        # Só guarda o que foi confirmado: linhas lidas dentro de uma transação
+        # desfeita depois não podem ficar no registro
+        transaction.on_commit(lambda: self._store(entries, generation))
+        return entries
+
+    def _store(self, entries, generation):
+        with self._lock:
+            # Uma alteração entre a leitura e o commit torna a leitura antiga
+            if generation == self._generation:
+                self._entries = entries
+                self._loaded_at = time.monotonic()
+
+
+def clear_registries():
+    """Esvazia todos os registros de dados de referência do processo."""
+    for registry in _registries:
+        registry.clear()
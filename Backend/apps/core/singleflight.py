@@ -0,0 +1,135 @@
+"""
+Coalescência de cálculos caros (single-flight).
+
+Quando vários chamadores pedem o mesmo resultado ao mesmo tempo (ex.: os
+relatórios de vendas na virada do dia do jogo), só quem obtém a trava da
+chave calcula; os demais aguardam o resultado compartilhado. Trava e
+resultado ficam no cache em dois níveis (apps.core.caching): no cache
+configurado do Django e, quando ele não responde, no cache em memória local,
+com a coalescência valendo apenas dentro do processo.
+
+Contadores por processo (single_flight.stats()): hits (resultado já em
+cache), misses (calculado por quem obteve a trava), coalesced (recebido do
+cálculo de outro chamador) e timeouts (a espera terminou e o chamador
+calculou por conta própria).
+"""
+
+import logging
+import secrets
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+
+from .caching import MISSING, tiered_cache
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre as consultas de quem aguarda o resultado
+POLL_SECONDS = 0.05
+
+EVENTS = ('hits', 'misses', 'coalesced', 'timeouts')
+
+
+class SingleFlight:
+    """Executa cada cálculo uma vez por chave entre chamadores simultâneos."""
+
+    def __init__(self, cache=tiered_cache):
+        self.cache = cache
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    def run(self, key, compute, tags=(), timeout=None, lock_seconds=None, wait_seconds=None):
+        """
+        Resultado da chave: o guardado no cache ou o de compute(), calculado
+        por um único chamador e guardado por timeout segundos (padrão
+        CACHE_DEFAULT_SECONDS). Quem não obtém a trava aguarda até
+        wait_seconds (SINGLE_FLIGHT_WAIT_SECONDS); a trava expira após
+        lock_seconds (SINGLE_FLIGHT_LOCK_SECONDS), caso o processo que calcula
+        termine sem liberá-la.
+        """
+        if lock_seconds is None:
+            lock_seconds = settings.SINGLE_FLIGHT_LOCK_SECONDS
+        if wait_seconds is None:
+            wait_seconds = settings.SINGLE_FLIGHT_WAIT_SECONDS
+
+        value = self.cache.get(key, tags)
+        if value is not MISSING:
+            self._count('hits', key)
+            return value
+
+        lock_key = f'singleflight:{key}'
+        deadline = time.monotonic() + wait_seconds
+        waited = False
+        # Valor próprio da trava: se ela expirar durante o cálculo e outro
+        # chamador a obtiver, o finally não apaga a trava alheia
+        token = secrets.token_hex(16)
+        while True:
+            if self.cache.add(lock_key, token, lock_seconds):
+                try:
+                    # O resultado pode ter sido gravado entre a leitura e a trava
+                    value = self.cache.get(key, tags)
+                    if value is not MISSING:
+                        self._count('coalesced' if waited else 'hits', key)
+                        return value
+                    value = compute()
+                    self.cache.set(key, value, tags, timeout)
+                    self._count('misses', key)
+                    return value
+                finally:
+                    self.cache.delete_if(lock_key, token)
+
+            if time.monotonic() >= deadline:
+                break
+            waited = True
+            time.sleep(POLL_SECONDS)
+            value = self.cache.get(key, tags)
+            if value is not MISSING:
+                self._count('coalesced', key)
+                return value
+
+        self._count('timeouts', key)
+        value = compute()
+        self.cache.set(key, value, tags, timeout)
+        return value
+
+    def stats(self):
+        """Contadores de hits, misses, coalesced e timeouts deste processo."""
+        with self._lock:
+            return {event: self._stats[event] for event in EVENTS}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _count(self, event, key):
+        with self._lock:
+            self._stats[event] += 1
+        logger.debug('single-flight %s: %s', event, key)
+
+
+single_flight = SingleFlight()
+
+
+def coalesced(key, tags=(), timeout=None, lock_seconds=None, wait_seconds=None):
+    """
+    Decorator que coalesce as chamadas simultâneas da função com a mesma
+    chave (key(*args, **kwargs)) e as mesmas tags (tags(*args, **kwargs),
+    se chamável). Serve para o handle() de comandos de management; as actions
+    de viewset usam cached_action, que já passa por single_flight.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            return single_flight.run(
+                key(*args, **kwargs),
+                lambda: function(*args, **kwargs),
+                tags(*args, **kwargs) if callable(tags) else tags,
+                timeout,
+                lock_seconds,
+                wait_seconds
+            )
+        return wrapper
+    return decorator
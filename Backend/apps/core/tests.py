@@ -4,9 +4,22 @@ Foca apenas nos managers customizados e funcionalidades específicas do core.
 """
 
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 
+from types import SimpleNamespace
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django.test import override_settings
+
+from .caching import COMPARE_AND_DELETE, MISSING, LRUCache, TieredCache
+from .singleflight import SingleFlight
+from .context import load_user_context
+from .jwt_debug import DebugJWTAuthentication
 from .models import ActiveManager, AllObjectsManager
+from apps.finance.registry import SALES, system_categories, system_category
 
 User = get_user_model()
 
@@ -136,3 +149,308 @@ class TestCoreManagerIntegration(TestCase):
         self.assertEqual(all_users.count(), 2)
         self.assertIn(active_user, all_users)
         self.assertIn(inactive_user, all_users)
+
+
+class TestBaseModelDirtyFields(TestCase):
+    """Testes para o rastreamento de campos alterados do BaseModel."""
+
+    def setUp(self):
+        """Configuração inicial."""
+        User.objects.create_user(
+            username='dirtyuser',
+            email='dirty@example.com',
+            password='testpass123',
+            first_name='Dirty',
+            last_name='User'
+        )
+        self.user = User.objects.get(username='dirtyuser')
+
+    def _update_statements(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+
+    def test_loaded_instance_is_clean(self):
+        """Testa que uma instância recém-carregada não tem alterações."""
+        self.assertEqual(self.user.get_dirty_fields(), [])
+
+    def test_new_instance_is_not_tracked(self):
+        """Testa que instâncias ainda não gravadas não são rastreadas."""
+        self.assertIsNone(User(username='novo').get_dirty_fields())
+
+    def test_save_writes_only_changed_fields(self):
+        """Testa que o save grava apenas os campos alterados e o updated_at."""
+        self.user.first_name = 'Changed'
+        self.assertEqual(self.user.get_dirty_fields(), ['first_name'])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+
+        updates = self._update_statements(queries.captured_queries)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"first_name"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"last_name"', updates[0])
+        self.assertEqual(self.user.get_dirty_fields(), [])
+        self.assertEqual(User.objects.get(pk=self.user.pk).first_name, 'Changed')
+
+    def test_save_does_not_overwrite_concurrent_changes(self):
+        """Testa que colunas não alteradas não sobrescrevem gravações de outros processos."""
+        User.objects.filter(pk=self.user.pk).update(last_name='Concurrent')
+
+        self.user.first_name = 'Changed'
+        self.user.save()
+
+        stored = User.objects.get(pk=self.user.pk)
+        self.assertEqual(stored.first_name, 'Changed')
+        self.assertEqual(stored.last_name, 'Concurrent')
+
+    def test_skip_unchanged(self):
+        """Testa que o save pode ser ignorado quando nada mudou."""
+        updated_at = self.user.updated_at
+
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save(skip_unchanged=True)
+
+        self.assertEqual(self._update_statements(queries.captured_queries), [])
+        self.assertEqual(self.user.updated_at, updated_at)
+
+    def test_refresh_from_db_resets_tracking(self):
+        """Testa que recarregar do banco descarta as alterações pendentes."""
+        self.user.first_name = 'Changed'
+        self.user.refresh_from_db()
+
+        self.assertEqual(self.user.get_dirty_fields(), [])
+
+
+class TestReferenceRegistry(TestCase):
+    """Testes para o registro de dados de referência."""
+
+    def test_rows_are_reused_after_commit(self):
+        """Testa que o registro só volta ao banco depois de uma alteração."""
+        with self.captureOnCommitCallbacks(execute=True):
+            category = system_category(SALES)
+        with self.captureOnCommitCallbacks(execute=True):
+            system_category(SALES)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(system_category(SALES).pk, category.pk)
+            self.assertIn(category, system_categories.all())
+
+        category.color = '#000000'
+        category.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(system_category(SALES).color, '#000000')
+
+    def test_system_category_is_created_once(self):
+        """Testa que a categoria do sistema é criada sem usuário e apenas uma vez."""
+        category = system_category(SALES)
+
+        self.assertIsNone(category.user)
+        self.assertEqual(category.category_type, 'INCOME')
+        self.assertEqual(system_category(SALES).pk, category.pk)
+        self.assertIsNone(system_categories.get('Inexistente'))
+
+    def test_uncommitted_rows_are_not_kept(self):
+        """Testa que linhas lidas em uma transação ainda aberta não ficam no registro."""
+        system_category(SALES)
+
+        with self.assertNumQueries(1):
+            system_category(SALES)
+
+
+class TestUserContext(TestCase):
+    """Testes para o contexto do usuário carregado por requisição."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='contextuser',
+            email='context@example.com',
+            password='testpass123',
+            first_name='Context',
+            last_name='User'
+        )
+
+    def test_context_is_loaded_once(self):
+        """Testa que saldo e sessão são carregados em uma consulta e reaproveitados."""
+        request = SimpleNamespace(user=User.objects.get(pk=self.user.pk))
+
+        with self.assertNumQueries(1):
+            user = load_user_context(request)
+        with self.assertNumQueries(0):
+            self.assertIs(load_user_context(request), user)
+            self.assertIs(request.user, user)
+            self.assertEqual(user.balance.user_id, self.user.pk)
+            self.assertEqual(user.game_session.user_id, self.user.pk)
+
+    def test_jwt_user_comes_with_context(self):
+        """Testa que a autenticação JWT já carrega o contexto com o usuário."""
+        token = AccessToken.for_user(self.user)
+
+        with self.assertNumQueries(1):
+            user = DebugJWTAuthentication().get_user(token)
+            self.assertIs(load_user_context(SimpleNamespace(user=user)), user)
+            user.balance
+            user.game_session
+
+
+class TestTieredCache(TestCase):
+    """Testes para o cache em dois níveis."""
+
+    def test_lru_evicts_oldest_and_expired(self):
+        """Testa a remoção por tamanho (menos usada) e por prazo no L1."""
+        lru = LRUCache()
+        lru.set('a', 1, ['t'], 60, 2)
+        lru.set('b', 2, [], 60, 2)
+        lru.get('a')
+        lru.set('c', 3, [], 60, 2)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), MISSING)
+
+        lru.set('d', 4, [], 0, 3)
+        self.assertIs(lru.get('d'), MISSING)
+
+        lru.invalidate(['t'])
+        self.assertIs(lru.get('a'), MISSING)
+
+    def test_tag_invalidation_reaches_other_processes(self):
+        """Testa que a versão da tag no L2 invalida o que outro processo guardou."""
+        first, second = TieredCache(), TieredCache()
+        first.set('report', {'total': 1}, ['finance:1'])
+
+        self.assertEqual(second.get('report', ['finance:1']), {'total': 1})
+
+        first.invalidate(['finance:1'])
+        self.assertIs(first.get('report', ['finance:1']), MISSING)
+        # O L1 do outro processo expira pelo prazo; o L2 já não tem a entrada
+        second.l1.clear()
+        self.assertIs(second.get('report', ['finance:1']), MISSING)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'unavailable': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://127.0.0.1:1/0',
+        },
+    })
+    def test_falls_back_to_local_memory_without_l2(self):
+        """Testa que o cache funciona sem o L2 configurado (ex.: sem Redis)."""
+        tiered = TieredCache(alias='unavailable')
+
+        with self.assertLogs('apps.core.caching', 'WARNING'):
+            tiered.set('report', 42, ['sales:1'])
+        tiered.l1.clear()
+
+        self.assertEqual(tiered.get('report', ['sales:1']), 42)
+        tiered.invalidate(['sales:1'])
+        self.assertIs(tiered.get('report', ['sales:1']), MISSING)
+
+
+class TestSingleFlight(TestCase):
+    """Testes para a coalescência de cálculos."""
+
+    def _run_concurrently(self, flight, callers=5):
+        import threading
+        import time
+
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'total': 1}
+
+        def load():
+            results.append(flight.run('report', compute, ['sales:1']))
+
+        threads = [threading.Thread(target=load) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return calls, results
+
+    def test_concurrent_callers_compute_once(self):
+        """Testa que chamadores simultâneos recebem o resultado de um único cálculo."""
+        flight = SingleFlight(TieredCache())
+
+        calls, results = self._run_concurrently(flight)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'total': 1}] * 5)
+        self.assertEqual(flight.run('report', lambda: None, ['sales:1']), {'total': 1})
+        self.assertEqual(flight.stats(), {'hits': 1, 'misses': 1, 'coalesced': 4, 'timeouts': 0})
+
+    def test_failed_computation_releases_lock(self):
+        """Testa que uma falha no cálculo libera a trava para o próximo chamador."""
+        flight = SingleFlight(TieredCache())
+
+        def fail():
+            raise ValueError('falhou')
+
+        with self.assertRaises(ValueError):
+            flight.run('report', fail)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(flight.run('report', lambda: 42, wait_seconds=0), 42)
+        self.assertEqual(flight.stats()['misses'], 1)
+
+    def test_expired_lock_of_another_caller_is_kept(self):
+        """Testa que quem perdeu a trava por prazo não apaga a trava de outro chamador."""
+        flight = SingleFlight(TieredCache())
+        lock_key = 'singleflight:report'
+
+        def compute():
+            # A trava expira durante o cálculo e outro chamador a obtém
+            flight.cache.delete(lock_key)
+            self.assertTrue(flight.cache.add(lock_key, 'outro', 30))
+            return 42
+
+        self.assertEqual(flight.run('report', compute), 42)
+
+        self.assertFalse(flight.cache.add(lock_key, 'terceiro', 30))
+        self.assertTrue(flight.cache.delete_if(lock_key, 'outro'))
+        self.assertTrue(flight.cache.add(lock_key, 'terceiro', 30))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'redis': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://127.0.0.1:1/0',
+        },
+    })
+    def test_redis_lock_is_released_with_compare_and_delete(self):
+        """Testa que no Redis a comparação e a remoção da trava são um único script."""
+        from unittest.mock import MagicMock, patch
+        from django.core.cache import caches
+
+        tiered = TieredCache(alias='redis')
+        backend = caches['redis']
+        client = MagicMock()
+        client.eval.return_value = 1
+
+        with patch.object(backend._cache, 'get_client', return_value=client):
+            self.assertTrue(tiered.delete_if('singleflight:report', 'token'))
+
+        script, keys, key, value = client.eval.call_args.args
+        self.assertEqual((script, keys), (COMPARE_AND_DELETE, 1))
+        self.assertEqual(key, backend.make_and_validate_key(tiered._raw_key('singleflight:report')))
+        self.assertEqual(value, backend._cache._serializer.dumps('token'))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'unavailable': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://127.0.0.1:1/0',
+        },
+    })
+    def test_coalesces_in_process_without_l2(self):
+        """Testa que sem o cache configurado a coalescência vale dentro do processo."""
+        flight = SingleFlight(TieredCache(alias='unavailable'))
+
+        with self.assertLogs('apps.core.caching', 'WARNING'):
+            calls, results = self._run_concurrently(flight)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'total': 1}] * 5)
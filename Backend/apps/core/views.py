@@ -12,6 +12,29 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.core.cache import cache
 
+from .context import load_user_context
+
+
+class UserContextMixin:
+    """
+    Saldo, sessão de jogo e perfil do usuário da requisição, carregados uma
+    vez (load_user_context) e compartilhados com serializers e modelos que
+    usam request.user. Relações inexistentes levantam o DoesNotExist do
+    modelo correspondente.
+    """
+
+    def get_user_context(self):
+        return load_user_context(self.request)
+
+    def get_user_balance(self):
+        return self.get_user_context().balance
+
+    def get_game_session(self):
+        return self.get_user_context().game_session
+
+    def get_profile(self):
+        return self.get_user_context().profile
+
 
 class BaseModelViewSet(viewsets.ModelViewSet):
     """
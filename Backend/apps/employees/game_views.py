@@ -9,11 +9,13 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Sum, Count
 from decimal import Decimal
 
+from apps.core.views import UserContextMixin
 from apps.employees.models import Employee, Payroll, PayrollHistory
+from apps.finance.models import UserBalance
 from apps.employees.serializers import EmployeeSummarySerializer
 
 
-class EmployeeGameIntegrationViewSet(viewsets.ViewSet):
+class EmployeeGameIntegrationViewSet(UserContextMixin, viewsets.ViewSet):
     """
     ViewSet para integração de funcionários com o jogo.
     """
@@ -74,9 +76,16 @@ class EmployeeGameIntegrationViewSet(viewsets.ViewSet):
             'employees': serializer.data,
             'next_payment_month': next_payment_month,
             'has_employees': active_employees > 0,
-            'can_afford_payroll': request.user.balance.current_balance >= total_monthly_payroll if hasattr(request.user, 'balance') else False
+            'can_afford_payroll': self._can_afford(total_monthly_payroll)
         })
 
+    def _can_afford(self, amount):
+        """Indica se o saldo do usuário cobre o valor informado."""
+        try:
+            return self.get_user_balance().current_balance >= amount
+        except UserBalance.DoesNotExist:
+            return False
+
     @action(detail=False, methods=['post'])
     def hire_employee(self, request):
         """Contrata um funcionário rapidamente."""
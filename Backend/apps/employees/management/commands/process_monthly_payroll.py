@@ -9,7 +9,8 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from apps.employees.models import Employee, Payroll, PayrollHistory, EmployeePosition
-from apps.finance.models import UserBalance, Transaction, Category
+from apps.finance.models import UserBalance, Transaction
+from apps.finance.registry import PAYROLL, system_category
 
 User = get_user_model()
 
@@ -176,13 +177,7 @@ class Command(BaseCommand):
                 user_balance.subtract_amount(total_amount)
 
                 # Criar transação financeira
-                payroll_category, _ = Category.objects.get_or_create(
-                    name='Folha de Pagamento',
-                    defaults={
-                        'description': 'Pagamento de salários dos funcionários',
-                        'category_type': 'EXPENSE'
-                    }
-                )
+                payroll_category = system_category(PAYROLL)
 
                 Transaction.objects.create(
                     user=user,
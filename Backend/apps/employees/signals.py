@@ -2,50 +2,41 @@
 Sinais para o app de funcionários.
 """
 
-from django.db.models.signals import post_save
+import logging
+
 from django.dispatch import receiver
 from django.db import transaction
-from datetime import date, datetime
 from decimal import Decimal
 
 from apps.employees.models import Employee, Payroll, PayrollHistory
-from apps.finance.models import UserBalance, Transaction, Category
-from apps.game.models import GameSession
+from apps.finance.models import UserBalance, Transaction
+from apps.finance.registry import PAYROLL, system_category
+from apps.core.caching import invalidate_on, invalidate_user
+from apps.game.signals import game_month_started
+
+logger = logging.getLogger(__name__)
+
+# Resumos de funcionários em cache
+invalidate_on('employees.Employee', 'employees', lambda employee: employee.user_id)
 
 
-@receiver(post_save, sender=GameSession)
-def process_monthly_payroll_on_time_update(sender, instance, created, **kwargs):
+@receiver(game_month_started)
+def process_monthly_payroll_on_month_start(sender, game_session, month, **kwargs):
     """
-    Processa pagamentos mensais quando o tempo do jogo avança.
+    Processa os pagamentos mensais quando um mês do jogo começa.
     """
-    if created:
-        return  # Não processar para novas sessões
+    user = game_session.user
     
-    # Verificar se o jogo está ativo
-    if instance.status != 'ACTIVE':
+    # Se já processou este mês (ou um posterior), não processar novamente
+    if PayrollHistory.objects.filter(user=user, payment_month__gte=month).exists():
         return
     
-    # Verificar se passou um mês no jogo
-    current_month = instance.current_game_date.replace(day=1)
-    
-    # Buscar último pagamento processado
-    last_payroll = PayrollHistory.objects.filter(
-        user=instance.user
-    ).order_by('-payment_month').first()
-    
-    if last_payroll:
-        last_payment_month = last_payroll.payment_month.replace(day=1)
-        
-        # Se já processou para este mês, não processar novamente
-        if last_payment_month >= current_month:
-            return
-    
-    # Processar pagamentos para o mês atual
+    # Processar pagamentos do mês
     try:
         with transaction.atomic():
             # Buscar funcionários ativos
             employees = Employee.objects.filter(
-                user=instance.user,
+                user=user,
                 employment_status='ACTIVE'
             )
             
@@ -53,7 +44,7 @@ def process_monthly_payroll_on_time_update(sender, instance, created, **kwargs):
                 return  # Não há funcionários para pagar
             
             # Verificar saldo disponível
-            user_balance = UserBalance.objects.get(user=instance.user)
+            user_balance = UserBalance.objects.get(user=user)
             total_payroll = sum(emp.salary for emp in employees)
             
             if user_balance.current_balance < total_payroll:
@@ -65,35 +56,27 @@ def process_monthly_payroll_on_time_update(sender, instance, created, **kwargs):
             for employee in employees:
                 payroll = Payroll.objects.create(
                     employee=employee,
-                    payment_month=current_month,
+                    payment_month=month,
                     base_salary=employee.salary,
                     overtime_hours=Decimal('0.00'),
                     overtime_value=Decimal('0.00'),
                     bonus=Decimal('0.00'),
                     deductions=Decimal('0.00'),
-                    notes=f'Pagamento automático do jogo - {current_month.strftime("%m/%Y")}'
+                    notes=f'Pagamento automático do jogo - {month.strftime("%m/%Y")}'
                 )
                 created_payrolls.append(payroll)
             
-            # Debitar do saldo
-            user_balance.subtract_amount(total_payroll)
-            
             # Criar transação financeira
-            payroll_category, _ = Category.objects.get_or_create(
-                name='Folha de Pagamento',
-                defaults={
-                    'description': 'Pagamento de salários dos funcionários',
-                    'category_type': 'EXPENSE'
-                }
-            )
+            payroll_category = system_category(PAYROLL)
             
+            # A transação debita o saldo ao ser criada
             Transaction.objects.create(
-                user=instance.user,
+                user=user,
                 category=payroll_category,
                 amount=total_payroll,
-                description=f'Folha de pagamento automática - {current_month.strftime("%m/%Y")}',
+                description=f'Folha de pagamento automática - {month.strftime("%m/%Y")}',
                 transaction_type='EXPENSE',
-                transaction_date=instance.current_game_date
+                transaction_date=month
             )
             
             # Marcar como pago
@@ -102,12 +85,14 @@ def process_monthly_payroll_on_time_update(sender, instance, created, **kwargs):
             
             # Criar histórico
             PayrollHistory.objects.create(
-                user=instance.user,
-                payment_month=current_month,
+                user=user,
+                payment_month=month,
                 total_employees=len(created_payrolls),
                 total_amount=total_payroll
             )
             
-    except Exception as e:
-        # Log do erro (em produção, usar logging adequado)
-        print(f"Erro ao processar pagamentos automáticos: {str(e)}")
+            # A folha gravada em lote não passa pelos sinais de Employee
+            invalidate_user('employees', user.pk)
+            
+    except Exception:
+        logger.exception('Erro ao processar pagamentos automáticos de %s', month.strftime('%m/%Y'))
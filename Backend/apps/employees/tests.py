@@ -10,6 +10,7 @@ from datetime import date
 
 from apps.employees.models import EmployeePosition, Employee, Payroll, PayrollHistory
 from apps.finance.models import UserBalance
+from apps.game.models import GameSession
 
 User = get_user_model()
 
@@ -222,4 +223,77 @@ class TestPayrollHistoryModel(TestCase):
     def test_history_str(self):
         """Testa representação string do histórico."""
         expected = 'Pagamentos 01/2025 - João Silva'
-        self.assertEqual(str(self.history), expected)
\ No newline at end of file
+        self.assertEqual(str(self.history), expected)
+
+class TestMonthlyPayrollEvent(TestCase):
+    """Testes para o pagamento automático no início de cada mês do jogo."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='João',
+            last_name='Silva'
+        )
+        self.position = EmployeePosition.objects.create(
+            name='Caixa',
+            base_salary=Decimal('1500.00'),
+            min_salary=Decimal('1200.00'),
+            max_salary=Decimal('2000.00'),
+            department='CAIXA'
+        )
+        Employee.objects.create(
+            user=self.user,
+            name='Maria Santos',
+            cpf='12345678901',
+            position=self.position,
+            salary=Decimal('1500.00')
+        )
+        self.game_session = GameSession.objects.get(user=self.user)
+        self.game_session.auto_sales_enabled = False
+        self.game_session.save()
+
+    def test_start_game_pays_first_month(self):
+        """Testa que o início do jogo paga o primeiro mês uma única vez."""
+        initial_balance = UserBalance.objects.get(user=self.user).current_balance
+
+        self.game_session.start_game()
+        self.game_session.start_game()
+
+        self.assertEqual(
+            list(PayrollHistory.objects.filter(user=self.user).values_list('payment_month', flat=True)),
+            [date(2025, 1, 1)]
+        )
+        balance = UserBalance.objects.get(user=self.user).current_balance
+        self.assertEqual(balance, initial_balance - Decimal('1500.00'))
+
+    def test_catch_up_pays_missed_months_in_order(self):
+        """Testa que os meses cruzados de uma vez são pagos em ordem."""
+        self.game_session.start_game()
+
+        # Sem limite de dias por avanço, para cruzar três meses de uma vez
+        with self.settings(GAME_TICK_MAX_DAYS=0):
+            self.game_session.fast_forward(70)
+
+        months = PayrollHistory.objects.filter(user=self.user).order_by('created_at')
+        self.assertEqual(
+            list(months.values_list('payment_month', flat=True)),
+            [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)]
+        )
+
+    def test_payroll_invalidates_cached_summary(self):
+        """Testa que a folha paga no início do mês invalida o resumo em cache."""
+        from unittest.mock import patch
+
+        with patch('apps.employees.signals.invalidate_user') as invalidate_user:
+            self.game_session.start_game()
+
+        invalidate_user.assert_called_once_with('employees', self.user.pk)
+
+    def test_saving_session_does_not_process_payroll(self):
+        """Testa que gravar a sessão sem mudar de mês não processa a folha."""
+        self.game_session.status = 'ACTIVE'
+        self.game_session.save()
+
+        self.assertFalse(PayrollHistory.objects.filter(user=self.user).exists())
@@ -13,6 +13,7 @@ from decimal import Decimal
 from datetime import date, datetime
 from collections import defaultdict
 
+from apps.core.caching import cached_action
 from apps.finance.models import UserBalance, Transaction, Category
 from .models import EmployeePosition, Employee, Payroll, PayrollHistory
 from .serializers import (
@@ -124,6 +125,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @cached_action('employees')
     def summary(self, request):
         """Retorna resumo dos funcionários."""
         employees = self.get_queryset()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserBalance, BalanceHistory, Category, Transaction
+from .models import UserBalance, BalanceHistory, Category, Transaction, MonthlyLedger
 
 
 @admin.register(UserBalance)
@@ -110,3 +110,11 @@ class TransactionAdmin(admin.ModelAdmin):
         return obj.amount_formatted
     amount_formatted.short_description = 'Valor'
     amount_formatted.admin_order_field = 'amount'
+
+
+@admin.register(MonthlyLedger)
+class MonthlyLedgerAdmin(admin.ModelAdmin):
+    """Configuração do admin para MonthlyLedger."""
+    list_display = ['user', 'year', 'month', 'category', 'transaction_type', 'total_amount', 'transaction_count']
+    list_filter = ['year', 'month', 'transaction_type']
+    search_fields = ['user__email', 'category__name']
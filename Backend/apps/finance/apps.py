@@ -5,3 +5,7 @@ class FinanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.finance'
     verbose_name = 'Finance'
+
+    def ready(self):
+        """Registra os sinais quando o app está pronto."""
+        import apps.finance.signals  # noqa F401
@@ -0,0 +1,69 @@
+"""
+Comando para recalcular ou conferir os totais mensais das transações.
+"""
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from apps.core.caching import invalidate_user
+from apps.core.singleflight import coalesced
+from apps.finance.models import MonthlyLedger
+
+User = get_user_model()
+
+# Execuções simultâneas do mesmo escopo aguardam a primeira por até 1 hora
+REBUILD_LOCK_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os totais mensais (MonthlyLedger) a partir das transações ou confere se estão corretos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            default=None,
+            help='E-mail do usuário a processar (padrão: todos os usuários)',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Apenas confere os totais gravados, sem alterá-los',
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options['user']:
+            users = User.objects.filter(email=options['user'])
+            if not users.exists():
+                self.stdout.write(self.style.ERROR(f"Usuário não encontrado: {options['user']}"))
+                return
+
+        if options['verify']:
+            mismatches = MonthlyLedger.mismatches(users)
+            for (user_id, year, month, category_id, transaction_type), stored, computed in mismatches:
+                self.stdout.write(
+                    f'  Usuário {user_id} - {month:02d}/{year} - categoria {category_id} ({transaction_type}): '
+                    f'gravado R$ {stored[0]} em {stored[1]} transações, '
+                    f'calculado R$ {computed[0]} em {computed[1]} transações'
+                )
+            if mismatches:
+                self.stdout.write(self.style.ERROR(f'{len(mismatches)} totais mensais divergentes'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Totais mensais conferidos: nenhuma divergência'))
+            return
+
+        rows = self.rebuild(options['user'], users)
+        self.stdout.write(self.style.SUCCESS(f'Totais mensais recalculados: {rows} linhas'))
+
+    @coalesced(
+        lambda self, email, users: f"rebuild_monthly_ledger:{email or '*'}",
+        timeout=1,
+        lock_seconds=REBUILD_LOCK_SECONDS,
+        wait_seconds=REBUILD_LOCK_SECONDS
+    )
+    def rebuild(self, email, users):
+        """Recalcula os totais dos usuários. Retorna o número de linhas gravadas."""
+        rows = MonthlyLedger.rebuild(users)
+
+        # Os relatórios financeiros em cache foram calculados com os totais anteriores
+        for user_id in (users if users is not None else User.objects.all()).values_list('pk', flat=True):
+            invalidate_user('finance', user_id)
+        return rows
@@ -0,0 +1,120 @@
+# Generated by Django 5.0.1 on 2026-10-16 15:20
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_ledger(apps, schema_editor):
+    """Soma as transações ativas existentes por usuário, mês, categoria e tipo."""
+    Transaction = apps.get_model("finance", "Transaction")
+    MonthlyLedger = apps.get_model("finance", "MonthlyLedger")
+
+    rows = (
+        Transaction.objects.filter(is_active=True)
+        .annotate(year=ExtractYear("transaction_date"), month=ExtractMonth("transaction_date"))
+        .values("user_id", "year", "month", "category_id", "transaction_type")
+        .annotate(total_amount=Sum("amount"), transaction_count=Count("pk"))
+        .order_by()
+    )
+    MonthlyLedger.objects.bulk_create(
+        [MonthlyLedger(**row) for row in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0002_category_transaction"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyLedger",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True, verbose_name="Ativo")),
+                ("year", models.IntegerField(verbose_name="Ano")),
+                ("month", models.IntegerField(verbose_name="Mês")),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[("INCOME", "Receita"), ("EXPENSE", "Despesa")],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=14,
+                        verbose_name="Total",
+                    ),
+                ),
+                (
+                    "transaction_count",
+                    models.IntegerField(default=0, verbose_name="Número de Transações"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_ledger",
+                        to="finance.category",
+                        verbose_name="Categoria",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_ledger",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Total Mensal",
+                "verbose_name_plural": "Totais Mensais",
+                "ordering": ["-year", "-month"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "year", "month"],
+                        name="finance_mon_user_id_cd7208_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyledger",
+            constraint=models.UniqueConstraint(
+                fields=("user", "year", "month", "category", "transaction_type"),
+                name="unique_monthly_ledger_entry",
+            ),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
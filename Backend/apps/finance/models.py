@@ -48,21 +48,51 @@ class UserBalance(BaseModel):
     def __str__(self):
         return f"Saldo de {self.user.full_name}: R$ {self.current_balance}"
 
+    @classmethod
+    def for_user(cls, user):
+        """
+        Saldo do usuário, reaproveitando o carregado junto com ele (contexto
+        da requisição) e criando-o se ainda não existir.
+        """
+        relation = user._meta.get_field('balance')
+        if relation.is_cached(user) and relation.get_cached_value(user) is not None:
+            return relation.get_cached_value(user)
+        balance, _ = cls.objects.get_or_create(
+            user=user,
+            defaults={'current_balance': Decimal('0.00')}
+        )
+        return balance
+
     def add_amount(self, amount):
-        """Adiciona um valor ao saldo atual."""
+        """Adiciona um valor ao saldo atual com um único UPDATE e retorna o novo saldo."""
         if amount < 0:
             raise ValueError("Use subtract_amount() para valores negativos")
-        self.current_balance += Decimal(str(amount))
-        self.save()
-        return self.current_balance
-
-    def subtract_amount(self, amount):
-        """Subtrai um valor do saldo atual."""
+        new_balance = self.apply_delta('current_balance', Decimal(str(amount)))
+        self._balance_changed()
+        return new_balance
+
+    def subtract_amount(self, amount, require_funds=False):
+        """
+        Subtrai um valor do saldo atual com um único UPDATE e retorna o novo
+        saldo. Com require_funds o saldo não pode ficar negativo: a verificação
+        faz parte do UPDATE e ValueError é levantado se nenhuma linha mudou.
+        """
         if amount < 0:
             raise ValueError("Use add_amount() para valores positivos")
-        self.current_balance -= Decimal(str(amount))
-        self.save()
-        return self.current_balance
+        new_balance = self.apply_delta(
+            'current_balance',
+            -Decimal(str(amount)),
+            minimum=Decimal('0.00') if require_funds else None
+        )
+        if new_balance is None:
+            raise ValueError("Saldo insuficiente")
+        self._balance_changed()
+        return new_balance
+
+    def _balance_changed(self):
+        from .signals import balance_changed
+
+        balance_changed.send(sender=UserBalance, user_balance=self)
 
     def set_balance(self, amount):
         """Define um novo valor para o saldo."""
@@ -329,7 +359,12 @@ class Transaction(BaseModel):
         return f"{sign}R$ {self.amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
 
     def save(self, *args, **kwargs):
-        """Override do save para atualizar o saldo automaticamente."""
+        """
+        Override do save para atualizar o saldo e os totais mensais
+        automaticamente.
+        """
+        from django.db import transaction as db_transaction
+
         is_new = self.pk is None
         old_transaction = None
         
@@ -337,50 +372,55 @@ class Transaction(BaseModel):
             try:
                 old_transaction = Transaction.objects.get(pk=self.pk)
             except Transaction.DoesNotExist:
-                # Se a transação não existe mais, trata como nova
+                # Se a transação não existe mais, trata como nova: sem isso o
+                # BaseModel gravaria só os campos alterados e o UPDATE falharia
                 is_new = True
+                self._state.adding = True
 
-        super().save(*args, **kwargs)
-
-        # Atualiza o saldo se necessário
-        if is_new and not self.balance_updated:
-            self.update_user_balance()
-        elif old_transaction and (
-            old_transaction.amount != self.amount or 
-            old_transaction.transaction_type != self.transaction_type
-        ):
-            # Se mudou valor ou tipo, reverte o valor antigo e aplica o novo
-            self.revert_balance_update(old_transaction)
-            self.update_user_balance()
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+
+            # Totais mensais: soma a nova transação ou troca a versão anterior pela atual
+            if old_transaction is None:
+                MonthlyLedger.record(self.user_id, [self])
+            else:
+                MonthlyLedger.record_change(old_transaction, self)
+
+            # Atualiza o saldo se necessário
+            if is_new and not self.balance_updated:
+                self.update_user_balance()
+            elif old_transaction and (
+                old_transaction.amount != self.amount or 
+                old_transaction.transaction_type != self.transaction_type
+            ):
+                # Se mudou valor ou tipo, reverte o valor antigo e aplica o novo
+                self.revert_balance_update(old_transaction)
+                self.update_user_balance()
 
     def update_user_balance(self):
         """Atualiza o saldo do usuário baseado nesta transação."""
         from django.db import transaction
         
         with transaction.atomic():
-            balance, created = UserBalance.objects.get_or_create(
-                user=self.user,
-                defaults={'current_balance': Decimal('0.00')}
-            )
-            
-            previous_balance = balance.current_balance
+            balance = UserBalance.for_user(self.user)
             
+            # UPDATE atômico; o saldo anterior é derivado do valor gravado
             if self.transaction_type == 'INCOME':
-                balance.current_balance += self.amount
+                new_balance = balance.add_amount(self.amount)
+                previous_balance = new_balance - self.amount
                 operation = 'ADD'
             else:  # EXPENSE
-                balance.current_balance -= self.amount
+                new_balance = balance.subtract_amount(self.amount)
+                previous_balance = new_balance + self.amount
                 operation = 'SUBTRACT'
             
-            balance.save()
-            
             # Registra no histórico
             BalanceHistory.objects.create(
                 user_balance=balance,
                 operation=operation,
                 amount=self.amount,
                 previous_balance=previous_balance,
-                new_balance=balance.current_balance,
+                new_balance=new_balance,
                 description=f"Transação: {self.description}"
             )
             
@@ -393,63 +433,114 @@ class Transaction(BaseModel):
         from django.db import transaction as db_transaction
         
         with db_transaction.atomic():
-            balance = UserBalance.objects.get(user=self.user)
-            previous_balance = balance.current_balance
+            balance = UserBalance.for_user(self.user)
             
             # Reverte o valor antigo
             if old_transaction.transaction_type == 'INCOME':
-                balance.current_balance -= old_transaction.amount
+                new_balance = balance.subtract_amount(old_transaction.amount)
+                previous_balance = new_balance + old_transaction.amount
                 operation = 'SUBTRACT'
             else:  # EXPENSE
-                balance.current_balance += old_transaction.amount
+                new_balance = balance.add_amount(old_transaction.amount)
+                previous_balance = new_balance - old_transaction.amount
                 operation = 'ADD'
             
-            balance.save()
-            
             # Registra no histórico
             BalanceHistory.objects.create(
                 user_balance=balance,
                 operation=operation,
                 amount=old_transaction.amount,
                 previous_balance=previous_balance,
-                new_balance=balance.current_balance,
+                new_balance=new_balance,
                 description=f"Reversão: {old_transaction.description}"
             )
 
     def delete(self, *args, **kwargs):
         """Override do delete para reverter o saldo."""
-        if self.balance_updated:
-            self.revert_balance_update(self)
-        super().delete(*args, **kwargs)
+        from apps.core.caching import invalidate_user
+
+        from django.db import transaction as db_transaction
+
+        with db_transaction.atomic():
+            if self.balance_updated:
+                self.revert_balance_update(self)
+            MonthlyLedger.record(self.user_id, [self], sign=-1)
+            super().delete(*args, **kwargs)
+        invalidate_user('finance', self.user_id)
+
+    @classmethod
+    def post_batch(cls, user, transactions):
+        """
+        Registra várias transações do mesmo usuário de uma só vez.
+
+        As transações são gravadas com bulk_create, o saldo recebe um único
+        UPDATE com F(), os totais mensais são atualizados e o histórico de
+        saldo é gravado em lote. Retorna o novo saldo do usuário.
+        """
+        from django.db import transaction as db_transaction
+        from apps.core.caching import invalidate_user
+
+        transactions = list(transactions)
+        if not transactions:
+            return None
+
+        deltas = []
+        for item in transactions:
+            item.user = user
+            item.balance_updated = True
+            deltas.append(item.amount if item.transaction_type == 'INCOME' else -item.amount)
+
+        with db_transaction.atomic():
+            balance, _ = UserBalance.objects.get_or_create(
+                user=user,
+                defaults={'current_balance': Decimal('0.00')}
+            )
+
+            cls.objects.bulk_create(transactions)
+            # O saldo anterior vem do valor gravado pelo UPDATE, não da leitura
+            # acima: outra transação pode ter alterado o saldo nesse intervalo
+            total_delta = sum(deltas, Decimal('0.00'))
+            new_balance = balance.apply_delta('current_balance', total_delta)
+
+            history = []
+            running_balance = new_balance - total_delta
+            for item, delta in zip(transactions, deltas):
+                history.append(BalanceHistory(
+                    user_balance=balance,
+                    operation='ADD' if delta >= 0 else 'SUBTRACT',
+                    amount=item.amount,
+                    previous_balance=running_balance,
+                    new_balance=running_balance + delta,
+                    description=f"Transação: {item.description}"
+                ))
+                running_balance += delta
+
+            BalanceHistory.objects.bulk_create(history)
+            MonthlyLedger.record(user.pk, transactions)
+            invalidate_user('finance', user.pk)
+
+        return new_balance
 
     @classmethod
     def get_monthly_summary(cls, user, year=None, month=None):
-        """Retorna resumo mensal de transações."""
+        """Retorna resumo mensal de transações (dos totais mensais, em uma consulta)."""
         if not year:
             year = timezone.now().year
         if not month:
             month = timezone.now().month
 
-        transactions = cls.objects.filter(
+        totals = MonthlyLedger.objects.filter(
             user=user,
-            is_active=True
-        ).filter(
-            transaction_date__year=year,
-            transaction_date__month=month
-        )
-
-        income_total = transactions.filter(
-            transaction_type='INCOME'
+            year=year,
+            month=month
         ).aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0.00')
-
-        expense_total = transactions.filter(
-            transaction_type='EXPENSE'
-        ).aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0.00')
+            income_total=models.Sum('total_amount', filter=models.Q(transaction_type='INCOME')),
+            expense_total=models.Sum('total_amount', filter=models.Q(transaction_type='EXPENSE')),
+            transaction_count=models.Sum('transaction_count')
+        )
 
+        income_total = totals['income_total'] or Decimal('0.00')
+        expense_total = totals['expense_total'] or Decimal('0.00')
         balance = income_total - expense_total
 
         return {
@@ -458,28 +549,242 @@ class Transaction(BaseModel):
             'income_total': income_total,
             'expense_total': expense_total,
             'balance': balance,
-            'transaction_count': transactions.count(),
+            'transaction_count': totals['transaction_count'] or 0,
         }
 
     @classmethod
     def get_category_summary(cls, user, year=None, month=None):
-        """Retorna resumo por categoria."""
+        """Retorna resumo por categoria (dos totais mensais, em uma consulta)."""
         if not year:
             year = timezone.now().year
         if not month:
             month = timezone.now().month
 
-        return cls.objects.filter(
+        return MonthlyLedger.objects.filter(
             user=user,
-            transaction_date__year=year,
-            transaction_date__month=month,
-            is_active=True
+            year=year,
+            month=month,
+            transaction_count__gt=0
         ).values(
             'category__name',
             'category__icon',
             'category__color',
             'transaction_type'
         ).annotate(
-            total=models.Sum('amount'),
-            count=models.Count('id')
+            total=models.Sum('total_amount'),
+            count=models.Sum('transaction_count')
         ).order_by('-total')
+
+class MonthlyLedger(BaseModel):
+    """
+    Totais mensais das transações ativas de cada usuário, por categoria e
+    tipo.
+
+    Os resumos mensal e por categoria e o histórico de lucros leem estas
+    linhas em vez de somar as transações. Elas são atualizadas na mesma
+    transação em que uma transação é criada, alterada ou excluída
+    (Transaction.save, delete e post_batch); o comando rebuild_monthly_ledger
+    recalcula ou confere os totais a partir das transações.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='monthly_ledger',
+        verbose_name='Usuário'
+    )
+    year = models.IntegerField(verbose_name='Ano')
+    month = models.IntegerField(verbose_name='Mês')
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='monthly_ledger',
+        verbose_name='Categoria'
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=Transaction.TRANSACTION_TYPES,
+        verbose_name='Tipo'
+    )
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Total'
+    )
+    transaction_count = models.IntegerField(
+        default=0,
+        verbose_name='Número de Transações'
+    )
+
+    # Managers
+    objects = models.Manager()
+    all_objects = AllObjectsManager()
+    active = ActiveManager()
+
+    class Meta:
+        verbose_name = 'Total Mensal'
+        verbose_name_plural = 'Totais Mensais'
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'category', 'transaction_type'],
+                name='unique_monthly_ledger_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.month:02d}/{self.year} - {self.transaction_type}: R$ {self.total_amount}"
+
+    @staticmethod
+    def _key(transaction):
+        transaction_date = Transaction._meta.get_field('transaction_date').to_python(transaction.transaction_date)
+        return (
+            transaction_date.year,
+            transaction_date.month,
+            transaction.category_id,
+            transaction.transaction_type
+        )
+
+    @classmethod
+    def record(cls, user_id, transactions, sign=1):
+        """
+        Soma (sign=1) ou subtrai (sign=-1) as transações ativas informadas
+        dos totais do mês de cada uma. As linhas que faltam são criadas e
+        todas são atualizadas com um único UPDATE baseado em F().
+        """
+        from functools import reduce
+        from operator import or_
+        from django.db import transaction as db_transaction
+
+        totals = {}
+        for item in transactions:
+            if not item.is_active:
+                continue
+            entry = totals.setdefault(cls._key(item), {'total_amount': Decimal('0.00'), 'transaction_count': 0})
+            entry['total_amount'] += sign * Decimal(str(item.amount))
+            entry['transaction_count'] += sign
+
+        if not totals:
+            return
+
+        keys = {
+            key: models.Q(year=key[0], month=key[1], category_id=key[2], transaction_type=key[3])
+            for key in totals
+        }
+
+        def increment(field, output_field):
+            return models.Case(
+                *[
+                    models.When(keys[key], then=models.F(field) + models.Value(entry[field]))
+                    for key, entry in totals.items()
+                ],
+                output_field=output_field
+            )
+
+        with db_transaction.atomic():
+            cls.objects.bulk_create(
+                [
+                    cls(user_id=user_id, year=year, month=month, category_id=category_id, transaction_type=transaction_type)
+                    for year, month, category_id, transaction_type in totals
+                ],
+                ignore_conflicts=True
+            )
+            cls.objects.filter(reduce(or_, keys.values()), user_id=user_id).update(
+                total_amount=increment('total_amount', models.DecimalField(max_digits=14, decimal_places=2)),
+                transaction_count=increment('transaction_count', models.IntegerField()),
+                updated_at=timezone.now()
+            )
+
+    @classmethod
+    def record_change(cls, old_transaction, new_transaction):
+        """Troca a contribuição da versão anterior da transação pela atual."""
+        if (
+            old_transaction.is_active == new_transaction.is_active
+            and old_transaction.amount == new_transaction.amount
+            and cls._key(old_transaction) == cls._key(new_transaction)
+        ):
+            return
+        cls.record(old_transaction.user_id, [old_transaction], sign=-1)
+        cls.record(new_transaction.user_id, [new_transaction])
+
+    @classmethod
+    def computed_totals(cls, users=None):
+        """
+        Totais calculados diretamente das transações ativas, no formato das
+        linhas (user_id, year, month, category_id, transaction_type,
+        total_amount, transaction_count).
+        """
+        from django.db.models.functions import ExtractMonth, ExtractYear
+
+        transactions = Transaction.objects.filter(is_active=True)
+        if users is not None:
+            transactions = transactions.filter(user__in=users)
+        return transactions.annotate(
+            year=ExtractYear('transaction_date'),
+            month=ExtractMonth('transaction_date')
+        ).values('user_id', 'year', 'month', 'category_id', 'transaction_type').annotate(
+            total_amount=models.Sum('amount'),
+            transaction_count=models.Count('pk')
+        ).order_by()
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """
+        Recalcula os totais a partir das transações. Sem argumentos,
+        considera todos os usuários. Retorna o número de linhas gravadas.
+        """
+        from django.db import transaction as db_transaction
+
+        ledger = cls.objects.all()
+        if users is not None:
+            ledger = ledger.filter(user__in=users)
+
+        with db_transaction.atomic():
+            ledger.delete()
+            created = cls.objects.bulk_create(
+                [cls(**row) for row in cls.computed_totals(users).iterator()],
+                batch_size=1000
+            )
+        return len(created)
+
+    @classmethod
+    def mismatches(cls, users=None):
+        """
+        Linhas cujos totais gravados diferem dos calculados a partir das
+        transações: lista de (chave, gravado, calculado), com gravado e
+        calculado no formato (total_amount, transaction_count).
+        """
+        fields = ('user_id', 'year', 'month', 'category_id', 'transaction_type')
+        empty = (Decimal('0.00'), 0)
+
+        ledger = cls.objects.exclude(transaction_count=0, total_amount=0)
+        if users is not None:
+            ledger = ledger.filter(user__in=users)
+        stored = {
+            tuple(row[field] for field in fields): (row['total_amount'], row['transaction_count'])
+            for row in ledger.values(*fields, 'total_amount', 'transaction_count')
+        }
+        computed = {
+            tuple(row[field] for field in fields): (row['total_amount'], row['transaction_count'])
+            for row in cls.computed_totals(users)
+        }
+        return [
+            (key, stored.get(key, empty), computed.get(key, empty))
+            for key in sorted(set(stored) | set(computed), key=str)
+            if stored.get(key, empty) != computed.get(key, empty)
+        ]
+
+    @classmethod
+    def monthly_totals(cls, user):
+        """
+        Receitas, despesas e número de transações de cada mês com
+        transações, do mais recente ao mais antigo, em uma consulta.
+        """
+        return cls.objects.filter(user=user).values('year', 'month').annotate(
+            income_total=models.Sum('total_amount', filter=models.Q(transaction_type='INCOME')),
+            expense_total=models.Sum('total_amount', filter=models.Q(transaction_type='EXPENSE')),
+            count=models.Sum('transaction_count')
+        ).filter(count__gt=0).order_by('-year', '-month')
@@ -0,0 +1,43 @@
+"""
+Categorias do sistema usadas nos lançamentos automáticos (vendas, compras e
+folha de pagamento).
+
+São categorias sem usuário, criadas na primeira vez em que são necessárias e
+lidas do registro de dados de referência nas demais.
+"""
+
+from apps.core.registry import ReferenceRegistry
+
+SALES = 'Vendas'
+PURCHASES = 'Compras'
+PAYROLL = 'Folha de Pagamento'
+
+SYSTEM_CATEGORIES = {
+    SALES: {
+        'description': 'Receitas de vendas de produtos',
+        'category_type': 'INCOME',
+        'color': '#10B981',
+        'icon': '💰'
+    },
+    PURCHASES: {
+        'description': 'Compras de produtos dos fornecedores',
+        'category_type': 'EXPENSE',
+        'color': '#EF4444',
+        'icon': '🛒'
+    },
+    PAYROLL: {
+        'description': 'Pagamento de salários dos funcionários',
+        'category_type': 'EXPENSE'
+    },
+}
+
+system_categories = ReferenceRegistry(
+    'finance.Category',
+    filters={'user__isnull': True},
+    defaults=SYSTEM_CATEGORIES
+)
+
+
+def system_category(name):
+    """Categoria do sistema com o nome informado (SALES, PURCHASES ou PAYROLL)."""
+    return system_categories.get(name)
@@ -151,9 +151,9 @@ class TransactionSerializer(serializers.ModelSerializer):
     def validate_category(self, value):
         """Valida se a categoria pertence ao usuário ou é padrão."""
         user = self.context['request'].user
-        user_categories = Category.get_user_categories(user)
         
-        if value not in user_categories:
+        # Mesmo critério de Category.get_user_categories, sem consultar o banco
+        if not (value.is_default or value.user_id == user.id):
             raise serializers.ValidationError("Categoria inválida.")
         
         return value
@@ -0,0 +1,26 @@
+"""
+Sinais do app de finanças.
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+
+from apps.core.caching import invalidate_on, invalidate_user
+
+# Saldo alterado por UPDATE direto no banco (sem post_save): argumento user_balance
+balance_changed = Signal()
+
+# Resumos financeiros em cache. Só post_save: com um receptor de post_delete a
+# exclusão em massa (reset do jogo) deixaria de ser um único DELETE; exclusões
+# e gravações em lote invalidam explicitamente (invalidate_user)
+invalidate_on('finance.Transaction', 'finance', lambda transaction: transaction.user_id, signals=(post_save,))
+
+# O dashboard financeiro mostra o saldo e o nome, ícone e cor das categorias
+invalidate_on('finance.UserBalance', 'finance', lambda user_balance: user_balance.user_id, signals=(post_save,))
+invalidate_on('finance.Category', 'finance', lambda category: category.user_id, signals=(post_save,))
+
+
+@receiver(balance_changed)
+def invalidate_balance_reports(sender, user_balance, **kwargs):
+    """Invalida os dados financeiros em cache quando o saldo muda por UPDATE direto."""
+    invalidate_user('finance', user_balance.user_id)
@@ -10,9 +10,14 @@ from django.http import HttpRequest
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.management import call_command
+from django.db.models import F
 from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-from apps.finance.models import UserBalance, BalanceHistory
+from apps.finance.models import UserBalance, BalanceHistory, Category, Transaction, MonthlyLedger
 from apps.finance.admin import UserBalanceAdmin, BalanceHistoryAdmin
 
 User = get_user_model()
@@ -66,6 +71,19 @@ class TestUserBalanceModel(TestCase):
         self.assertEqual(new_balance, initial_balance - amount_to_subtract)
         self.assertEqual(self.balance.current_balance, Decimal('70.00'))
     
+    def test_subtract_amount_requiring_funds(self):
+        """Testa que a subtração condicionada ao saldo usa o valor do banco."""
+        stale = UserBalance.objects.get(pk=self.balance.pk)
+        self.balance.subtract_amount(Decimal('80.00'))
+        
+        # A cópia antiga ainda vê R$ 100,00
+        with self.assertRaises(ValueError):
+            stale.subtract_amount(Decimal('30.00'), require_funds=True)
+        self.assertEqual(stale.subtract_amount(Decimal('20.00'), require_funds=True), Decimal('0.00'))
+        
+        self.balance.refresh_from_db()
+        self.assertEqual(self.balance.current_balance, Decimal('0.00'))
+    
     def test_set_balance(self):
         """Testa a definição de um novo saldo."""
         new_amount = Decimal('200.00')
@@ -137,6 +155,132 @@ class TestBalanceHistoryModel(TestCase):
         self.assertEqual(history.new_balance, Decimal('150.00'))
         self.assertEqual(history.description, 'Teste de adição')
 
+    def test_post_batch_uses_balance_written_by_update(self):
+        """Testa que o lote parte do saldo gravado, mesmo se outro lançamento mudou o saldo após a leitura."""
+        category = Category.objects.create(name='Receitas Teste', category_type='INCOME', user=self.user)
+        get_or_create = UserBalance.objects.get_or_create
+
+        def concurrent_change(**kwargs):
+            result = get_or_create(**kwargs)
+            UserBalance.objects.filter(user=self.user).update(current_balance=F('current_balance') + Decimal('50.00'))
+            return result
+
+        with mock.patch.object(UserBalance.objects, 'get_or_create', side_effect=concurrent_change):
+            new_balance = Transaction.post_batch(self.user, [
+                Transaction(
+                    category=category,
+                    amount=Decimal('20.00'),
+                    transaction_type='INCOME',
+                    description='Lote',
+                    transaction_date=date(2025, 1, 10)
+                )
+            ])
+
+        history = BalanceHistory.objects.get(description='Transação: Lote')
+        self.assertEqual(new_balance, Decimal('170.00'))
+        self.assertEqual((history.previous_balance, history.new_balance), (Decimal('150.00'), Decimal('170.00')))
+        self.balance.refresh_from_db()
+        self.assertEqual(self.balance.current_balance, Decimal('170.00'))
+
+
+class TestMonthlyLedgerModel(TestCase):
+    """Testes para os totais mensais das transações."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+        self.income = Category.objects.create(name='Receitas Teste', category_type='INCOME', user=self.user)
+        self.expense = Category.objects.create(name='Despesas Teste', category_type='EXPENSE', user=self.user)
+
+    def _transaction(self, amount, category, transaction_date, transaction_type='INCOME'):
+        return Transaction.objects.create(
+            user=self.user,
+            amount=Decimal(amount),
+            transaction_type=transaction_type,
+            category=category,
+            description='Teste',
+            transaction_date=transaction_date
+        )
+
+    def test_ledger_follows_transaction_changes(self):
+        """Testa que criar, alterar, desativar e excluir transações mantém os totais corretos."""
+        first = self._transaction('100.00', self.income, date(2025, 1, 5))
+        second = self._transaction('50.00', self.income, date(2025, 1, 20))
+        third = self._transaction('30.00', self.expense, date(2025, 2, 1), 'EXPENSE')
+        Transaction.post_batch(self.user, [
+            Transaction(
+                category=self.income,
+                amount=Decimal('20.00'),
+                transaction_type='INCOME',
+                description='Lote',
+                transaction_date=date(2025, 2, 10)
+            )
+        ])
+
+        first.amount = Decimal('120.00')
+        first.save()
+        second.transaction_date = date(2025, 2, 3)
+        second.save()
+        third.is_active = False
+        third.save()
+        Transaction.objects.get(description='Lote').delete()
+
+        self.assertEqual(MonthlyLedger.mismatches([self.user]), [])
+        january = Transaction.get_monthly_summary(self.user, 2025, 1)
+        february = Transaction.get_monthly_summary(self.user, 2025, 2)
+        self.assertEqual((january['income_total'], january['transaction_count']), (Decimal('120.00'), 1))
+        self.assertEqual((february['income_total'], february['expense_total']), (Decimal('50.00'), Decimal('0.00')))
+        self.assertEqual(
+            [(row['year'], row['month']) for row in MonthlyLedger.monthly_totals(self.user)],
+            [(2025, 2), (2025, 1)]
+        )
+
+    def test_saving_deleted_transaction_inserts_it_again(self):
+        """Testa que salvar uma transação excluída desde o carregamento a grava de novo como nova."""
+        loaded = Transaction.objects.get(pk=self._transaction('100.00', self.income, date(2025, 1, 5)).pk)
+        Transaction.objects.filter(pk=loaded.pk).delete()
+        MonthlyLedger.rebuild([self.user])
+
+        loaded.amount = Decimal('80.00')
+        loaded.save()
+
+        self.assertEqual(Transaction.objects.get(pk=loaded.pk).amount, Decimal('80.00'))
+        self.assertEqual(MonthlyLedger.mismatches([self.user]), [])
+
+    def test_summaries_use_single_query(self):
+        """Testa que os resumos mensal e por categoria saem de uma consulta cada."""
+        self._transaction('100.00', self.income, date(2025, 1, 5))
+        self._transaction('40.00', self.expense, date(2025, 1, 6), 'EXPENSE')
+
+        with self.assertNumQueries(1):
+            summary = Transaction.get_monthly_summary(self.user, 2025, 1)
+        with self.assertNumQueries(1):
+            categories = list(Transaction.get_category_summary(self.user, 2025, 1))
+
+        self.assertEqual(summary['balance'], Decimal('60.00'))
+        self.assertEqual(summary['transaction_count'], 2)
+        self.assertEqual(
+            [(row['category__name'], row['total'], row['count']) for row in categories],
+            [('Receitas Teste', Decimal('100.00'), 1), ('Despesas Teste', Decimal('40.00'), 1)]
+        )
+
+    def test_rebuild_command_verifies_and_repairs(self):
+        """Testa que o comando aponta divergências e recalcula os totais."""
+        self._transaction('100.00', self.income, date(2025, 1, 5))
+        MonthlyLedger.objects.filter(user=self.user).update(total_amount=Decimal('1.00'))
+
+        output = StringIO()
+        call_command('rebuild_monthly_ledger', verify=True, stdout=output)
+        self.assertIn('1 totais mensais divergentes', output.getvalue())
+
+        call_command('rebuild_monthly_ledger', stdout=StringIO())
+        self.assertEqual(MonthlyLedger.mismatches(), [])
+
 
 class TestUserBalanceAPI(APITestCase):
     """Testes para a API de saldo do usuário."""
@@ -379,6 +523,74 @@ class TestUserBalanceAPI(APITestCase):
         self.assertEqual(response.data['current_balance'], str(user_balance.current_balance))
 
 
+class TestFinanceDashboardAPI(APITestCase):
+    """Testes para o dashboard financeiro em cache."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('finance:transactions-dashboard-data')
+        self.category = Category.objects.create(name='Receitas Teste', category_type='INCOME', user=self.user)
+        self.game_session = self.user.game_session
+        self.game_session.status = 'ACTIVE'
+        self.game_session.save()
+
+    def _income(self, amount, transaction_date):
+        return Transaction.objects.create(
+            user=self.user,
+            amount=Decimal(amount),
+            transaction_type='INCOME',
+            category=self.category,
+            description='Venda',
+            transaction_date=transaction_date
+        )
+
+    def test_repeat_load_is_served_from_cache(self):
+        """Testa que a segunda leitura não consulta transações, totais nem saldo."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._income('100.00', self.game_session.current_game_date)
+        first = self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.data['monthly_summary']['income_total'], 100.0)
+        self.assertFalse([
+            query['sql'] for query in queries.captured_queries
+            if 'finance_transaction' in query['sql'] or 'finance_monthlyledger' in query['sql']
+        ])
+
+    def test_changes_refresh_cached_dashboard(self):
+        """Testa que transações, saldo e mudança de mês do jogo atualizam o dashboard."""
+        game_date = self.game_session.current_game_date
+        self.client.get(self.url)
+
+        self._income('100.00', game_date)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['monthly_summary']['income_total'], 100.0)
+
+        UserBalance.objects.get(user=self.user).add_amount(Decimal('5.00'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['current_balance'], str(UserBalance.objects.get(user=self.user).current_balance))
+
+        next_month = (game_date.replace(day=1) + timedelta(days=32)).replace(day=1)
+        self.game_session.current_game_date = next_month
+        self.game_session.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['monthly_summary']['month'], next_month.month)
+        self.assertEqual(response.data['monthly_summary']['income_total'], 0.0)
+
+
 class TestUserBalanceAdmin(TestCase):
     """Testes para o admin de UserBalance."""
     
@@ -12,7 +12,11 @@ from django.db import transaction, models
 from django.utils import timezone
 from decimal import Decimal
 
-from .models import UserBalance, BalanceHistory, Category, Transaction
+from apps.core.caching import cached_action, user_tag
+from apps.core.singleflight import single_flight
+from apps.core.views import UserContextMixin
+
+from .models import UserBalance, BalanceHistory, Category, Transaction, MonthlyLedger
 from .serializers import (
     UserBalanceSerializer,
     BalanceOperationSerializer,
@@ -28,7 +32,7 @@ from .serializers import (
 )
 
 
-class UserBalanceViewSet(viewsets.ModelViewSet):
+class UserBalanceViewSet(UserContextMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar o saldo do usuário.
     Fornece operações CRUD e ações específicas para manipulação do saldo.
@@ -42,11 +46,7 @@ class UserBalanceViewSet(viewsets.ModelViewSet):
     
     def get_object(self):
         """Retorna ou cria o saldo do usuário autenticado."""
-        balance, created = UserBalance.objects.get_or_create(
-            user=self.request.user,
-            defaults={'current_balance': Decimal('0.00')}
-        )
-        return balance
+        return UserBalance.for_user(self.get_user_context())
     
     def list(self, request, *args, **kwargs):
         """Lista o saldo do usuário (sempre retorna apenas um item)."""
@@ -70,8 +70,8 @@ class UserBalanceViewSet(viewsets.ModelViewSet):
             
             with transaction.atomic():
                 balance = self.get_object()
-                previous_balance = balance.current_balance
                 new_balance = balance.add_amount(amount)
+                previous_balance = new_balance - amount
                 
                 # Registra no histórico
                 BalanceHistory.objects.create(
@@ -102,16 +102,16 @@ class UserBalanceViewSet(viewsets.ModelViewSet):
             with transaction.atomic():
                 balance = self.get_object()
                 
-                # Verifica se há saldo suficiente
-                if balance.current_balance < amount:
+                # A verificação de saldo suficiente faz parte do UPDATE
+                try:
+                    new_balance = balance.subtract_amount(amount, require_funds=True)
+                except ValueError:
                     return Response({
                         'error': 'Saldo insuficiente para esta operação.',
                         'current_balance': str(balance.current_balance),
                         'requested_amount': str(amount)
                     }, status=status.HTTP_400_BAD_REQUEST)
-                
-                previous_balance = balance.current_balance
-                new_balance = balance.subtract_amount(amount)
+                previous_balance = new_balance + amount
                 
                 # Registra no histórico
                 BalanceHistory.objects.create(
@@ -233,7 +233,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(UserContextMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar transações financeiras.
     """
@@ -282,6 +282,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return TransactionSerializer
 
     @action(detail=False, methods=['get'])
+    @cached_action('finance')
     def monthly_summary(self, request):
         """Retorna resumo mensal de transações."""
         # Pega ano e mês dos parâmetros ou usa atual
@@ -300,6 +301,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @cached_action('finance')
     def category_summary(self, request):
         """Retorna resumo por categoria."""
         year = int(request.query_params.get('year', timezone.now().year))
@@ -334,19 +336,33 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def dashboard_data(self, request):
-        """Retorna dados completos para o dashboard."""
+        """
+        Retorna dados completos para o dashboard.
+
+        A resposta fica em cache por usuário e mês do resumo (da data do jogo
+        ou da data real): uma mudança de mês na sessão de jogo troca a chave, e
+        alterações de transações, saldo ou categorias do usuário invalidam a
+        tag 'finance'. Requisições simultâneas sem cache calculam a resposta
+        uma única vez (single_flight).
+        """
+        summary_year, summary_month = self._dashboard_month()
+        key = f'finance.dashboard_data:{request.user.pk}:{summary_year}-{summary_month:02d}'
+        data = single_flight.run(
+            key,
+            lambda: self._dashboard_payload(summary_year, summary_month),
+            [user_tag('finance', request.user.pk)]
+        )
+        return Response(data)
+
+    def _dashboard_month(self):
+        """Ano e mês do resumo do dashboard."""
         # Verificar se há uma sessão de jogo ativa para usar a data do jogo
-        from apps.game.models import GameSession
-        
         current_date = timezone.now()
         
         try:
-            game_session = GameSession.objects.filter(
-                user=request.user,
-                status='ACTIVE'
-            ).first()
+            game_session = self.get_game_session()
             
-            if game_session:
+            if game_session.status == 'ACTIVE':
                 # Usar data do jogo se houver sessão ativa
                 summary_date = game_session.current_game_date
                 summary_year = summary_date.year
@@ -360,42 +376,44 @@ class TransactionViewSet(viewsets.ModelViewSet):
             summary_year = current_date.year
             summary_month = current_date.month
         
+        return summary_year, summary_month
+
+    def _dashboard_payload(self, summary_year, summary_month):
+        """Dados do dashboard já serializados."""
+        current_date = timezone.now()
+        
         # Saldo atual
-        balance, _ = UserBalance.objects.get_or_create(
-            user=request.user,
-            defaults={'current_balance': Decimal('0.00')}
-        )
+        balance = UserBalance.for_user(self.get_user_context())
         
         # Resumo mensal atual
         monthly_summary = Transaction.get_monthly_summary(
-            request.user, 
+            self.request.user, 
             summary_year, 
             summary_month
         )
         
         # Resumo por categoria
         category_summary = Transaction.get_category_summary(
-            request.user, 
+            self.request.user, 
             summary_year, 
             summary_month
         )
         
         # Transações recentes
         recent_transactions = Transaction.objects.filter(
-            user=request.user,
+            user=self.request.user,
             is_active=True
         ).order_by('-transaction_date', '-created_at')[:5]
         
         # Estatísticas gerais
-        total_transactions = Transaction.objects.filter(
-            user=request.user,
-            is_active=True
-        ).count()
+        total_transactions = MonthlyLedger.objects.filter(
+            user=self.request.user
+        ).aggregate(total=models.Sum('transaction_count'))['total'] or 0
         
         # Média mensal (últimos 6 meses)
         six_months_ago = current_date - timezone.timedelta(days=180)
         monthly_averages = Transaction.objects.filter(
-            user=request.user,
+            user=self.request.user,
             transaction_date__gte=six_months_ago,
             is_active=True
         ).values('transaction_type').annotate(
@@ -423,5 +441,4 @@ class TransactionViewSet(viewsets.ModelViewSet):
         }
         
         # Serializa os dados
-        serializer = DashboardSerializer(dashboard_data)
-        return Response(serializer.data)
+        return DashboardSerializer(dashboard_data).data
@@ -4,7 +4,8 @@ Admin para o app de jogo.
 
 from django.contrib import admin
 from .models import (
-    GameSession, ProductCategory, Supplier, Product, ProductStockHistory
+    GameSession, ProductCategory, Supplier, Product, ProductStockHistory, SessionInventory,
+    DailySalesRollup
 )
 
 
@@ -44,6 +45,20 @@ class ProductAdmin(admin.ModelAdmin):
 
 @admin.register(ProductStockHistory)
 class ProductStockHistoryAdmin(admin.ModelAdmin):
-    list_display = ['product', 'operation', 'quantity', 'game_date', 'description']
+    list_display = ['product', 'game_session', 'operation', 'quantity', 'game_date', 'description']
     list_filter = ['operation', 'game_date']
     search_fields = ['product__name', 'description']
+
+
+@admin.register(SessionInventory)
+class SessionInventoryAdmin(admin.ModelAdmin):
+    list_display = ['game_session', 'product', 'current_stock', 'updated_at']
+    list_filter = ['product__category']
+    search_fields = ['product__name', 'game_session__user__email']
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ['game_session', 'product', 'game_date', 'quantity', 'revenue', 'sale_count']
+    list_filter = ['game_date']
+    search_fields = ['product__name', 'game_session__user__email']
@@ -0,0 +1,48 @@
+"""
+Comando para recalcular o agregado diário de vendas a partir do histórico.
+"""
+
+from django.core.management.base import BaseCommand
+from apps.core.caching import invalidate_user
+from apps.core.singleflight import coalesced
+from apps.game.models import DailySalesRollup, GameSession
+
+# Execuções simultâneas do mesmo escopo aguardam a primeira por até 1 hora
+REBUILD_LOCK_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o agregado diário de vendas (DailySalesRollup) a partir do histórico de estoque'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            default=None,
+            help='E-mail do usuário cuja sessão será recalculada (padrão: todas as sessões)',
+        )
+
+    def handle(self, *args, **options):
+        game_sessions = GameSession.objects.all()
+        if options['user']:
+            game_sessions = game_sessions.filter(user__email=options['user'])
+            if not game_sessions.exists():
+                self.stdout.write(self.style.ERROR(f"Sessão de jogo não encontrada para {options['user']}"))
+                return
+
+        rows = self.rebuild(options['user'], game_sessions)
+        self.stdout.write(self.style.SUCCESS(f'Agregado diário de vendas recalculado: {rows} linhas'))
+
+    @coalesced(
+        lambda self, email, game_sessions: f"rebuild_sales_rollup:{email or '*'}",
+        timeout=1,
+        lock_seconds=REBUILD_LOCK_SECONDS,
+        wait_seconds=REBUILD_LOCK_SECONDS
+    )
+    def rebuild(self, email, game_sessions):
+        """Recalcula o agregado das sessões. Retorna o número de linhas gravadas."""
+        rows = DailySalesRollup.rebuild(game_sessions if email else None)
+
+        # Os relatórios de vendas em cache foram calculados com o agregado anterior
+        for user_id in game_sessions.values_list('user_id', flat=True):
+            invalidate_user('sales', user_id)
+        return rows
@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from apps.game.models import GameSession, Product
+from apps.game.models import GameSession
 from apps.users.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -27,7 +27,7 @@ class Command(BaseCommand):
         self.stdout.write(f'Aceleração: {session.time_acceleration} minutos por dia')
         
         # Verifica produtos
-        products = Product.objects.filter(is_active=True, current_stock__gt=0)
+        products = session.inventory.filter(product__is_active=True, current_stock__gt=0)
         self.stdout.write(f'Produtos disponíveis: {products.count()}')
         
         # Simula passagem de tempo
@@ -46,7 +46,7 @@ class Command(BaseCommand):
             self.stdout.write(f'Data atual: {session.current_game_date}')
             
             # Verifica estoque
-            products = Product.objects.filter(is_active=True, current_stock__gt=0)
+            products = session.inventory.filter(product__is_active=True, current_stock__gt=0)
             new_stock = sum(p.current_stock for p in products)
             self.stdout.write(f'Estoque anterior: {old_stock}')
             self.stdout.write(f'Estoque atual: {new_stock}')
@@ -71,7 +71,7 @@ class Command(BaseCommand):
             self.stdout.write(f'Data atual: {session.current_game_date}')
             
             # Verifica estoque
-            products = Product.objects.filter(is_active=True, current_stock__gt=0)
+            products = session.inventory.filter(product__is_active=True, current_stock__gt=0)
             new_stock = sum(p.current_stock for p in products)
             self.stdout.write(f'Estoque anterior: {old_stock}')
             self.stdout.write(f'Estoque atual: {new_stock}')
@@ -0,0 +1,83 @@
+"""
+Comando que avança continuamente o tempo de todas as sessões ativas.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from apps.game.models.session_models import TICKER_SLOTS
+from apps.game.services.ticker import active_session_ids, tick_sessions
+
+
+class Command(BaseCommand):
+    help = 'Avança o tempo de todas as sessões de jogo ativas em intervalos fixos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Intervalo em segundos entre os ticks (padrão: 1)',
+        )
+        parser.add_argument(
+            '--shard',
+            type=int,
+            default=0,
+            help='Índice deste processo entre os shards (padrão: 0)',
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=1,
+            help='Número total de processos que dividem as sessões (padrão: 1)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Quantidade de sessões carregadas por lote (padrão: 100)',
+        )
+        parser.add_argument(
+            '--max-days',
+            type=int,
+            default=None,
+            help='Máximo de dias processados por sessão em cada tick (padrão: GAME_TICK_MAX_DAYS)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Executa um único tick e termina',
+        )
+
+    def handle(self, *args, **options):
+        shard, shards = options['shard'], options['shards']
+        if shards < 1 or not 0 <= shard < shards:
+            raise CommandError('Use 0 <= --shard < --shards')
+        if shards > TICKER_SLOTS:
+            raise CommandError(f'--shards não pode passar de {TICKER_SLOTS}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero')
+        if options['max_days'] is not None and options['max_days'] < 0:
+            raise CommandError('--max-days não pode ser negativo')
+
+        interval = options['interval']
+        if not options['once']:
+            self.stdout.write(f'Ticker iniciado (shard {shard + 1}/{shards}, intervalo {interval}s)')
+
+        while True:
+            started = time.monotonic()
+            close_old_connections()
+
+            stats = tick_sessions(
+                active_session_ids(shard, shards), options['batch_size'], max_days=options['max_days']
+            )
+            if options['once'] or stats['days'] or stats['errors']:
+                self.stdout.write(
+                    f"Sessões: {stats['sessions']}, dias avançados: {stats['days']}, erros: {stats['errors']}"
+                )
+
+            if options['once']:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
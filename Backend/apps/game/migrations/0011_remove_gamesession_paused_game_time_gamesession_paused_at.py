@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0010_remove_gamesession_paused_day_seconds_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="gamesession",
+            name="paused_game_time",
+        ),
+        migrations.AddField(
+            model_name="gamesession",
+            name="paused_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Pausado em"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-16 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0011_remove_gamesession_paused_game_time_gamesession_paused_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["updated_at"], name="game_produc_updated_4388da_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="realtimesale",
+            index=models.Index(
+                fields=["game_session", "created_at"],
+                name="game_realti_game_se_d1a719_idx",
+            ),
+        ),
+    ]
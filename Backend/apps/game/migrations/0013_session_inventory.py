@@ -0,0 +1,125 @@
+# Generated by Django 5.0.1 on 2026-10-16 12:10
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def seed_inventory(apps, schema_editor):
+    """Copia o estoque atual dos produtos para cada sessão existente."""
+    GameSession = apps.get_model("game", "GameSession")
+    Product = apps.get_model("game", "Product")
+    SessionInventory = apps.get_model("game", "SessionInventory")
+
+    products = list(Product.objects.values_list("pk", "current_stock"))
+    for session_id in GameSession.objects.values_list("pk", flat=True).iterator():
+        SessionInventory.objects.bulk_create(
+            [
+                SessionInventory(
+                    game_session_id=session_id,
+                    product_id=product_id,
+                    current_stock=current_stock,
+                )
+                for product_id, current_stock in products
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0012_sync_cursor_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="current_stock",
+            field=models.IntegerField(
+                default=0,
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="Estoque Inicial",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productstockhistory",
+            name="game_session",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="stock_history",
+                to="game.gamesession",
+                verbose_name="Sessão de Jogo",
+            ),
+        ),
+        migrations.CreateModel(
+            name="SessionInventory",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True, verbose_name="Ativo")),
+                (
+                    "current_stock",
+                    models.IntegerField(
+                        default=0,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="Estoque Atual",
+                    ),
+                ),
+                (
+                    "game_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inventory",
+                        to="game.gamesession",
+                        verbose_name="Sessão de Jogo",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inventories",
+                        to="game.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Estoque da Sessão",
+                "verbose_name_plural": "Estoques das Sessões",
+                "ordering": ["product__name"],
+                "indexes": [
+                    models.Index(
+                        fields=["game_session", "updated_at"],
+                        name="game_sessio_game_se_45882f_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="sessioninventory",
+            constraint=models.UniqueConstraint(
+                fields=("game_session", "product"),
+                name="unique_session_inventory_product",
+            ),
+        ),
+        migrations.RunPython(seed_inventory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.0.1 on 2026-10-16 14:05
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollup(apps, schema_editor):
+    """Soma o histórico de vendas existente por sessão, produto e dia."""
+    ProductStockHistory = apps.get_model("game", "ProductStockHistory")
+    DailySalesRollup = apps.get_model("game", "DailySalesRollup")
+
+    rows = (
+        ProductStockHistory.objects.filter(operation="SALE", game_session__isnull=False)
+        .values("game_session_id", "product_id", "game_date")
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_revenue=Sum("total_value"),
+            total_sales=Count("pk"),
+            total_unit_price=Sum("unit_price"),
+        )
+        .order_by()
+    )
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(
+                game_session_id=row["game_session_id"],
+                product_id=row["product_id"],
+                game_date=row["game_date"],
+                quantity=row["total_quantity"] or 0,
+                revenue=row["total_revenue"] or 0,
+                sale_count=row["total_sales"],
+                unit_price_total=row["total_unit_price"] or 0,
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0013_session_inventory"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True, verbose_name="Ativo")),
+                ("game_date", models.DateField(verbose_name="Data do Jogo")),
+                (
+                    "quantity",
+                    models.IntegerField(default=0, verbose_name="Quantidade Vendida"),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=14,
+                        verbose_name="Receita",
+                    ),
+                ),
+                (
+                    "sale_count",
+                    models.IntegerField(default=0, verbose_name="Número de Vendas"),
+                ),
+                (
+                    "unit_price_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=14,
+                        verbose_name="Soma dos Preços Unitários",
+                    ),
+                ),
+                (
+                    "game_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_rollup",
+                        to="game.gamesession",
+                        verbose_name="Sessão de Jogo",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_rollup",
+                        to="game.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Vendas do Dia",
+                "verbose_name_plural": "Vendas por Dia",
+                "ordering": ["-game_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["game_session", "game_date"],
+                        name="game_dailys_game_se_01947c_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailysalesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("game_session", "product", "game_date"),
+                name="unique_daily_sales_rollup",
+            ),
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:42
+
+import apps.game.models.session_models
+from django.conf import settings
+from django.db import migrations, models
+
+# Valor de TICKER_SLOTS quando a migração foi criada
+TICKER_SLOTS = 1024
+
+
+def spread_ticker_slots(apps, schema_editor):
+    """Distribui as sessões existentes pelas faixas do ticker a partir do id."""
+    GameSession = apps.get_model("game", "GameSession")
+
+    sessions = list(GameSession.objects.only("pk"))
+    for session in sessions:
+        session.ticker_slot = session.pk.int % TICKER_SLOTS
+    GameSession.objects.bulk_update(sessions, ["ticker_slot"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0014_daily_sales_rollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamesession",
+            name="ticker_slot",
+            field=models.PositiveSmallIntegerField(
+                default=apps.game.models.session_models.random_ticker_slot,
+                editable=False,
+                verbose_name="Faixa do Ticker",
+            ),
+        ),
+        migrations.RunPython(spread_ticker_slots, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="gamesession",
+            index=models.Index(
+                fields=["status", "ticker_slot"], name="game_gamese_status_6566bc_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0015_gamesession_ticker_slot"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="realtimesale",
+            name="game_realti_game_se_d1a719_idx",
+        ),
+        migrations.AddField(
+            model_name="gamesession",
+            name="sales_sequence",
+            field=models.BigIntegerField(
+                default=0, editable=False, verbose_name="Sequência de Vendas"
+            ),
+        ),
+        migrations.AddField(
+            model_name="realtimesale",
+            name="sequence",
+            field=models.BigIntegerField(default=0, verbose_name="Sequência"),
+        ),
+        migrations.AddIndex(
+            model_name="realtimesale",
+            index=models.Index(
+                fields=["game_session", "sequence"],
+                name="game_realti_game_se_7c3956_idx",
+            ),
+        ),
+    ]
@@ -5,6 +5,8 @@ Modelos para o app de jogo organizados em módulos.
 from .session_models import GameSession
 from .product_models import ProductCategory, Supplier, Product
 from .history_models import ProductStockHistory, RealtimeSale
+from .inventory_models import SessionInventory
+from .rollup_models import DailySalesRollup
 
 __all__ = [
     'GameSession',
@@ -12,7 +14,9 @@ __all__ = [
     'Supplier',
     'Product',
     'ProductStockHistory',
-    'RealtimeSale'
+    'RealtimeSale',
+    'SessionInventory',
+    'DailySalesRollup'
 ]
 
 
@@ -19,6 +19,7 @@ class ProductStockHistory(BaseModel):
         ('RETURN', 'Devolução'),
     ]
 
+    game_session = models.ForeignKey('game.GameSession', on_delete=models.CASCADE, null=True, blank=True, related_name='stock_history', verbose_name='Sessão de Jogo')
     product = models.ForeignKey('game.Product', on_delete=models.CASCADE, related_name='stock_history', verbose_name='Produto')
     operation = models.CharField(max_length=10, choices=OPERATION_CHOICES, verbose_name='Operação')
     quantity = models.IntegerField(verbose_name='Quantidade')
@@ -41,6 +42,17 @@ class ProductStockHistory(BaseModel):
     def __str__(self):
         return f"{self.operation} - {self.product.name} - {self.quantity} unidades"
 
+    def save(self, *args, **kwargs):
+        """Ao registrar uma venda, soma-a ao agregado diário na mesma transação."""
+        from django.db import transaction
+        from .rollup_models import DailySalesRollup
+
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding and self.operation == 'SALE' and self.game_session_id:
+                DailySalesRollup.record(self.game_session, [self])
+
 
 class RealtimeSale(BaseModel):
     """
@@ -54,6 +66,8 @@ class RealtimeSale(BaseModel):
     sale_time = models.DateTimeField(verbose_name='Horário da Venda')
     game_date = models.DateField(default=date.today, verbose_name='Data do Jogo')
     game_time = models.TimeField(default='00:00:00', verbose_name='Hora do Jogo')
+    # GameSession.sales_sequence da gravação que criou a venda (cursor do dashboard)
+    sequence = models.BigIntegerField(default=0, verbose_name='Sequência')
 
     objects = models.Manager()
     all_objects = AllObjectsManager()
@@ -63,6 +77,9 @@ class RealtimeSale(BaseModel):
         verbose_name = 'Venda em Tempo Real'
         verbose_name_plural = 'Vendas em Tempo Real'
         ordering = ['-sale_time']
+        indexes = [
+            models.Index(fields=['game_session', 'sequence']),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {self.quantity}x - R$ {self.total_value}"
@@ -73,28 +90,9 @@ class RealtimeSale(BaseModel):
         Um dia do jogo = time_acceleration segundos reais.
         Horário comercial: 6h às 22h (16 horas úteis por dia).
         """
-        from datetime import time
-        
-        # Calcula quantos segundos se passaram desde o início do dia atual
-        time_diff = real_time - game_session.last_update_time
-        seconds_in_day = time_diff.total_seconds() % game_session.time_acceleration
-        
-        # Converte para hora do jogo considerando horário comercial (6h-22h = 16 horas úteis)
-        # Mapeia os segundos para o horário comercial
-        business_hours_ratio = seconds_in_day / game_session.time_acceleration
-        
-        # Converte para hora comercial (6h às 22h)
-        business_hour = int(business_hours_ratio * 16) + 6  # 6h + (0-16 horas)
-        business_minute = int((business_hours_ratio * 16 * 60) % 60)
-        business_second = int((business_hours_ratio * 16 * 3600) % 60)
-        
-        # Garante que não passe das 22h
-        if business_hour >= 22:
-            business_hour = 22
-            business_minute = 0
-            business_second = 0
+        from ..services.clock import GameClock
         
-        return time(business_hour, business_minute, business_second)
+        return GameClock(game_session, real_time).game_time
     
     def is_market_open(self, game_time):
         """
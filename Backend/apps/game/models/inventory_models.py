@@ -0,0 +1,171 @@
+"""
+Estoque de cada sessão de jogo.
+"""
+
+from django.db import models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.core.validators import MinValueValidator
+from django.utils import timezone
+from apps.core.models import BaseModel, ActiveManager, AllObjectsManager
+
+
+class SessionInventory(BaseModel):
+    """
+    Estoque de um produto em uma sessão de jogo.
+
+    O catálogo (Product: nome, preços, categoria, limites de estoque) é
+    compartilhado e apenas lido durante o jogo. Compras, vendas e reposições
+    alteram somente as linhas da própria sessão, então jogadores diferentes
+    não disputam as mesmas linhas. Product.current_stock é o estoque inicial
+    copiado para cada nova sessão e restaurado no reset_game.
+    """
+    game_session = models.ForeignKey('game.GameSession', on_delete=models.CASCADE, related_name='inventory', verbose_name='Sessão de Jogo')
+    product = models.ForeignKey('game.Product', on_delete=models.CASCADE, related_name='inventories', verbose_name='Produto')
+    current_stock = models.IntegerField(default=0, validators=[MinValueValidator(0)], verbose_name='Estoque Atual')
+
+    objects = models.Manager()
+    all_objects = AllObjectsManager()
+    active = ActiveManager()
+
+    class Meta:
+        verbose_name = 'Estoque da Sessão'
+        verbose_name_plural = 'Estoques das Sessões'
+        ordering = ['product__name']
+        constraints = [
+            models.UniqueConstraint(fields=['game_session', 'product'], name='unique_session_inventory_product'),
+        ]
+        indexes = [
+            models.Index(fields=['game_session', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} - {self.current_stock} unidades"
+
+    @property
+    def is_low_stock(self):
+        """Verifica se o estoque está baixo."""
+        return self.current_stock <= self.product.min_stock
+
+    @property
+    def is_out_of_stock(self):
+        """Verifica se está sem estoque."""
+        return self.current_stock <= 0
+
+    def add_stock(self, quantity):
+        """Adiciona quantidade ao estoque. Retorna o novo estoque."""
+        self.current_stock = self.add(self.game_session_id, self.product, quantity)
+        return self.current_stock
+
+    def remove_stock(self, quantity):
+        """Remove quantidade do estoque. Retorna o novo estoque."""
+        self.current_stock = self.remove(self.game_session_id, self.product_id, quantity)
+        return self.current_stock
+
+    @classmethod
+    def _apply_delta(cls, game_session, product, delta, minimum=None, maximum=None):
+        """
+        Soma delta ao estoque com um único UPDATE condicional endereçado por
+        (sessão, produto), sem ler a linha antes. Retorna o novo estoque ou
+        None se a condição não foi satisfeita.
+        """
+        from django.db import transaction
+
+        conditions = {}
+        if minimum is not None:
+            conditions['current_stock__gte'] = minimum - delta
+        if maximum is not None:
+            conditions['current_stock__lte'] = maximum - delta
+
+        rows = cls.objects.filter(game_session=game_session, product=product)
+        with transaction.atomic():
+            if not rows.filter(**conditions).update(
+                current_stock=F('current_stock') + delta,
+                updated_at=timezone.now()
+            ):
+                return None
+            return rows.values_list('current_stock', flat=True).get()
+
+    @classmethod
+    def add(cls, game_session, product, quantity):
+        """
+        Adiciona quantidade ao estoque do produto na sessão, limitado ao
+        estoque máximo do produto. Retorna o novo estoque.
+        """
+        if quantity < 0:
+            raise ValueError("Quantidade deve ser positiva")
+
+        new_stock = cls._apply_delta(game_session, product, quantity, maximum=product.max_stock)
+        if new_stock is None:
+            current_stock = cls.objects.filter(
+                game_session=game_session, product=product
+            ).values_list('current_stock', flat=True).first() or 0
+            raise ValueError(
+                f"Compra excede o limite máximo de estoque. Máximo permitido: {product.max_stock}, "
+                f"tentativa: {current_stock + quantity}"
+            )
+        return new_stock
+
+    @classmethod
+    def remove(cls, game_session, product, quantity):
+        """
+        Remove quantidade do estoque do produto na sessão. Retorna o novo
+        estoque.
+        """
+        if quantity < 0:
+            raise ValueError("Quantidade deve ser positiva")
+
+        new_stock = cls._apply_delta(game_session, product, -quantity, minimum=0)
+        if new_stock is None:
+            raise ValueError("Estoque insuficiente")
+        return new_stock
+
+    @classmethod
+    def seed(cls, game_sessions=None, products=None):
+        """
+        Cria as linhas de estoque que faltam com o estoque inicial do catálogo.
+        Sem argumentos, considera todas as sessões e todos os produtos.
+        """
+        from .session_models import GameSession
+        from .product_models import Product
+
+        if game_sessions is None:
+            game_sessions = GameSession.objects.only('pk')
+        if products is None:
+            products = Product.objects.only('pk', 'current_stock')
+        products = list(products)
+
+        cls.objects.bulk_create(
+            [
+                cls(game_session=game_session, product=product, current_stock=product.current_stock)
+                for game_session in game_sessions
+                for product in products
+            ],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def reset(cls, game_session):
+        """Restaura o estoque da sessão para o estoque inicial do catálogo."""
+        from .product_models import Product
+
+        cls.seed(game_sessions=[game_session])
+        initial_stock = Product.objects.filter(pk=OuterRef('product_id')).values('current_stock')[:1]
+        cls.objects.filter(game_session=game_session).update(
+            current_stock=Subquery(initial_stock),
+            updated_at=timezone.now()
+        )
+
+    @classmethod
+    def annotate_products(cls, queryset, user):
+        """
+        Anota produtos com o estoque da sessão do usuário (session_stock) e a
+        data da última alteração desse estoque. Sem sessão, session_stock é o
+        estoque inicial do catálogo.
+        """
+        inventory = cls.objects.filter(game_session__user=user, product=OuterRef('pk'))
+        return queryset.annotate(
+            session_stock=Coalesce(Subquery(inventory.values('current_stock')[:1]), F('current_stock')),
+            session_stock_updated_at=Subquery(inventory.values('updated_at')[:1])
+        )
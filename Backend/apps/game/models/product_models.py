@@ -116,7 +116,8 @@ class Product(BaseModel):
     supplier = models.ForeignKey(Supplier, on_delete=models.PROTECT, related_name='products', verbose_name='Fornecedor')
     purchase_price = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], verbose_name='Preço de Compra')
     sale_price = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], verbose_name='Preço de Venda')
-    current_stock = models.IntegerField(default=0, validators=[MinValueValidator(0)], verbose_name='Estoque Atual')
+    # Estoque inicial de cada sessão; o estoque em jogo fica em SessionInventory
+    current_stock = models.IntegerField(default=0, validators=[MinValueValidator(0)], verbose_name='Estoque Inicial')
     min_stock = models.IntegerField(default=10, validators=[MinValueValidator(0)], verbose_name='Estoque Mínimo')
     max_stock = models.IntegerField(default=100, validators=[MinValueValidator(1)], verbose_name='Estoque Máximo')
     shelf_life_days = models.IntegerField(default=30, validators=[MinValueValidator(1), MaxValueValidator(365)], verbose_name='Validade (dias)')
@@ -138,6 +139,7 @@ class Product(BaseModel):
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['supplier', 'is_active']),
             models.Index(fields=['current_stock']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -165,54 +167,77 @@ class Product(BaseModel):
                 return self.promotional_price
         return self.sale_price
 
+    @property
+    def stock(self):
+        """
+        Estoque exibido: o da sessão quando o produto foi anotado com
+        session_stock (SessionInventory.annotate_products), senão o inicial.
+        """
+        session_stock = getattr(self, 'session_stock', None)
+        return self.current_stock if session_stock is None else session_stock
+
+    @staticmethod
+    def stock_fields(stock, min_stock, max_stock):
+        """
+        Campos derivados do estoque, calculados sem instanciar o produto
+        (a lista de produtos em cache aplica o estoque da sessão assim).
+        """
+        is_out_of_stock = stock <= 0
+        is_low_stock = stock <= min_stock
+        if is_out_of_stock:
+            stock_status = 'OUT_OF_STOCK'
+        elif is_low_stock:
+            stock_status = 'LOW_STOCK'
+        else:
+            stock_status = 'NORMAL'
+        return {
+            'current_stock': stock,
+            'is_low_stock': is_low_stock,
+            'is_out_of_stock': is_out_of_stock,
+            'stock_status': stock_status,
+            'stock_percentage': (stock / max_stock) * 100 if max_stock > 0 else 0,
+        }
+
     @property
     def is_low_stock(self):
         """Verifica se o estoque está baixo."""
-        return self.current_stock <= self.min_stock
+        return self.stock_fields(self.stock, self.min_stock, self.max_stock)['is_low_stock']
 
     @property
     def is_out_of_stock(self):
         """Verifica se o produto está fora de estoque."""
-        return self.current_stock <= 0
+        return self.stock_fields(self.stock, self.min_stock, self.max_stock)['is_out_of_stock']
 
     @property
     def stock_status(self):
         """Retorna o status do estoque."""
-        if self.is_out_of_stock:
-            return 'OUT_OF_STOCK'
-        elif self.is_low_stock:
-            return 'LOW_STOCK'
-        else:
-            return 'NORMAL'
+        return self.stock_fields(self.stock, self.min_stock, self.max_stock)['stock_status']
 
     @property
     def stock_percentage(self):
         """Calcula a porcentagem do estoque em relação ao máximo."""
-        if self.max_stock <= 0:
-            return 0
-        return (self.current_stock / self.max_stock) * 100
-
-    def add_stock(self, quantity):
-        """Adiciona quantidade ao estoque."""
-        if quantity < 0:
-            raise ValueError("Quantidade deve ser positiva")
-        
-        # Verificar se a compra não excederá o estoque máximo
-        new_stock = self.current_stock + quantity
-        if new_stock > self.max_stock:
-            raise ValueError(f"Compra excede o limite máximo de estoque. Máximo permitido: {self.max_stock}, tentativa: {new_stock}")
-        
-        self.current_stock += quantity
-        self.save()
-
-    def remove_stock(self, quantity):
-        """Remove quantidade do estoque."""
-        if quantity < 0:
-            raise ValueError("Quantidade deve ser positiva")
-        if self.current_stock < quantity:
-            raise ValueError("Estoque insuficiente")
-        self.current_stock -= quantity
-        self.save()
+        return self.stock_fields(self.stock, self.min_stock, self.max_stock)['stock_percentage']
+
+    def add_stock(self, game_session, quantity):
+        """
+        Adiciona quantidade ao estoque do produto na sessão informada
+        (SessionInventory.add); o estoque inicial do catálogo não muda.
+        Retorna o novo estoque.
+        """
+        from .inventory_models import SessionInventory
+
+        self.session_stock = SessionInventory.add(game_session, self, quantity)
+        return self.session_stock
+
+    def remove_stock(self, game_session, quantity):
+        """
+        Remove quantidade do estoque do produto na sessão informada
+        (SessionInventory.remove). Retorna o novo estoque.
+        """
+        from .inventory_models import SessionInventory
+
+        self.session_stock = SessionInventory.remove(game_session, self, quantity)
+        return self.session_stock
 
     def set_stock(self, quantity):
         """Define a quantidade do estoque."""
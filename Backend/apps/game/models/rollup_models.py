@@ -0,0 +1,145 @@
+"""
+Agregado diário das vendas de cada sessão de jogo.
+"""
+
+from collections import OrderedDict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+from apps.core.models import BaseModel, ActiveManager, AllObjectsManager
+
+
+class DailySalesRollup(BaseModel):
+    """
+    Vendas de um produto em um dia do jogo, por sessão.
+
+    Os relatórios de vendas leem estas linhas em vez de percorrer o histórico
+    de estoque: o custo depende de dias × produtos, não do número de vendas.
+    Cada venda registrada no histórico é somada aqui na mesma transação
+    (ProductStockHistory.save ou SalesBatch.commit); o comando
+    rebuild_sales_rollup recalcula tudo a partir do histórico.
+    """
+    game_session = models.ForeignKey('game.GameSession', on_delete=models.CASCADE, related_name='sales_rollup', verbose_name='Sessão de Jogo')
+    product = models.ForeignKey('game.Product', on_delete=models.CASCADE, related_name='sales_rollup', verbose_name='Produto')
+    game_date = models.DateField(verbose_name='Data do Jogo')
+    quantity = models.IntegerField(default=0, verbose_name='Quantidade Vendida')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Receita')
+    sale_count = models.IntegerField(default=0, verbose_name='Número de Vendas')
+    # Soma dos preços unitários das vendas (preço médio = unit_price_total / sale_count)
+    unit_price_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Soma dos Preços Unitários')
+
+    objects = models.Manager()
+    all_objects = AllObjectsManager()
+    active = ActiveManager()
+
+    class Meta:
+        verbose_name = 'Vendas do Dia'
+        verbose_name_plural = 'Vendas por Dia'
+        ordering = ['-game_date']
+        constraints = [
+            models.UniqueConstraint(fields=['game_session', 'product', 'game_date'], name='unique_daily_sales_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['game_session', 'game_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.game_date} - {self.product.name} - {self.quantity} unidades"
+
+    @classmethod
+    def record(cls, game_session, sales):
+        """
+        Soma as vendas (objetos com product_id, game_date, quantity,
+        unit_price e total_value) às linhas de cada produto e dia na sessão.
+        As linhas que faltam são criadas e todas são atualizadas com um único
+        UPDATE baseado em F(), sem ler os totais antes.
+        """
+        totals = OrderedDict()
+        for sale in sales:
+            entry = totals.setdefault(
+                (sale.product_id, sale.game_date),
+                {'quantity': 0, 'revenue': Decimal('0.00'), 'sale_count': 0, 'unit_price_total': Decimal('0.00')}
+            )
+            entry['quantity'] += sale.quantity
+            entry['revenue'] += sale.total_value or 0
+            entry['sale_count'] += 1
+            entry['unit_price_total'] += sale.unit_price or 0
+
+        if not totals:
+            return
+
+        keys = {key: Q(product_id=key[0], game_date=key[1]) for key in totals}
+
+        def increment(field, output_field):
+            return Case(
+                *[When(keys[key], then=F(field) + Value(entry[field])) for key, entry in totals.items()],
+                output_field=output_field
+            )
+
+        amount = DecimalField(max_digits=14, decimal_places=2)
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [
+                    cls(game_session=game_session, product_id=product_id, game_date=game_date)
+                    for product_id, game_date in totals
+                ],
+                ignore_conflicts=True
+            )
+            cls.objects.filter(reduce(or_, keys.values()), game_session=game_session).update(
+                quantity=increment('quantity', IntegerField()),
+                revenue=increment('revenue', amount),
+                sale_count=increment('sale_count', IntegerField()),
+                unit_price_total=increment('unit_price_total', amount),
+                updated_at=timezone.now()
+            )
+
+    @classmethod
+    def rebuild(cls, game_sessions=None):
+        """
+        Recalcula as linhas a partir do histórico de vendas. Sem argumentos,
+        considera todas as sessões. Retorna o número de linhas gravadas.
+        """
+        from .history_models import ProductStockHistory
+
+        sales = ProductStockHistory.objects.filter(operation='SALE', game_session__isnull=False)
+        rollup = cls.objects.all()
+        if game_sessions is not None:
+            sales = sales.filter(game_session__in=game_sessions)
+            rollup = rollup.filter(game_session__in=game_sessions)
+
+        rows = sales.values('game_session_id', 'product_id', 'game_date').annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum('total_value'),
+            total_sales=Count('pk'),
+            total_unit_price=Sum('unit_price')
+        ).order_by()
+
+        from .session_models import GameSession
+
+        with transaction.atomic():
+            # Os totais mudam: os dashboards com cursor recebem o resumo novo
+            sessions = GameSession.objects.all()
+            if game_sessions is not None:
+                sessions = sessions.filter(pk__in=game_sessions)
+            sessions.update(sales_sequence=F('sales_sequence') + 1)
+            rollup.delete()
+            created = cls.objects.bulk_create(
+                [
+                    cls(
+                        game_session_id=row['game_session_id'],
+                        product_id=row['product_id'],
+                        game_date=row['game_date'],
+                        quantity=row['total_quantity'] or 0,
+                        revenue=row['total_revenue'] or 0,
+                        sale_count=row['total_sales'],
+                        unit_price_total=row['total_unit_price'] or 0
+                    )
+                    for row in rows.iterator()
+                ],
+                batch_size=1000
+            )
+        return len(created)
@@ -8,10 +8,20 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
 from datetime import date, datetime, timedelta
+import random
 from apps.core.models import BaseModel, ActiveManager, AllObjectsManager
+from ..services.clock import GameClock, business_time
 
 User = get_user_model()
 
+# Faixas em que as sessões são distribuídas entre os processos do run_game_ticker
+TICKER_SLOTS = 1024
+
+
+def random_ticker_slot():
+    """Faixa do ticker de uma nova sessão, sorteada uniformemente."""
+    return random.randrange(TICKER_SLOTS)
+
 
 class GameSession(BaseModel):
     """
@@ -56,6 +66,11 @@ class GameSession(BaseModel):
         default=timezone.now,
         verbose_name='Última Atualização'
     )
+    paused_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Pausado em'
+    )
     
     # Estado do jogo
     status = models.CharField(
@@ -102,257 +117,367 @@ class GameSession(BaseModel):
         verbose_name='Dias Sobrevividos'
     )
     
+    # Número da última gravação de vendas da sessão (cursor do dashboard)
+    sales_sequence = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Sequência de Vendas'
+    )
+    
+    # Divisão das sessões entre processos do ticker (shard = faixa % shards)
+    ticker_slot = models.PositiveSmallIntegerField(
+        default=random_ticker_slot,
+        editable=False,
+        verbose_name='Faixa do Ticker'
+    )
+    
     # Managers
     objects = models.Manager()
     all_objects = AllObjectsManager()
     active = ActiveManager()
+    
+    # Ticks sem mudança de estado não gravam a sessão
+    skip_unchanged_save = True
 
     class Meta:
         verbose_name = 'Sessão de Jogo'
         verbose_name_plural = 'Sessões de Jogo'
         ordering = ['-last_update_time']
+        indexes = [
+            models.Index(fields=['status', 'ticker_slot']),
+        ]
 
     def __str__(self):
         return f"Sessão de {self.user.full_name} - {self.current_game_date}"
 
-    def update_game_time(self):
-        """Atualiza o tempo do jogo baseado no tempo real decorrido."""
-        now = timezone.now()
-        time_diff = now - self.last_update_time
+    def update_game_time(self, catalog=None, max_days=None):
+        """
+        Atualiza o tempo do jogo baseado no tempo real decorrido.
+        catalog (de load_catalog) permite reaproveitar o estoque da sessão já
+        carregado, evitando recarregá-lo.
         
-        # Calcula quantos dias do jogo passaram
-        seconds_passed = time_diff.total_seconds()
-        game_days_passed = int(seconds_passed / self.time_acceleration)
+        Cada chamada materializa no máximo max_days dias (padrão
+        GAME_TICK_MAX_DAYS). A âncora avança só pelos dias processados e
+        continua atrasada pelo restante, que os próximos ticks (ou o
+        run_game_ticker) concluem; pending_days informa quantos faltam.
         
-        if game_days_passed > 0:
-            self.current_game_date += timedelta(days=game_days_passed)
-            self.days_survived += game_days_passed
-            # Atualiza last_update_time apenas quando há dias suficientes
-            self.last_update_time = now
-            self.save()
+        O tick é serializado por sessão: uma chamada concorrente espera a que
+        está em andamento e reaproveita o resultado em vez de recalcular. Um
+        tick antecipado (sem dia completo nem cliente novo) retorna sem
+        bloquear a sessão nem consultar o banco.
+        """
+        from django.conf import settings
+        from django.db import transaction
+        
+        if not self.tick_due():
+            return 0
+        
+        with transaction.atomic():
+            if self._lock_for_tick():
+                # Outro tick acabou de gravar esta sessão: reaproveita o resultado
+                window = settings.GAME_TICK_COALESCE_SECONDS
+                if (timezone.now() - self.updated_at).total_seconds() < window:
+                    return 0
             
-            # Processa vendas automáticas para cada dia que passou
-            if self.auto_sales_enabled and self.status == 'ACTIVE':
-                self.process_auto_sales(game_days_passed)
+            clock = GameClock(self)
+            seconds_passed = clock.elapsed_seconds
+            # Pausado, os dias pendentes aguardam a retomada para terem vendas
+            pending_days = clock.pending_days if self.paused_at is None else 0
             
-            # Verifica se o jogo terminou
-            if self.current_game_date >= self.game_end_date:
-                self.status = 'COMPLETED'
+            # Orçamento de trabalho por chamada
+            if max_days is None:
+                max_days = settings.GAME_TICK_MAX_DAYS
+            game_days_passed = min(pending_days, max_days) if max_days > 0 else pending_days
+            
+            if game_days_passed > 0:
+                # Avança a âncora exatamente pelos dias completos, preservando
+                # a fração do dia atual
+                self.last_update_time = clock.anchor_after(game_days_passed)
+                
+                # Modo de recuperação: todos os dias perdidos em uma única passagem
+                self._advance_days(game_days_passed, catalog=catalog)
                 self.save()
-        
-        # Processa vendas durante o dia atual (mesmo sem dias completos)
-        # Só processa se passou pelo menos 1 segundo para evitar spam
-        # IMPORTANTE: Depois da atualização da data para usar a data correta
-        if self.auto_sales_enabled and self.status == 'ACTIVE' and seconds_passed >= 1:
-            self.process_daily_sales(seconds_passed)
+            
+            # Processa vendas durante o dia atual (mesmo sem dias completos)
+            # Só processa se passou pelo menos 1 segundo para evitar spam
+            # IMPORTANTE: Depois da atualização da data para usar a data correta
+            # Em recuperação o dia atual ainda não foi alcançado
+            caught_up = game_days_passed == pending_days
+            if caught_up and self.auto_sales_enabled and self.status == 'ACTIVE' and seconds_passed >= 1:
+                self.process_daily_sales(seconds_passed, catalog=catalog)
         
         return game_days_passed
     
-    def process_daily_sales(self, seconds_passed):
-        """Processa vendas durante o dia atual baseado no tempo decorrido."""
-        from .product_models import Product
-        from .history_models import ProductStockHistory, RealtimeSale
-        from apps.finance.models import UserBalance, Transaction, Category
+    @property
+    def pending_days(self):
+        """Dias completos ainda não materializados (em recuperação se > 0)."""
+        if self.paused_at is not None:
+            return 0
+        return GameClock(self).pending_days
+    
+    def tick_due(self, now=None):
+        """
+        Indica se um tick agora teria efeito: há dia completo a materializar
+        ou cliente do dia atual que ainda não foi atendido.
+        """
+        if self.paused_at is not None:
+            return False
+        
+        clock = GameClock(self, now)
+        if clock.pending_days > 0:
+            return True
+        if not (self.auto_sales_enabled and self.status == 'ACTIVE'):
+            return False
+        if self.last_sales_reset_date != self.current_game_date:
+            return True
+        return self._day_demand().arrivals_until(clock.day_fraction) > self.current_day_sales_count
+    
+    def next_event_at(self, now=None):
+        """
+        Próximo instante real em que um tick tem efeito: a chegada do próximo
+        cliente prevista pela demanda do dia ou a virada do dia, que coincide
+        com o fechamento do mercado às 22h. None se o relógio está parado.
+        """
+        if self.paused_at is not None or self.status in ('COMPLETED', 'FAILED'):
+            return None
+        
+        clock = GameClock(self, now)
+        if self.tick_due(clock.now):
+            return clock.now
+        if self.days_remaining <= 0:
+            return None
+        
+        next_event = clock.time_at(1.0)
+        if self.auto_sales_enabled and self.status == 'ACTIVE':
+            # Clientes até current_day_sales_count já foram atendidos
+            demand = self._day_demand()
+            if self.current_day_sales_count < len(demand):
+                next_event = min(next_event, clock.time_at(float(demand.offsets[self.current_day_sales_count])))
+        return next_event
+    
+    def fast_forward(self, days):
+        """
+        Avança o jogo vários dias de uma vez.
+        As vendas de todos os dias são calculadas em uma única passagem,
+        limitada ao orçamento de dias por tick (GAME_TICK_MAX_DAYS). Retorna
+        os dias efetivamente avançados.
+        """
+        from django.conf import settings
         from django.db import transaction
-        import random
-        from datetime import datetime
+        
+        with transaction.atomic():
+            self._lock_for_tick()
+            
+            days = min(days, self.days_remaining)
+            if settings.GAME_TICK_MAX_DAYS > 0:
+                days = min(days, settings.GAME_TICK_MAX_DAYS)
+            if days <= 0 or self.is_game_over():
+                return 0
+            
+            self._advance_days(days)
+            self.save()
+        
+        return days
+    
+    def next_sales_sequence(self):
+        """
+        Reserva o próximo número da sequência de vendas da sessão e o retorna.
+        
+        Deve ser chamado dentro da transação que grava as vendas e antes de
+        alterar o estoque: o UPDATE bloqueia a linha da sessão até o commit
+        (na mesma ordem do tick), então as vendas de uma sessão ficam visíveis
+        na ordem da sequência, ao contrário das marcas de tempo.
+        """
+        rows = GameSession.objects.filter(pk=self.pk)
+        rows.update(sales_sequence=models.F('sales_sequence') + 1)
+        self.sales_sequence = rows.values_list('sales_sequence', flat=True).get()
+        self._snapshot_fields(['sales_sequence'])
+        return self.sales_sequence
+    
+    def _lock_for_tick(self):
+        """
+        Bloqueia a linha da sessão até o fim da transação atual.
+        Se outra requisição gravou a sessão enquanto esta esperava, recarrega o
+        estado do banco e retorna True.
+        """
+        stored_updated_at = (
+            GameSession.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+        if stored_updated_at is None or stored_updated_at <= self.updated_at:
+            return False
+        
+        self.refresh_from_db()
+        return True
+    
+    def _advance_days(self, days, catalog=None):
+        """
+        Avança a data do jogo e processa as vendas dos dias que passaram.
+        Usado pelo avanço rápido e pela recuperação em update_game_time: o dia
+        atual, se já teve vendas em tempo real, continua do próximo cliente.
+        """
+        start_date = self.current_game_date
+        self.current_game_date += timedelta(days=days)
+        self.days_survived += days
+        
+        # Processa vendas automáticas para os dias que passaram
+        if self.auto_sales_enabled and self.status == 'ACTIVE':
+            self.process_auto_sales(days, start_date=start_date, catalog=catalog)
+        
+        # Avisa o início de cada mês cruzado, em ordem
+        if self.status == 'ACTIVE':
+            for month in self._months_started(start_date, self.current_game_date):
+                self._send_month_started(month)
+        
+        # Verifica se o jogo terminou
+        if self.current_game_date >= self.game_end_date:
+            self.status = 'COMPLETED'
+        
+        self._publish_state('day', days_passed=days)
+    
+    def process_daily_sales(self, seconds_passed, catalog=None):
+        """
+        Processa vendas durante o dia atual baseado no tempo decorrido.
+        As chegadas de clientes do dia são geradas de uma vez pelo motor de
+        demanda; aqui apenas o intervalo ainda não processado é vendido.
+        """
+        from .product_models import Product
+        from ..services import SalesBatch, get_demand_engine, load_catalog
         
         # Calcula o progresso do dia (0-1)
         day_progress = (seconds_passed % self.time_acceleration) / self.time_acceleration
         
-        # Calcula quantas vendas já deveriam ter acontecido hoje
-        expected_sales_today = int(self.daily_sales_target * day_progress)
-        
         # Reseta contador se mudou de dia
+        counter_changed = False
         if self.current_game_date != self.last_sales_reset_date:
             self.current_day_sales_count = 0
             self.last_sales_reset_date = self.current_game_date
-            self.save()
+            counter_changed = True
         
-        today_sales = self.current_day_sales_count
+        # Clientes que já deveriam ter chegado hoje
+        engine = get_demand_engine()
+        demand = self._day_demand()
+        expected_sales_today = demand.arrivals_until(day_progress)
         
         # Se ainda não atingiu o número esperado de vendas, cria mais vendas
-        if today_sales < expected_sales_today:
-            sales_to_create = expected_sales_today - today_sales
+        if self.current_day_sales_count < expected_sales_today:
+            keys, stock, sampler = catalog or load_catalog(self)
+            sales = engine.allocate(
+                demand, stock, start=self.current_day_sales_count, end=expected_sales_today, sampler=sampler
+            )
             
-            # Busca produtos disponíveis para venda
-            available_products = Product.objects.filter(
-                is_active=True,
-                current_stock__gt=0
-            ).select_related('category')
+            # Instancia apenas os produtos efetivamente vendidos
+            products = Product.objects.select_related('category').in_bulk({keys[index] for _, index, _ in sales})
+            batch = SalesBatch(self)
+            now = timezone.now()
+            for offset, index, quantity in sales:
+                batch.add(products[keys[index]], quantity, game_time=self._business_time(offset), sale_time=now)
+            batch.commit()
             
-            if available_products.exists():
-                with transaction.atomic():
-                    # Obtém o saldo do usuário
-                    user_balance = UserBalance.objects.get(user=self.user)
-                    
-                    # Obtém ou cria categoria de vendas
-                    vendas_category, _ = Category.objects.get_or_create(
-                        name='Vendas',
-                        defaults={
-                            'description': 'Receitas de vendas automáticas',
-                            'color': '#10B981',
-                            'icon': '💰'
-                        }
-                    )
-                    
-                    for _ in range(min(sales_to_create, 3)):  # Máximo 3 vendas por vez
-                        # Seleciona produto aleatório
-                        product = random.choice(list(available_products))
-                        
-                        # Quantidade aleatória para venda (1-3 unidades)
-                        quantity = random.randint(1, min(3, product.current_stock))
-                        
-                        # Calcula receita
-                        revenue = product.current_price * quantity
-                        
-                        # Remove do estoque
-                        product.remove_stock(quantity)
-                        
-                        # Registra no histórico de estoque
-                        ProductStockHistory.objects.create(
-                            product=product,
-                            operation='SALE',
-                            quantity=quantity,
-                            previous_stock=product.current_stock + quantity,
-                            new_stock=product.current_stock,
-                            total_value=revenue,
-                            description=f'Venda automática - Dia {self.current_game_date}'
-                        )
-                        
-                        # Calcula a hora do jogo atual
-                        now = timezone.now()
-                        game_time = RealtimeSale().get_game_time_from_real_time(now, self)
-                        
-                        # Só cria venda se o mercado estiver aberto (6h às 22h)
-                        if RealtimeSale().is_market_open(game_time):
-                            # Cria registro de venda em tempo real
-                            RealtimeSale.objects.create(
-                                game_session=self,
-                                product=product,
-                                quantity=quantity,
-                                unit_price=product.current_price,
-                                total_value=revenue,
-                                sale_time=now,
-                                game_date=self.current_game_date,
-                                game_time=game_time
-                            )
-                        
-                        # Adiciona receita ao saldo
-                        user_balance.add_amount(revenue)
-                        
-                        # Cria transação financeira
-                        Transaction.objects.create(
-                            user=self.user,
-                            category=vendas_category,
-                            amount=revenue,
-                            description=f'Venda: {product.name} ({quantity}x)',
-                            transaction_type='INCOME',
-                            transaction_date=self.current_game_date
-                        )
-                        
-                        # Incrementa contador de vendas do dia
-                        self.current_day_sales_count += 1
-                        self.save()
-    
-    def process_auto_sales(self, days_passed):
-        """Processa vendas automáticas para os dias que passaram."""
+            self.current_day_sales_count = expected_sales_today
+            counter_changed = True
+        
+        # Uma única gravação da sessão por tick
+        if counter_changed:
+            self.save(update_fields=['current_day_sales_count', 'last_sales_reset_date', 'updated_at'])
+    
+    def process_auto_sales(self, days_passed, start_date=None, catalog=None):
+        """
+        Processa vendas automáticas para os dias que passaram.
+        Os produtos são carregados uma única vez e as vendas de todos os dias
+        são gravadas em lote, com um lançamento financeiro por dia.
+        
+        Os clientes do primeiro dia já atendidos em tempo real por
+        process_daily_sales (current_day_sales_count) não compram de novo; o
+        contador passa a valer para o novo dia atual.
+        """
         from .product_models import Product
-        from .history_models import ProductStockHistory, RealtimeSale
-        from apps.finance.models import UserBalance, Transaction, Category
-        from django.db import transaction
-        import random
-        from datetime import datetime, timedelta
+        from ..services import SalesBatch, get_demand_engine, load_catalog
+        
+        if start_date is None:
+            start_date = self.current_game_date - timedelta(days=days_passed)
+        
+        already_sold = self.current_day_sales_count if self.last_sales_reset_date == start_date else 0
+        self.current_day_sales_count = 0
+        self.last_sales_reset_date = self.current_game_date
         
+        # Busca o catálogo uma única vez para todos os dias
+        keys, stock, sampler = catalog or load_catalog(self)
+        if sampler.is_empty:
+            return
+        
+        engine = get_demand_engine()
+        sales = []
         for day in range(days_passed):
-            # Busca produtos disponíveis para venda
-            available_products = Product.objects.filter(
-                is_active=True,
-                current_stock__gt=0
-            ).select_related('category')
-            
-            if not available_products.exists():
-                continue
-            
-            # Calcula quantos produtos vender neste dia
-            products_to_sell = min(self.daily_sales_target, available_products.count())
-            
-            # Seleciona produtos aleatórios para venda
-            products_for_sale = random.sample(
-                list(available_products), 
-                min(products_to_sell, len(available_products))
+            game_date = start_date + timedelta(days=day)
+            demand = engine.plan_day(self.daily_sales_target, self._demand_seed(game_date))
+            start = already_sold if day == 0 else 0
+            sales.extend((game_date, sale) for sale in engine.allocate(demand, stock, start=start, sampler=sampler))
+            if sampler.is_empty:
+                break
+        
+        products = Product.objects.select_related('category').in_bulk({keys[index] for _, (_, index, _) in sales})
+        batch = SalesBatch(self)
+        now = timezone.now()
+        for game_date, (offset, index, quantity) in sales:
+            batch.add(
+                products[keys[index]], quantity,
+                game_date=game_date, game_time=self._business_time(offset), sale_time=now
             )
-            
-            total_revenue = 0
-            
-            with transaction.atomic():
-                # Obtém o saldo do usuário
-                user_balance = UserBalance.objects.get(user=self.user)
-                
-                # Obtém ou cria categoria de vendas
-                vendas_category, _ = Category.objects.get_or_create(
-                    name='Vendas',
-                    defaults={
-                        'description': 'Receitas de vendas automáticas',
-                        'color': '#10B981',
-                        'icon': '💰'
-                    }
-                )
-                
-                for product in products_for_sale:
-                    # Quantidade aleatória para venda (1-5 unidades)
-                    quantity = random.randint(1, min(5, product.current_stock))
-                    
-                    # Calcula receita
-                    revenue = product.current_price * quantity
-                    total_revenue += revenue
-                    
-                    # Remove do estoque
-                    product.remove_stock(quantity)
-                    
-                    # Registra no histórico de estoque
-                    ProductStockHistory.objects.create(
-                        product=product,
-                        operation='SALE',
-                        quantity=quantity,
-                        previous_stock=product.current_stock + quantity,
-                        new_stock=product.current_stock,
-                        unit_price=product.current_price,
-                        total_value=revenue,
-                        description=f'Venda automática - Dia {self.current_game_date}'
-                    )
-                    
-                    # Calcula a hora do jogo atual
-                    now = timezone.now()
-                    game_time = RealtimeSale().get_game_time_from_real_time(now, self)
-                    
-                    # Só cria venda se o mercado estiver aberto (6h às 22h)
-                    if RealtimeSale().is_market_open(game_time):
-                        # Cria registro de venda em tempo real
-                        RealtimeSale.objects.create(
-                            game_session=self,
-                            product=product,
-                            quantity=quantity,
-                            unit_price=product.current_price,
-                            total_value=revenue,
-                            sale_time=now,
-                            game_date=self.current_game_date,
-                            game_time=game_time
-                        )
-                
-                # Adiciona receita ao saldo
-                if total_revenue > 0:
-                    user_balance.add_amount(total_revenue)
-                    
-                    # Cria transação financeira
-                    Transaction.objects.create(
-                        user=self.user,
-                        amount=total_revenue,
-                        transaction_type='INCOME',
-                        category=vendas_category,
-                        description=f'Vendas automáticas - {products_to_sell} produtos vendidos',
-                        transaction_date=self.current_game_date
-                    )
+        batch.commit()
+    
+    def _months_started(self, start_date, end_date):
+        """Primeiros dias dos meses iniciados em (start_date, end_date], antes do fim do jogo."""
+        months = []
+        month = start_date.replace(day=1)
+        while True:
+            month = (month + timedelta(days=32)).replace(day=1)
+            if month > end_date or month >= self.game_end_date:
+                return months
+            months.append(month)
+    
+    def _send_month_started(self, month):
+        """Dispara o evento game_month_started para um mês do jogo."""
+        from ..signals import game_month_started
+        
+        game_month_started.send(sender=GameSession, game_session=self, month=month)
+    
+    def _publish_state(self, event, **extra):
+        """Publica o estado da sessão para os streams do usuário."""
+        from ..services.events import publish_event
+        
+        publish_event(self.user_id, event, lambda: {
+            'status': self.status,
+            'current_game_date': self.current_game_date,
+            'days_survived': self.days_survived,
+            'last_update_time': self.last_update_time,
+            'paused_at': self.paused_at,
+            'time_acceleration': self.time_acceleration,
+            **extra
+        })
+    
+    def _demand_seed(self, game_date):
+        """Semente determinística da demanda de um dia desta sessão."""
+        return (self.id.int ^ (game_date.toordinal() * 2654435761)) % (2 ** 32)
+    
+    def _day_demand(self, game_date=None):
+        """Chegadas de clientes planejadas para um dia (padrão: o dia atual)."""
+        from ..services import get_demand_engine
+        
+        game_date = game_date or self.current_game_date
+        return get_demand_engine().plan_day(self.daily_sales_target, self._demand_seed(game_date))
+    
+    @staticmethod
+    def _business_time(day_fraction):
+        """Converte uma fração do dia em hora do horário comercial (6h às 22h)."""
+        return business_time(day_fraction)
+    
+    @property
+    def clock(self):
+        """Relógio do jogo no instante atual (sem consultas nem gravações)."""
+        return GameClock(self)
     
     def get_game_progress(self):
         """Calcula o progresso do jogo em porcentagem."""
@@ -375,25 +500,42 @@ class GameSession(BaseModel):
         self.status = 'ACTIVE'
         self.session_start_time = timezone.now()
         self.last_update_time = timezone.now()
+        self.paused_at = None
         self.save()
+        self._publish_state('session')
+        
+        # O mês em que o jogo começa também abre a folha de pagamento
+        self._send_month_started(self.current_game_date.replace(day=1))
     
     def pause_game(self):
-        """Pausa o jogo."""
+        """Pausa o jogo, congelando o relógio no instante atual."""
+        if self.paused_at is None:
+            self.paused_at = timezone.now()
         self.status = 'PAUSED'
         self.save()
+        self._publish_state('session')
     
     def resume_game(self):
-        """Retoma o jogo."""
+        """Retoma o jogo do ponto do dia em que foi pausado."""
+        now = timezone.now()
+        if self.paused_at is not None:
+            # Desloca a âncora pelo tempo em pausa
+            self.last_update_time += now - self.paused_at
+            self.paused_at = None
+        elif self.status == 'PAUSED':
+            self.last_update_time = now
         self.status = 'ACTIVE'
-        self.last_update_time = timezone.now()
         self.save()
+        self._publish_state('session')
     
     def reset_game(self):
         """Reinicia o jogo completamente."""
-        from apps.finance.models import UserBalance, Transaction
+        from apps.core.caching import invalidate_user
+        from apps.finance.models import MonthlyLedger, UserBalance, Transaction
         from django.db import transaction
-        from .product_models import Product
         from .history_models import ProductStockHistory, RealtimeSale
+        from .inventory_models import SessionInventory
+        from .rollup_models import DailySalesRollup
         
         with transaction.atomic():
             # Resetar dados da sessão de jogo
@@ -403,6 +545,7 @@ class GameSession(BaseModel):
             self.status = 'ACTIVE'
             self.session_start_time = timezone.now()
             self.last_update_time = timezone.now()
+            self.paused_at = None
             self.current_day_sales_count = 0
             self.last_sales_reset_date = date.today()
             
@@ -419,35 +562,23 @@ class GameSession(BaseModel):
             
             # Limpar todas as transações financeiras do usuário
             Transaction.objects.filter(user=self.user).delete()
+            MonthlyLedger.objects.filter(user=self.user).delete()
             
             # Limpar histórico de vendas em tempo real
             RealtimeSale.objects.filter(game_session=self).delete()
             
-            # Resetar estoque de todos os produtos para valores iniciais
-            # Valores padrão baseados nos produtos criados pelo comando create_default_data
-            default_stock_values = {
-                'Arroz 5kg': 50,
-                'Feijão 1kg': 30,
-                'Macarrão 500g': 40,
-                'Coca-Cola 2L': 25,
-                'Água Mineral 500ml': 60,
-                'Detergente 500ml': 35,
-                'Papel Higiênico 4 rolos': 20,
-                'Carne Bovina 1kg': 15,
-                'Frango Inteiro 1kg': 20,
-                'Pão Francês': 100,
-                'Bolo de Chocolate': 8,
-            }
+            # Restaura o estoque desta sessão para o estoque inicial do catálogo
+            SessionInventory.reset(self)
             
-            for product in Product.objects.filter(is_active=True):
-                # Usar valor padrão se disponível, senão usar 50% do estoque máximo
-                default_stock = default_stock_values.get(product.name, max(10, product.max_stock // 2))
-                product.current_stock = default_stock
-                product.save()
+            # Limpar histórico de estoque da sessão
+            ProductStockHistory.objects.filter(game_session=self).delete()
+            DailySalesRollup.objects.filter(game_session=self).delete()
             
-            # Limpar histórico de estoque
-            ProductStockHistory.objects.filter(product__is_active=True).delete()
+            invalidate_user('finance', self.user_id)
+            invalidate_user('sales', self.user_id)
             
             self.save()
+            self._publish_state('session')
+            self._send_month_started(self.current_game_date.replace(day=1))
 
 
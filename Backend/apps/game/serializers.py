@@ -6,6 +6,7 @@ from rest_framework import serializers
 from .models import (
     GameSession, ProductCategory, Supplier, Product, ProductStockHistory, RealtimeSale
 )
+from .services.clock import GameClock
 
 
 class GameSessionSerializer(serializers.ModelSerializer):
@@ -16,6 +17,8 @@ class GameSessionSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     current_game_time = serializers.SerializerMethodField()
     is_market_open = serializers.SerializerMethodField()
+    pending_days = serializers.ReadOnlyField()
+    catching_up = serializers.SerializerMethodField()
     
     class Meta:
         model = GameSession
@@ -23,28 +26,28 @@ class GameSessionSerializer(serializers.ModelSerializer):
             'id', 'user_name', 'game_start_date', 'current_game_date', 
             'game_end_date', 'status', 'time_acceleration', 'total_score',
             'days_survived', 'game_progress_percentage', 'days_remaining',
-            'current_day_sales_count', 'last_update_time', 'current_game_time',
-            'is_market_open', 'created_at', 'updated_at'
+            'current_day_sales_count', 'last_update_time', 'paused_at', 'current_game_time',
+            'is_market_open', 'pending_days', 'catching_up', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_current_game_time(self, obj):
-        """Retorna a hora atual do jogo."""
-        from apps.game.models import RealtimeSale
-        from django.utils import timezone
-        
-        now = timezone.now()
-        game_time = RealtimeSale().get_game_time_from_real_time(now, obj)
-        return game_time.strftime('%H:%M:%S')
+        """Retorna a hora atual do jogo, derivada do relógio da sessão."""
+        return GameClock(obj).game_time.strftime('%H:%M:%S')
     
     def get_is_market_open(self, obj):
         """Verifica se o mercado está aberto."""
-        from apps.game.models import RealtimeSale
-        from django.utils import timezone
-        
-        now = timezone.now()
-        game_time = RealtimeSale().get_game_time_from_real_time(now, obj)
-        return RealtimeSale().is_market_open(game_time)
+        return GameClock(obj).is_market_open
+    
+    def get_catching_up(self, obj):
+        """Indica se ainda há dias perdidos sendo processados."""
+        return obj.pending_days > 0
+
+
+class GameFastForwardSerializer(serializers.Serializer):
+    """Serializer para avançar vários dias do jogo de uma vez."""
+    
+    days = serializers.IntegerField(min_value=1, max_value=366)
 
 
 # Removido: SupermarketBalanceSerializer e BalanceOperationSerializer
@@ -153,6 +156,12 @@ class ProductSerializer(serializers.ModelSerializer):
             'is_out_of_stock', 'stock_status', 'stock_percentage', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def to_representation(self, instance):
+        """Exibe o estoque da sessão do usuário quando o produto foi anotado com ele."""
+        data = super().to_representation(instance)
+        data['current_stock'] = instance.stock
+        return data
 
 
 class ProductStockHistorySerializer(serializers.ModelSerializer):
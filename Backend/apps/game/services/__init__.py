@@ -0,0 +1,23 @@
+"""
+Serviços do app de jogo organizados em módulos.
+"""
+
+from .sales_batch import SalesBatch
+from .demand import DayDemand, DemandEngine, PythonDemandEngine, NumpyDemandEngine, get_demand_engine
+from .sampler import ProductSampler, load_catalog, load_catalogs, product_weight
+from .ticker import active_session_ids, tick_sessions
+
+__all__ = [
+    'SalesBatch',
+    'DayDemand',
+    'DemandEngine',
+    'PythonDemandEngine',
+    'NumpyDemandEngine',
+    'get_demand_engine',
+    'ProductSampler',
+    'load_catalog',
+    'load_catalogs',
+    'product_weight',
+    'active_session_ids',
+    'tick_sessions',
+]
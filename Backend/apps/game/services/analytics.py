@@ -0,0 +1,148 @@
+"""
+Agregações dos relatórios de vendas.
+
+Cada relatório é montado a partir de uma consulta agrupada (por dia, mês,
+produto ou dia da semana) sobre o agregado diário de vendas recebido
+(DailySalesRollup); os períodos sem vendas são preenchidos aqui, de modo que
+o número de consultas não depende do tamanho da janela.
+"""
+
+from calendar import monthrange
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractIsoWeekDay, TruncMonth
+
+MONTH_NAMES = {
+    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+    7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+}
+WEEKDAYS = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+
+
+def format_brl(value):
+    """Valor formatado em reais (R$ 1.234,56)."""
+    return f"R$ {float(value):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def _period_entry(period, period_key, totals):
+    quantity, revenue = totals
+    return {
+        'period': period,
+        'period_key': period_key,
+        'total_quantity': quantity or 0,
+        'total_revenue': float(revenue or 0),
+        'revenue_formatted': format_brl(revenue or 0)
+    }
+
+
+def _daily_totals(sales, start_date, end_date):
+    """{data: (quantidade, receita)} das vendas entre as datas, em uma consulta."""
+    rows = sales.filter(game_date__range=[start_date, end_date]).values('game_date').annotate(
+        total_quantity=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ).values_list('game_date', 'total_quantity', 'total_revenue')
+    return {game_date: (quantity, revenue) for game_date, quantity, revenue in rows}
+
+
+def sales_by_period(sales, period, start_date, end_date, days_back):
+    """
+    Vendas por dia (os days_back dias a partir de start_date), por semana
+    (blocos de 7 dias a partir de start_date) ou por mês (meses inteiros de
+    start_date a end_date).
+    """
+    if period == 'daily':
+        totals = _daily_totals(sales, start_date, start_date + timedelta(days=days_back - 1))
+        return [
+            _period_entry(day.strftime('%d/%m'), day.strftime('%Y-%m-%d'), totals.get(day, (0, 0)))
+            for day in (start_date + timedelta(days=i) for i in range(days_back))
+        ]
+
+    if period == 'weekly':
+        totals = _daily_totals(sales, start_date, end_date)
+        entries = []
+        week_start = start_date
+        while week_start <= end_date:
+            week_end = min(week_start + timedelta(days=6), end_date)
+            days = [
+                totals.get(week_start + timedelta(days=offset), (0, 0))
+                for offset in range((week_end - week_start).days + 1)
+            ]
+            entries.append(_period_entry(
+                f"Semana {len(entries) + 1}",
+                f"{week_start.strftime('%Y-%m-%d')}_{week_end.strftime('%Y-%m-%d')}",
+                (sum(day[0] or 0 for day in days), sum(day[1] or 0 for day in days))
+            ))
+            week_start += timedelta(days=7)
+        return entries
+
+    first_month = start_date.replace(day=1)
+    last_day = end_date.replace(day=monthrange(end_date.year, end_date.month)[1])
+    rows = sales.filter(game_date__range=[first_month, last_day]).annotate(
+        month=TruncMonth('game_date')
+    ).values('month').annotate(
+        total_quantity=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ).values_list('month', 'total_quantity', 'total_revenue')
+    totals = {month: (quantity, revenue) for month, quantity, revenue in rows}
+
+    entries = []
+    month = first_month
+    while month <= end_date:
+        entries.append(_period_entry(
+            f"{MONTH_NAMES[month.month]} {month.year}",
+            f"{month.year}-{month.month:02d}",
+            totals.get(month, (0, 0))
+        ))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return entries
+
+
+def sales_by_weekday(sales):
+    """Vendas por dia da semana (segunda a domingo), em uma consulta."""
+    rows = sales.annotate(weekday=ExtractIsoWeekDay('game_date')).values('weekday').annotate(
+        total_quantity=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ).values_list('weekday', 'total_quantity', 'total_revenue')
+    totals = {weekday: (quantity, revenue) for weekday, quantity, revenue in rows}
+
+    entries = []
+    for index, name in enumerate(WEEKDAYS):
+        quantity, revenue = totals.get(index + 1, (0, 0))
+        entries.append({
+            'weekday': name,
+            'total_quantity': quantity or 0,
+            'total_revenue': float(revenue or 0)
+        })
+    return entries
+
+
+def sales_by_product(sales):
+    """Quantidade e receita por produto, em uma consulta."""
+    return list(sales.values('product__name').annotate(
+        total_quantity=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ))
+
+
+def period_comparison(sales, start_date, end_date, previous_start):
+    """
+    Totais do período (quantidade, receita, preço médio e número de vendas) e
+    a receita do período anterior (previous_start até a véspera de
+    start_date), em uma consulta.
+    """
+    current = Q(game_date__range=[start_date, end_date])
+    totals = sales.filter(game_date__range=[previous_start, end_date]).aggregate(
+        total_quantity=Sum('quantity', filter=current),
+        total_revenue=Sum('revenue', filter=current),
+        unit_price_total=Sum('unit_price_total', filter=current),
+        total_transactions=Sum('sale_count', filter=current),
+        previous_revenue=Sum(
+            'revenue', filter=Q(game_date__range=[previous_start, start_date - timedelta(days=1)])
+        )
+    )
+    unit_price_total = totals.pop('unit_price_total')
+    totals['avg_unit_price'] = (
+        unit_price_total / totals['total_transactions'] if totals['total_transactions'] else None
+    )
+    return totals
@@ -0,0 +1,107 @@
+"""
+Catálogo de produtos versionado e guardado em memória.
+
+O catálogo (nome, preços, categoria, fornecedor, limites de estoque) muda
+raramente e é o mesmo para todos os jogadores; o estoque muda a cada venda e
+fica em SessionInventory. A lista de produtos junta o catálogo já serializado,
+reaproveitado enquanto a versão não muda, com o estoque da sessão do usuário,
+lido a cada requisição com uma consulta leve.
+"""
+
+import hashlib
+from datetime import date
+
+from django.db.models import Count, Max
+
+from .sync import encode_cursor, latest
+
+# Catálogo serializado da última versão vista: (versão, entradas)
+_catalog = (None, [])
+
+
+def catalog_version():
+    """
+    Versão do catálogo e a última alteração de produto, em uma consulta.
+
+    A versão muda com qualquer alteração em produtos (inclusive desativação),
+    categorias e fornecedores, com a quantidade de produtos e com a data, da
+    qual dependem os preços promocionais.
+    """
+    from ..models import Product
+
+    versions = Product.objects.aggregate(
+        products=Max('updated_at'),
+        categories=Max('category__updated_at'),
+        suppliers=Max('supplier__updated_at'),
+        count=Count('pk')
+    )
+    version = '{}-{}-{}'.format(
+        encode_cursor(versions['products'], versions['categories'], versions['suppliers']),
+        versions['count'],
+        date.today().toordinal()
+    )
+    return version, versions['products']
+
+
+def catalog_entries(version=None):
+    """
+    Produtos ativos serializados (ProductSerializer) com o estoque inicial.
+    A serialização só é refeita quando a versão do catálogo muda.
+    """
+    global _catalog
+    from ..models import Product
+    from ..serializers import ProductSerializer
+
+    if version is None:
+        version, _ = catalog_version()
+    cached_version, entries = _catalog
+    if cached_version == version:
+        return entries
+
+    products = Product.objects.filter(is_active=True).select_related('category', 'supplier')
+    entries = [dict(entry) for entry in ProductSerializer(products, many=True).data]
+    _catalog = (version, entries)
+    return entries
+
+
+def session_stock(user):
+    """
+    Estoque da sessão do usuário por produto ({id: estoque}) e a última
+    alteração desse estoque.
+    """
+    from ..models import SessionInventory
+
+    stock = {}
+    version = None
+    for product_id, current_stock, updated_at in SessionInventory.objects.filter(
+        game_session__user=user
+    ).values_list('product_id', 'current_stock', 'updated_at'):
+        stock[str(product_id)] = current_stock
+        version = latest(version, updated_at)
+    return stock, version
+
+
+def with_stock(entry, stock):
+    """Aplica o estoque da sessão a uma entrada do catálogo."""
+    from ..models import Product
+
+    if stock is None:
+        return entry
+    return {**entry, **Product.stock_fields(stock, entry['min_stock'], entry['max_stock'])}
+
+
+def product_listing(user):
+    """
+    Lista de produtos ativos com o estoque da sessão do usuário.
+
+    Retorna (produtos, etag, sync_version): o ETag identifica o catálogo e o
+    estoque entregues; sync_version é a última alteração de produto ou de
+    estoque, usada pelo cursor de sincronização.
+    """
+    version, products_version = catalog_version()
+    entries = catalog_entries(version)
+    stock, stock_version = session_stock(user)
+
+    products = [with_stock(entry, stock.get(entry['id'])) for entry in entries]
+    etag = hashlib.sha1(f'{version}:{encode_cursor(stock_version)}'.encode()).hexdigest()
+    return products, etag, latest(products_version, stock_version)
@@ -0,0 +1,78 @@
+"""
+Relógio do jogo derivado da âncora da sessão.
+
+A âncora é o par (current_game_date, last_update_time): last_update_time é o
+instante real em que o dia current_game_date começou. Data e hora do jogo são
+calculadas a partir dela sem consultas nem gravações. Enquanto a sessão está
+pausada o relógio fica parado em paused_at.
+"""
+
+from datetime import time, timedelta
+
+from django.utils import timezone
+
+# Horário comercial: 6h às 22h (16 horas úteis por dia)
+BUSINESS_OPEN_HOUR = 6
+BUSINESS_HOURS = 16
+
+
+def business_time(day_fraction):
+    """Converte uma fração do dia em hora do horário comercial (6h às 22h)."""
+    seconds = int(day_fraction * BUSINESS_HOURS * 3600)
+    if seconds >= BUSINESS_HOURS * 3600:
+        return time(BUSINESS_OPEN_HOUR + BUSINESS_HOURS, 0, 0)
+    return time(BUSINESS_OPEN_HOUR + seconds // 3600, (seconds // 60) % 60, seconds % 60)
+
+
+class GameClock:
+    """
+    Data e hora atuais do jogo de uma sessão em um instante real.
+    """
+
+    def __init__(self, game_session, now=None):
+        self.session = game_session
+        self.now = now or timezone.now()
+
+    @property
+    def reference_time(self):
+        """Instante real considerado: o da pausa, se pausado, ou o atual."""
+        return self.session.paused_at or self.now
+
+    @property
+    def elapsed_seconds(self):
+        """Segundos reais desde o início do dia da âncora."""
+        return max(0.0, (self.reference_time - self.session.last_update_time).total_seconds())
+
+    @property
+    def pending_days(self):
+        """Dias completos decorridos desde a âncora, limitados ao fim do jogo."""
+        days = int(self.elapsed_seconds // self.session.time_acceleration)
+        return min(days, self.session.days_remaining)
+
+    @property
+    def day_fraction(self):
+        """Fração (0-1) já decorrida do dia atual do jogo."""
+        seconds = self.elapsed_seconds - self.pending_days * self.session.time_acceleration
+        return min(1.0, seconds / self.session.time_acceleration)
+
+    @property
+    def game_date(self):
+        return self.session.current_game_date + timedelta(days=self.pending_days)
+
+    @property
+    def game_time(self):
+        return business_time(self.day_fraction)
+
+    @property
+    def is_market_open(self):
+        return BUSINESS_OPEN_HOUR <= self.game_time.hour < BUSINESS_OPEN_HOUR + BUSINESS_HOURS
+
+    def time_at(self, day_fraction):
+        """Instante real em que o dia atual do jogo atinge a fração informada."""
+        return self.session.last_update_time + timedelta(
+            seconds=(self.pending_days + day_fraction) * self.session.time_acceleration
+        )
+
+    def anchor_after(self, days):
+        """Nova âncora após materializar days dias, preservando a fração do dia."""
+        return self.session.last_update_time + timedelta(seconds=days * self.session.time_acceleration)
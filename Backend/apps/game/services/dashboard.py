@@ -0,0 +1,166 @@
+"""
+Montagem do estado do dashboard do jogo.
+"""
+
+from django.db.models import Count, F, Max, Q, Sum
+
+from .sync import encode_cursor, latest
+
+# Quantidade de vendas em tempo real exibidas no dashboard
+REALTIME_SALES_LIMIT = 20
+
+
+def _product_counts(game_session):
+    """
+    Contadores do estoque da sessão e versão dos produtos (estoque da sessão
+    ou catálogo, o que mudou por último) em uma única consulta.
+    """
+    from ..models import SessionInventory
+
+    active = Q(product__is_active=True)
+    counts = SessionInventory.objects.filter(game_session=game_session).aggregate(
+        total=Count('pk', filter=active),
+        low_stock=Count('pk', filter=active & Q(current_stock__lte=F('product__min_stock'), current_stock__gt=0)),
+        out_of_stock=Count('pk', filter=active & Q(current_stock=0)),
+        stock_version=Max('updated_at'),
+        catalog_version=Max('product__updated_at')
+    )
+    counts['version'] = latest(counts.pop('stock_version'), counts.pop('catalog_version'))
+    return counts
+
+
+def _products_data(product_counts):
+    return {
+        'total': product_counts['total'],
+        'low_stock': product_counts['low_stock'],
+        'out_of_stock': product_counts['out_of_stock']
+    }
+
+
+def _stock_alerts_data(product_counts):
+    low_stock_products = product_counts['low_stock']
+    out_of_stock_products = product_counts['out_of_stock']
+    return {
+        'low_stock_count': low_stock_products,
+        'out_of_stock_count': out_of_stock_products,
+        'has_alerts': low_stock_products > 0 or out_of_stock_products > 0
+    }
+
+
+def _balance_data(user_balance):
+    return {
+        'current_balance': user_balance.current_balance,
+        'balance_formatted': user_balance.balance_formatted
+    }
+
+
+def _sales_data(sales_summary):
+    return {
+        'total_sales': sales_summary['total_sales'] or 0,
+        'total_revenue': sales_summary['total_revenue'] or 0
+    }
+
+
+def _sales_summary(game_session):
+    """Totais de vendas da sessão, lidos do agregado diário."""
+    from ..models import DailySalesRollup
+
+    return DailySalesRollup.objects.filter(game_session=game_session).aggregate(
+        total_sales=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    )
+
+
+def _realtime_sales(game_session, since=None):
+    from ..models import RealtimeSale
+
+    # Vendas em tempo real apenas do dia atual do jogo
+    sales = RealtimeSale.objects.filter(
+        game_session=game_session,
+        game_date=game_session.current_game_date
+    )
+    if since is not None:
+        sales = sales.filter(sequence__gt=since)
+    return sales.select_related('product', 'product__category').order_by('-game_time')[:REALTIME_SALES_LIMIT]
+
+
+def dashboard_cursor(game_session, user_balance, products_version):
+    """
+    Cursor que identifica o estado do dashboard entregue ao cliente. A parte
+    das vendas é a sequência de vendas da sessão (GameSession.sales_sequence),
+    não uma marca de tempo: com marcas de tempo, uma venda gravada por uma
+    transação que termina depois de outra com marca posterior seria pulada.
+    """
+    return encode_cursor(
+        game_session.updated_at, game_session.sales_sequence, products_version, user_balance.last_updated
+    )
+
+
+def dashboard_snapshot(game_session, user_balance):
+    """
+    Retorna os dados do dashboard reaproveitando a sessão e o saldo já
+    carregados. Os contadores de produtos saem de uma única consulta agregada.
+    """
+    from ..serializers import GameSessionSerializer, RealtimeSaleSerializer
+
+    product_counts = _product_counts(game_session)
+
+    # Resumo de vendas da sessão atual
+    sales_summary = _sales_summary(game_session)
+
+    return {
+        'game_session': GameSessionSerializer(game_session).data,
+        'balance': _balance_data(user_balance),
+        'products': _products_data(product_counts),
+        'sales': _sales_data(sales_summary),
+        'stock_alerts': _stock_alerts_data(product_counts),
+        'realtime_sales': RealtimeSaleSerializer(_realtime_sales(game_session), many=True).data,
+        'cursor': dashboard_cursor(game_session, user_balance, product_counts['version'])
+    }
+
+
+def dashboard_changes(game_session, user_balance, cursor):
+    """
+    Retorna apenas o que mudou desde o cursor informado (tupla decodificada
+    de session, sales, products, balance) ou None se nada mudou.
+
+    Só as partes alteradas aparecem na resposta: a sessão, o saldo, as vendas
+    novas com o resumo recalculado e o estoque dos produtos modificados.
+    """
+    from ..models import SessionInventory
+    from ..serializers import GameSessionSerializer, RealtimeSaleSerializer
+
+    session_since, sales_since, products_since, balance_since = cursor
+    changes = {}
+
+    if game_session.updated_at > session_since:
+        changes['game_session'] = GameSessionSerializer(game_session).data
+
+    if user_balance.last_updated > balance_since:
+        changes['balance'] = _balance_data(user_balance)
+
+    # Vendas: a sequência da sessão já carregada diz se houve gravação nova
+    if game_session.sales_sequence > sales_since:
+        changes['sales'] = _sales_data(_sales_summary(game_session))
+        realtime_sales = _realtime_sales(game_session, sales_since)
+        if realtime_sales:
+            changes['realtime_sales'] = RealtimeSaleSerializer(realtime_sales, many=True).data
+
+    product_counts = _product_counts(game_session)
+    products_version = product_counts['version']
+    if products_version is not None and products_version > products_since:
+        changes['products'] = _products_data(product_counts)
+        changes['stock_alerts'] = _stock_alerts_data(product_counts)
+        changes['stock'] = [
+            {'id': pk, 'current_stock': current_stock, 'is_active': is_active}
+            for pk, current_stock, is_active in SessionInventory.objects.filter(
+                Q(updated_at__gt=products_since) | Q(product__updated_at__gt=products_since),
+                game_session=game_session
+            ).values_list('product_id', 'current_stock', 'product__is_active')
+        ]
+
+    if not changes:
+        return None
+
+    changes['cursor'] = dashboard_cursor(game_session, user_balance, latest(products_since, products_version))
+    return changes
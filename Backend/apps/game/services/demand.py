@@ -0,0 +1,211 @@
+"""
+Motores de demanda para as vendas automáticas do jogo.
+
+Um motor gera de uma só vez todas as chegadas de clientes de um dia do jogo
+(processo de Poisson sobre o horário comercial de 6h às 22h). O tick apenas
+recorta o intervalo de chegadas correspondente ao tempo decorrido e distribui
+as quantidades respeitando o estoque disponível.
+"""
+
+import random
+from bisect import bisect_left
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy é opcional
+    np = None
+
+
+class DayDemand:
+    """
+    Chegadas de clientes de um dia do jogo, ordenadas pelo horário.
+
+    offsets: fração do dia comercial (0-1) em que cada cliente chega.
+    picks: número aleatório (0-1) usado para escolher o produto.
+    quantities: quantidade desejada por cada cliente.
+    """
+
+    def __init__(self, offsets, picks, quantities):
+        self.offsets = offsets
+        self.picks = picks
+        self.quantities = quantities
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def arrivals_until(self, day_fraction):
+        """Retorna quantos clientes chegaram antes da fração do dia informada."""
+        if np is not None and isinstance(self.offsets, np.ndarray):
+            return int(np.searchsorted(self.offsets, day_fraction, side='left'))
+        return bisect_left(self.offsets, day_fraction)
+
+
+class DemandEngine:
+    """
+    Interface dos motores de demanda.
+
+    Cada chegada pede de 1 a max_quantity unidades de um produto, tanto nas
+    vendas em tempo real quanto na recuperação de dias inteiros: o volume de
+    um dia é o número de chegadas (Poisson de média daily_sales_target) vezes
+    essa quantidade.
+    """
+    max_quantity = 3
+
+    def plan_day(self, sales_target, seed):
+        """
+        Gera as chegadas de um dia inteiro. Todos os ticks do mesmo dia pedem
+        o mesmo plano, que fica em cache por motor e parâmetros.
+        """
+        return _planned_day(type(self), self.max_quantity, sales_target, seed)
+
+    @staticmethod
+    def draw_day(sales_target, seed, max_quantity):
+        """Sorteia as chegadas de um dia inteiro. Deve ser determinístico pela semente."""
+        raise NotImplementedError
+
+    def allocate(self, demand, stock, start=0, end=None, sampler=None):
+        """
+        Distribui as chegadas [start:end] entre os produtos.
+
+        stock é a lista de estoques do catálogo e é atualizada no lugar.
+        sampler (ProductSampler) pondera a escolha pela popularidade; sem ele
+        a escolha é uniforme. Produtos esgotados são removidos do sampler.
+        Retorna tuplas (offset, índice do produto, quantidade) apenas para as
+        chegadas que encontraram estoque.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _choose(picks, product_count, sampler=None):
+        """Converte os números aleatórios em índices de produtos (-1 para nenhum)."""
+        if sampler is not None:
+            return sampler.choose(picks)
+        if np is not None and isinstance(picks, np.ndarray):
+            return np.minimum((picks * product_count).astype(np.int64), product_count - 1)
+        return [min(int(pick * product_count), product_count - 1) for pick in picks]
+
+
+class PythonDemandEngine(DemandEngine):
+    """
+    Motor de demanda em Python puro, usado quando o NumPy não está instalado.
+    """
+
+    @staticmethod
+    def draw_day(sales_target, seed, max_quantity):
+        rng = random.Random(seed)
+        offsets, picks, quantities = [], [], []
+        if sales_target > 0:
+            # Intervalos exponenciais entre chegadas formam um processo de Poisson
+            moment = rng.expovariate(sales_target)
+            while moment < 1:
+                offsets.append(moment)
+                picks.append(rng.random())
+                quantities.append(rng.randint(1, max_quantity))
+                moment += rng.expovariate(sales_target)
+        return DayDemand(offsets, picks, quantities)
+
+    def allocate(self, demand, stock, start=0, end=None, sampler=None):
+        if not stock:
+            return []
+
+        offsets = demand.offsets[start:end]
+        quantities = demand.quantities[start:end]
+        indexes = self._choose(demand.picks[start:end], len(stock), sampler)
+
+        sales = []
+        for offset, index, quantity in zip(offsets, indexes, quantities):
+            if index < 0:
+                continue
+            granted = min(quantity, stock[index])
+            if granted > 0:
+                stock[index] -= granted
+                sales.append((offset, index, granted))
+                if sampler is not None and stock[index] == 0:
+                    sampler.remove(index)
+        return sales
+
+
+class NumpyDemandEngine(DemandEngine):
+    """
+    Motor de demanda vetorizado com NumPy.
+    Sorteia o dia inteiro e resolve o estoque sem laços em Python por cliente.
+    """
+
+    @staticmethod
+    def draw_day(sales_target, seed, max_quantity):
+        rng = np.random.default_rng(seed)
+        count = rng.poisson(sales_target) if sales_target > 0 else 0
+        offsets = np.sort(rng.random(count))
+        picks = rng.random(count)
+        quantities = rng.integers(1, max_quantity + 1, count)
+        return DayDemand(offsets, picks, quantities)
+
+    def allocate(self, demand, stock, start=0, end=None, sampler=None):
+        quantities = demand.quantities[start:end]
+        if not stock or len(quantities) == 0:
+            return []
+
+        offsets = demand.offsets[start:end]
+        indexes = np.asarray(self._choose(demand.picks[start:end], len(stock), sampler))
+
+        # Chegadas sem produto disponível no sampler não compram nada
+        chosen = indexes >= 0
+        if not chosen.all():
+            offsets, quantities, indexes = offsets[chosen], quantities[chosen], indexes[chosen]
+            if len(indexes) == 0:
+                return []
+
+        # Estoque apenas dos produtos sorteados
+        products, groups = np.unique(indexes, return_inverse=True)
+        available = np.array([stock[index] for index in products.tolist()])
+
+        # Soma acumulada da demanda de cada produto na ordem de chegada
+        order = np.argsort(groups, kind='stable')
+        sorted_groups = groups[order]
+        sorted_quantities = quantities[order]
+        cumulative = np.cumsum(sorted_quantities)
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        group_base = np.repeat(cumulative[starts] - sorted_quantities[starts], np.diff(np.r_[starts, len(order)]))
+        demanded_before = cumulative - sorted_quantities - group_base
+
+        # Cada cliente leva o que pediu ou o que sobrou no estoque
+        granted = np.empty_like(quantities)
+        granted[order] = np.clip(available[sorted_groups] - demanded_before, 0, sorted_quantities)
+
+        sold = np.bincount(groups, weights=granted, minlength=len(products)).astype(np.int64)
+        for index, amount in zip(products.tolist(), sold.tolist()):
+            stock[index] -= amount
+            if sampler is not None and amount and stock[index] == 0:
+                sampler.remove(index)
+
+        keep = granted > 0
+        return list(zip(offsets[keep].tolist(), indexes[keep].tolist(), granted[keep].tolist()))
+
+
+@lru_cache(maxsize=256)
+def _planned_day(engine_class, max_quantity, sales_target, seed):
+    """Planos de dia já sorteados (o sorteio é determinístico pelos parâmetros)."""
+    return engine_class.draw_day(sales_target, seed, max_quantity)
+
+
+@lru_cache(maxsize=None)
+def _load_engine(path):
+    return import_string(path)()
+
+
+def get_demand_engine():
+    """
+    Retorna o motor de demanda configurado em GAME_DEMAND_ENGINE.
+    Sem configuração, usa o motor NumPy quando disponível.
+    """
+    path = getattr(settings, 'GAME_DEMAND_ENGINE', None)
+    if not path:
+        if np is not None:
+            path = 'apps.game.services.demand.NumpyDemandEngine'
+        else:
+            path = 'apps.game.services.demand.PythonDemandEngine'
+    return _load_engine(path)
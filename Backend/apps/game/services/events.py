@@ -0,0 +1,97 @@
+"""
+Publicação de eventos do jogo em memória (pub/sub por usuário).
+
+Suficiente para implantações com um único nó: o stream SSE de cada jogador
+assina os eventos do seu usuário e os recebe assim que a transação que os
+gerou é confirmada.
+"""
+
+import itertools
+import queue
+import threading
+
+from django.db import transaction
+
+
+class Subscription:
+    """Fila de eventos de um assinante."""
+
+    def __init__(self, broker, user_id, max_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=max_size)
+
+    def get(self, timeout=None):
+        """Retorna o próximo evento (id, nome, dados) ou None após o timeout."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """
+    Distribui eventos para as assinaturas de cada usuário.
+    Assinantes lentos perdem os eventos mais antigos em vez de bloquear o jogo.
+    """
+    max_queue_size = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id, self.max_queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions
+
+    def publish(self, user_id, event, data):
+        """Entrega o evento imediatamente a todas as assinaturas do usuário."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        if not subscriptions:
+            return
+
+        message = (next(self._ids), event, data)
+        for subscription in subscriptions:
+            while True:
+                try:
+                    subscription.queue.put_nowait(message)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+
+
+broker = EventBroker()
+
+
+def publish_event(user_id, event, data):
+    """
+    Publica um evento após a confirmação da transação atual.
+    Sem assinantes do usuário, nada é feito. data pode ser uma função, chamada
+    apenas quando há assinantes, para evitar serializações desnecessárias.
+    """
+    if not broker.has_subscribers(user_id):
+        return
+    if callable(data):
+        data = data()
+    transaction.on_commit(lambda: broker.publish(user_id, event, data))
@@ -0,0 +1,41 @@
+"""
+Intervalo sugerido ao cliente até a próxima consulta do tempo do jogo.
+"""
+
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def next_tick_at(game_session, now=None):
+    """
+    Instante em que vale a pena consultar o jogo de novo: o próximo evento da
+    sessão, limitado a GAME_POLL_MIN_SECONDS e GAME_POLL_MAX_SECONDS a partir
+    de agora. Com o relógio parado o cliente espera o intervalo máximo.
+    """
+    now = now or timezone.now()
+    earliest = now + timedelta(seconds=settings.GAME_POLL_MIN_SECONDS)
+    latest = now + timedelta(seconds=settings.GAME_POLL_MAX_SECONDS)
+
+    next_event = game_session.next_event_at(now)
+    if next_event is None:
+        return latest
+    return min(max(next_event, earliest), latest)
+
+
+def add_polling_hint(response, game_session, now=None):
+    """
+    Acrescenta next_tick_at e retry_after ao corpo da resposta (quando houver)
+    e o cabeçalho Retry-After em segundos.
+    """
+    now = now or timezone.now()
+    moment = next_tick_at(game_session, now)
+    retry_after = max(1, math.ceil((moment - now).total_seconds()))
+
+    if isinstance(response.data, dict):
+        response.data['next_tick_at'] = moment
+        response.data['retry_after'] = retry_after
+    response['Retry-After'] = str(retry_after)
+    return response
@@ -0,0 +1,18 @@
+"""
+Categorias de produtos e fornecedores lidos do registro de dados de referência.
+"""
+
+from apps.core.registry import ReferenceRegistry
+
+product_categories = ReferenceRegistry('game.ProductCategory')
+suppliers = ReferenceRegistry('game.Supplier')
+
+
+def product_category(name):
+    """Categoria de produto com o nome informado, ou None."""
+    return product_categories.get(name)
+
+
+def supplier(name):
+    """Fornecedor com o nome informado, ou None."""
+    return suppliers.get(name)
@@ -0,0 +1,246 @@
+"""
+Escrita em lote das vendas automáticas do jogo.
+"""
+
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from apps.core.caching import invalidate_user
+
+from .events import publish_event
+
+logger = logging.getLogger(__name__)
+
+
+class SalesBatch:
+    """
+    Acumula as vendas de um tick em memória e grava tudo de uma vez.
+
+    Cada venda adicionada atualiza apenas o estoque em memória, partindo do
+    estoque da sessão (SessionInventory). No commit o estoque da sessão é
+    decrementado com um único UPDATE condicional baseado em F(); se outra
+    operação reduziu o estoque depois da leitura, as quantidades são
+    ajustadas ao estoque atual e o UPDATE é repetido uma vez. O histórico
+    de estoque e as vendas em tempo real são gravados com bulk_create, o
+    agregado diário de vendas é atualizado e o saldo recebe uma transação por
+    data de jogo.
+    """
+
+    def __init__(self, game_session, description='Venda automática'):
+        self.game_session = game_session
+        self.description = description
+        self.sales = []
+        self._stock = None
+
+    def __len__(self):
+        return len(self.sales)
+
+    @property
+    def total_revenue(self):
+        """Receita total acumulada no lote."""
+        return sum((sale['revenue'] for sale in self.sales), Decimal('0.00'))
+
+    def available_stock(self, product):
+        """Retorna o estoque do produto na sessão considerando as vendas do lote."""
+        if self._stock is None:
+            from ..models import SessionInventory
+
+            self._stock = dict(
+                SessionInventory.objects.filter(game_session=self.game_session)
+                .values_list('product_id', 'current_stock')
+            )
+        return self._stock.get(product.pk, 0)
+
+    def add(self, product, quantity, game_date=None, game_time=None, sale_time=None):
+        """Adiciona uma venda ao lote e retorna a receita gerada."""
+        if quantity <= 0:
+            raise ValueError("Quantidade deve ser positiva")
+
+        stock = self.available_stock(product)
+        if stock < quantity:
+            raise ValueError("Estoque insuficiente")
+
+        unit_price = product.current_price
+        revenue = unit_price * quantity
+
+        self._stock[product.pk] = stock - quantity
+        self.sales.append({
+            'product': product,
+            'quantity': quantity,
+            'previous_stock': stock,
+            'new_stock': stock - quantity,
+            'unit_price': unit_price,
+            'revenue': revenue,
+            'game_date': game_date or self.game_session.current_game_date,
+            'game_time': game_time,
+            'sale_time': sale_time or timezone.now(),
+        })
+        return revenue
+
+    def commit(self):
+        """Grava o lote no banco. Retorna o novo saldo ou None se vazio."""
+        from apps.finance.models import Transaction
+        from apps.finance.registry import SALES, system_category
+        from ..models import DailySalesRollup, ProductStockHistory, RealtimeSale
+        from ..serializers import RealtimeSaleSerializer
+
+        if not self.sales:
+            return None
+
+        with transaction.atomic():
+            # Bloqueia a sessão antes do estoque e numera a gravação para o
+            # cursor do dashboard (GameSession.next_sales_sequence)
+            sequence = self.game_session.next_sales_sequence()
+            if not self._decrement_stock():
+                # Outra operação alterou o estoque depois da leitura
+                self._clamp_to_stock()
+                if not self._decrement_stock():
+                    raise ValueError("Estoque insuficiente")
+            if not self.sales:
+                self._stock = None
+                return None
+
+            history = ProductStockHistory.objects.bulk_create([
+                ProductStockHistory(
+                    game_session=self.game_session,
+                    product=sale['product'],
+                    operation='SALE',
+                    quantity=sale['quantity'],
+                    previous_stock=sale['previous_stock'],
+                    new_stock=sale['new_stock'],
+                    unit_price=sale['unit_price'],
+                    total_value=sale['revenue'],
+                    description=f"{self.description} - Dia {sale['game_date']}",
+                    game_date=sale['game_date']
+                )
+                for sale in self.sales
+            ])
+            # bulk_create não chama save(): soma as vendas ao agregado diário aqui
+            DailySalesRollup.record(self.game_session, history)
+
+            # Só registra venda em tempo real se o mercado estiver aberto (6h às 22h)
+            realtime_sales = RealtimeSale.objects.bulk_create([
+                RealtimeSale(
+                    game_session=self.game_session,
+                    product=sale['product'],
+                    quantity=sale['quantity'],
+                    unit_price=sale['unit_price'],
+                    total_value=sale['revenue'],
+                    sale_time=sale['sale_time'],
+                    game_date=sale['game_date'],
+                    game_time=sale['game_time'],
+                    sequence=sequence
+                )
+                for sale in self.sales
+                if sale['game_time'] is not None and RealtimeSale().is_market_open(sale['game_time'])
+            ])
+
+            # Um lançamento financeiro por data de jogo
+            vendas_category = system_category(SALES)
+            by_date = OrderedDict()
+            for sale in self.sales:
+                totals = by_date.setdefault(sale['game_date'], {'revenue': Decimal('0.00'), 'count': 0})
+                totals['revenue'] += sale['revenue']
+                totals['count'] += 1
+
+            new_balance = Transaction.post_batch(self.game_session.user, [
+                Transaction(
+                    category=vendas_category,
+                    amount=totals['revenue'],
+                    transaction_type='INCOME',
+                    description=f"Vendas automáticas - {totals['count']} vendas",
+                    transaction_date=game_date
+                )
+                for game_date, totals in by_date.items()
+                if totals['revenue'] > 0
+            ])
+
+            user_id = self.game_session.user_id
+            # Histórico gravado em lote (sem post_save): invalida os relatórios de vendas
+            invalidate_user('sales', user_id)
+            if realtime_sales:
+                publish_event(user_id, 'sales', lambda: RealtimeSaleSerializer(realtime_sales, many=True).data)
+            publish_event(user_id, 'balance', {'current_balance': new_balance})
+
+        self.sales = []
+        self._stock = None
+        return new_balance
+
+    def _sold(self):
+        """Quantidade vendida de cada produto no lote."""
+        sold = OrderedDict()
+        for sale in self.sales:
+            sold[sale['product'].pk] = sold.get(sale['product'].pk, 0) + sale['quantity']
+        return sold
+
+    def _decrement_stock(self):
+        """
+        Decrementa o estoque da sessão de todos os produtos em um único UPDATE.
+        Retorna False, sem alterar nada, se algum produto não tem mais o
+        estoque vendido.
+        """
+        from ..models import SessionInventory
+
+        sold = self._sold()
+        if not sold:
+            return True
+
+        condition = Q()
+        for pk, quantity in sold.items():
+            condition |= Q(product_id=pk, current_stock__gte=quantity)
+
+        savepoint = transaction.savepoint()
+        updated = SessionInventory.objects.filter(condition, game_session=self.game_session).update(
+            current_stock=Case(
+                *[When(product_id=pk, then=F('current_stock') - Value(quantity)) for pk, quantity in sold.items()],
+                output_field=IntegerField()
+            ),
+            updated_at=timezone.now()
+        )
+        if updated != len(sold):
+            transaction.savepoint_rollback(savepoint)
+            return False
+        transaction.savepoint_commit(savepoint)
+        return True
+
+    def _clamp_to_stock(self):
+        """
+        Relê o estoque dos produtos do lote (bloqueando as linhas) e reduz as
+        vendas, na ordem em que foram adicionadas, ao que ainda há em estoque.
+        Vendas sem estoque restante são descartadas.
+        """
+        from ..models import SessionInventory
+
+        stock = dict(
+            SessionInventory.objects.select_for_update()
+            .filter(game_session=self.game_session, product_id__in=self._sold())
+            .values_list('product_id', 'current_stock')
+        )
+
+        sales, dropped = [], 0
+        for sale in self.sales:
+            available = stock.get(sale['product'].pk, 0)
+            quantity = min(sale['quantity'], available)
+            dropped += sale['quantity'] - quantity
+            if quantity <= 0:
+                continue
+            stock[sale['product'].pk] = available - quantity
+            sale.update(
+                quantity=quantity,
+                previous_stock=available,
+                new_stock=available - quantity,
+                revenue=sale['unit_price'] * quantity
+            )
+            sales.append(sale)
+
+        logger.warning(
+            'Estoque alterado durante o lote de vendas da sessão %s: %s unidades descartadas',
+            self.game_session.pk, dropped
+        )
+        self.sales = sales
+        self._stock = stock
@@ -0,0 +1,224 @@
+"""
+Amostragem ponderada de produtos para as vendas automáticas.
+
+Usa tabelas de alias de Walker (algoritmo de Vose): a escolha de um produto
+custa O(1) independentemente do tamanho do catálogo. Produtos esgotados são
+removidos incrementalmente e a tabela só é reconstruída quando mais da metade
+do peso foi removida. Uma escolha que esgota as tentativas percorre
+diretamente os produtos em estoque: só não há venda quando nada resta.
+"""
+
+from collections import OrderedDict
+import hashlib
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy é opcional
+    np = None
+
+
+def product_weight(category_name):
+    """Peso de popularidade de um produto, configurado por categoria."""
+    popularity = getattr(settings, 'GAME_CATEGORY_POPULARITY', {})
+    return float(popularity.get(category_name, 1.0))
+
+
+def load_catalog(game_session):
+    """
+    Carrega o estoque da sessão para os produtos ativos sem instanciar modelos.
+    Retorna (pks, estoques, sampler), todos na mesma ordem.
+    """
+    return load_catalogs([game_session])[game_session.pk]
+
+
+def load_catalogs(game_sessions):
+    """
+    Carrega de uma vez, em uma única consulta, os catálogos de várias sessões
+    (ex.: um lote do run_game_ticker). Os pesos por categoria são calculados
+    uma vez por lote. Retorna {id da sessão: (pks, estoques, sampler)}; sessões
+    sem estoque registrado recebem um catálogo vazio.
+    """
+    from apps.game.models import SessionInventory
+
+    session_ids = [getattr(game_session, 'pk', game_session) for game_session in game_sessions]
+    rows = SessionInventory.objects.filter(
+        game_session__in=session_ids, product__is_active=True
+    ).order_by('game_session_id', 'product_id').values_list(
+        'game_session_id', 'product_id', 'current_stock', 'product__category__name'
+    )
+
+    columns = {session_id: ([], [], []) for session_id in session_ids}
+    category_weights = {}
+    for session_id, pk, current_stock, category_name in rows:
+        if category_name not in category_weights:
+            category_weights[category_name] = product_weight(category_name)
+        keys, stock, weights = columns[session_id]
+        keys.append(pk)
+        stock.append(current_stock)
+        weights.append(category_weights[category_name] if current_stock > 0 else 0.0)
+    return {session_id: _build_catalog(*catalog) for session_id, catalog in columns.items()}
+
+
+def _build_catalog(keys, stock, weights):
+    return keys, stock, ProductSampler.for_catalog(keys, weights)
+
+
+class ProductSampler:
+    """
+    Tabela de alias sobre os índices de um catálogo de produtos.
+
+    choose() recebe números aleatórios em [0, 1) e devolve índices de
+    produtos (ou -1 quando nenhum produto tem estoque).
+    """
+    max_retries = 4
+    _cache = OrderedDict()
+    _cache_size = 32
+
+    def __init__(self, weights):
+        self.weights = [float(weight) for weight in weights]
+        self.removed = [weight <= 0 for weight in self.weights]
+        self._build()
+
+    def __len__(self):
+        return len(self.weights)
+
+    @property
+    def is_empty(self):
+        return self.live_mass <= 0
+
+    @classmethod
+    def for_catalog(cls, keys, weights):
+        """
+        Retorna um amostrador para o catálogo, reaproveitando a tabela já
+        construída para a mesma versão (chaves e pesos). Cada chamada recebe
+        uma cópia própria, que pode ser alterada com remove().
+        """
+        digest = hashlib.sha1(repr((list(keys), list(weights))).encode()).hexdigest()
+        sampler = cls._cache.get(digest)
+        if sampler is None:
+            sampler = cls(weights)
+            cls._cache[digest] = sampler
+            while len(cls._cache) > cls._cache_size:
+                cls._cache.popitem(last=False)
+        else:
+            cls._cache.move_to_end(digest)
+        return sampler.copy()
+
+    def copy(self):
+        clone = object.__new__(type(self))
+        clone.weights = list(self.weights)
+        clone.removed = list(self.removed)
+        clone.live_mass = self.live_mass
+        clone._built_mass = self._built_mass
+        clone.prob = self.prob.copy() if np is not None else list(self.prob)
+        clone.alias = self.alias.copy() if np is not None else list(self.alias)
+        clone._removed_array = self._removed_array.copy() if np is not None else None
+        return clone
+
+    def _build(self):
+        """Constrói as tabelas de probabilidade e alias (algoritmo de Vose)."""
+        weights = [0.0 if removed else weight for weight, removed in zip(self.weights, self.removed)]
+        count = len(weights)
+        total = sum(weights)
+        self.live_mass = total
+        self._built_mass = total
+
+        prob = [0.0] * count
+        alias = list(range(count))
+        if total > 0:
+            scaled = [weight * count / total for weight in weights]
+            small = [index for index, value in enumerate(scaled) if value < 1]
+            large = [index for index, value in enumerate(scaled) if value >= 1]
+            while small and large:
+                less, more = small.pop(), large.pop()
+                prob[less] = scaled[less]
+                alias[less] = more
+                scaled[more] -= 1 - scaled[less]
+                (small if scaled[more] < 1 else large).append(more)
+            for index in small + large:
+                prob[index] = 1.0
+
+        if np is not None:
+            self.prob = np.array(prob)
+            self.alias = np.array(alias, dtype=np.int64)
+            self._removed_array = np.array(self.removed, dtype=bool)
+        else:
+            self.prob = prob
+            self.alias = alias
+            self._removed_array = None
+
+    def remove(self, index):
+        """Remove um produto esgotado da amostragem."""
+        if self.removed[index]:
+            return
+        self.removed[index] = True
+        self.live_mass -= self.weights[index]
+        if self._removed_array is not None:
+            self._removed_array[index] = True
+
+        # Reconstrói quando a rejeição passaria a descartar metade das escolhas
+        if self.live_mass < self._built_mass / 2:
+            self._build()
+
+    def choose(self, picks):
+        """Converte números aleatórios em índices de produtos em O(1) cada."""
+        if np is not None and isinstance(picks, np.ndarray):
+            return self._choose_array(picks)
+        return [self._choose_one(pick) for pick in picks]
+
+    def _choose_one(self, pick):
+        count = len(self.weights)
+        if count == 0 or self.is_empty:
+            return -1
+        for attempt in range(self.max_retries + 1):
+            scaled = pick * count
+            column = min(int(scaled), count - 1)
+            index = column if scaled - column < self.prob[column] else int(self.alias[column])
+            if not self.removed[index]:
+                return index
+            pick = self._redraw(pick, attempt)
+        return self._scan(pick)
+
+    def _choose_array(self, picks):
+        count = len(self.weights)
+        if count == 0 or self.is_empty:
+            return np.full(len(picks), -1, dtype=np.int64)
+
+        indexes = np.empty(len(picks), dtype=np.int64)
+        pending = np.arange(len(picks))
+        current = picks
+        for attempt in range(self.max_retries + 1):
+            scaled = current * count
+            columns = np.minimum(scaled.astype(np.int64), count - 1)
+            chosen = np.where(scaled - columns < self.prob[columns], columns, self.alias[columns])
+            dead = self._removed_array[chosen]
+            indexes[pending] = chosen
+            if not dead.any():
+                return indexes
+            pending = pending[dead]
+            current = self._redraw(current[dead], attempt)
+        indexes[pending] = [self._scan(pick) for pick in current.tolist()]
+        return indexes
+
+    def _scan(self, pick):
+        """
+        Escolha para quem esgotou as tentativas: percorre os produtos ainda em
+        estoque pelo peso acumulado. Retorna -1 apenas sem produto disponível.
+        """
+        target = pick * self.live_mass
+        chosen = -1
+        for index, (weight, removed) in enumerate(zip(self.weights, self.removed)):
+            if removed or weight <= 0:
+                continue
+            chosen = index
+            target -= weight
+            if target < 0:
+                break
+        return chosen
+
+    @staticmethod
+    def _redraw(pick, attempt):
+        """Deriva um novo número aleatório determinístico a partir do anterior."""
+        return (pick * 7919 + 0.6180339887 * (attempt + 1)) % 1
@@ -0,0 +1,61 @@
+"""
+Cursor de sincronização incremental do dashboard e da lista de produtos.
+
+O cursor guarda a maior marca de tempo já vista de cada fonte de dados
+(sessão, produtos, saldo) codificada em microssegundos, ou um número de
+sequência para fontes cujas linhas podem ficar visíveis fora da ordem das
+marcas de tempo (as vendas). O cliente devolve o cursor recebido e o servidor
+responde só o que mudou depois dele.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(moment):
+    if moment is None:
+        return 0
+    if isinstance(moment, int):
+        return moment
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def encode_cursor(*moments):
+    """
+    Codifica as marcas de tempo (ou números de sequência) em um cursor opaco
+    ('123-456-...').
+    """
+    return '-'.join(str(_to_micros(moment)) for moment in moments)
+
+
+def decode_cursor(value, parts, sequences=()):
+    """
+    Decodifica um cursor com a quantidade de partes esperada. As posições em
+    sequences são devolvidas como números de sequência, as demais como
+    marcas de tempo. Levanta ValueError se o cursor for inválido.
+    """
+    pieces = str(value).split('-')
+    if len(pieces) != parts:
+        raise ValueError("Cursor inválido")
+    try:
+        micros = [int(piece) for piece in pieces]
+    except ValueError:
+        raise ValueError("Cursor inválido")
+    if any(value < 0 for value in micros):
+        raise ValueError("Cursor inválido")
+    return tuple(
+        value if index in sequences else _from_micros(value)
+        for index, value in enumerate(micros)
+    )
+
+
+def latest(*moments):
+    """Retorna a maior marca de tempo, ignorando valores vazios."""
+    present = [moment for moment in moments if moment is not None]
+    return max(present) if present else None
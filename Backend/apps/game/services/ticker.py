@@ -0,0 +1,62 @@
+"""
+Avanço do tempo de todas as sessões ativas pelo servidor.
+
+Usado pelo comando run_game_ticker: as sessões são divididas entre processos
+pela faixa do ticker (GameSession.ticker_slot) e processadas em lotes, cada
+uma com o seu próprio estoque.
+"""
+
+import logging
+
+from django.db import transaction
+
+from .sampler import load_catalogs
+
+logger = logging.getLogger(__name__)
+
+
+def active_session_ids(shard=0, shards=1):
+    """
+    Retorna os ids das sessões ativas que pertencem a este shard. O filtro
+    pelas faixas do shard é feito na consulta (índice status, ticker_slot).
+    """
+    from apps.game.models import GameSession
+    from apps.game.models.session_models import TICKER_SLOTS
+
+    sessions = GameSession.objects.filter(status='ACTIVE', is_active=True)
+    if shards > 1:
+        sessions = sessions.filter(ticker_slot__in=range(shard, TICKER_SLOTS, shards))
+    return list(sessions.values_list('pk', flat=True))
+
+
+def tick_sessions(session_ids, batch_size=100, max_days=None):
+    """
+    Avança o tempo das sessões informadas, em lotes.
+    Cada sessão é gravada na sua própria transação e só altera o próprio
+    estoque; uma falha não interrompe as demais. max_days limita os dias
+    processados por sessão em cada passagem. Os estoques e os pesos das
+    categorias das sessões com tick pendente em cada lote são carregados em
+    uma única consulta.
+    """
+    from apps.game.models import GameSession
+
+    stats = {'sessions': 0, 'days': 0, 'errors': 0}
+
+    for start in range(0, len(session_ids), batch_size):
+        chunk = session_ids[start:start + batch_size]
+        loaded = GameSession.objects.filter(pk__in=chunk, status='ACTIVE').select_related('user')
+        # Sessões sem evento pendente não precisam de catálogo nem de transação
+        sessions = [session for session in loaded if session.tick_due()]
+        stats['sessions'] += len(loaded) - len(sessions)
+        catalogs = load_catalogs(sessions)
+
+        for session in sessions:
+            try:
+                with transaction.atomic():
+                    stats['days'] += session.update_game_time(catalog=catalogs[session.pk], max_days=max_days)
+                stats['sessions'] += 1
+            except Exception:
+                logger.exception('Erro ao avançar a sessão %s', session.pk)
+                stats['errors'] += 1
+
+    return stats
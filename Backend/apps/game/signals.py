@@ -3,12 +3,30 @@ Sinais para o app de jogo.
 """
 
 from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.dispatch import receiver, Signal
 from django.contrib.auth import get_user_model
-from .models import GameSession, ProductCategory, Supplier, Product
+from .models import GameSession, ProductCategory, Supplier, Product, SessionInventory
+from apps.finance.models import UserBalance
+from apps.finance.signals import balance_changed
+from .services.reference import product_category, supplier
+from apps.core.caching import invalidate_on
 
 User = get_user_model()
 
+# Enviado (sender=GameSession) quando um mês do jogo começa em uma sessão ativa,
+# com os argumentos game_session e month (primeiro dia do mês). Meses cruzados
+# de uma só vez são enviados em ordem.
+game_month_started = Signal()
+
+# Relatórios de vendas em cache (o histórico em lote invalida no SalesBatch)
+invalidate_on(
+    'game.ProductStockHistory',
+    'sales',
+    lambda history: history.game_session.user_id if history.game_session_id else None,
+    signals=(post_save,)
+)
+
+
 @receiver(post_save, sender=User)
 def create_user_balance_and_game_session(sender, instance, created, **kwargs):
     """Cria saldo e sessão de jogo quando um novo usuário é criado."""
@@ -38,19 +56,50 @@ def create_user_balance_and_game_session(sender, instance, created, **kwargs):
             create_default_products()
 
 
+@receiver(post_save, sender=GameSession)
+def create_session_inventory(sender, instance, created, **kwargs):
+    """Cria o estoque da nova sessão a partir do estoque inicial do catálogo."""
+    if created:
+        SessionInventory.seed(game_sessions=[instance])
+
+
+@receiver(post_save, sender=Product)
+def add_product_to_inventories(sender, instance, created, **kwargs):
+    """Inclui o novo produto no estoque de todas as sessões."""
+    if created:
+        SessionInventory.seed(products=[instance])
+
+
+@receiver(post_save, sender=UserBalance)
+def publish_balance_change(sender, instance, **kwargs):
+    """Publica alterações de saldo para os streams do usuário."""
+    from .services.events import publish_event
+    
+    publish_event(instance.user_id, 'balance', lambda: {'current_balance': instance.current_balance})
+
+
+@receiver(balance_changed, sender=UserBalance)
+def publish_balance_update(sender, user_balance, **kwargs):
+    """Publica alterações de saldo feitas por UPDATE direto (add/subtract_amount)."""
+    publish_balance_change(sender, user_balance)
+
+
 def create_default_products():
     """Cria produtos padrão para o supermercado."""
     try:
         # Busca categorias e fornecedores
-        alimentos = ProductCategory.objects.get(name='Alimentos')
-        bebidas = ProductCategory.objects.get(name='Bebidas')
-        limpeza = ProductCategory.objects.get(name='Limpeza')
-        carnes = ProductCategory.objects.get(name='Carnes')
-        padaria = ProductCategory.objects.get(name='Padaria')
+        alimentos = product_category('Alimentos')
+        bebidas = product_category('Bebidas')
+        limpeza = product_category('Limpeza')
+        carnes = product_category('Carnes')
+        padaria = product_category('Padaria')
+        
+        central = supplier('Distribuidora Central')
+        express = supplier('Fornecedor Express')
+        mega = supplier('Mega Distribuidora')
         
-        central = Supplier.objects.get(name='Distribuidora Central')
-        express = Supplier.objects.get(name='Fornecedor Express')
-        mega = Supplier.objects.get(name='Mega Distribuidora')
+        if not all([alimentos, bebidas, limpeza, carnes, padaria, central, express, mega]):
+            raise ProductCategory.DoesNotExist('Categorias ou fornecedores padrão não encontrados')
         
         # Produtos padrão
         default_products = [
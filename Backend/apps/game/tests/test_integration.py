@@ -17,7 +17,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from apps.game.models import (
     GameSession, ProductCategory, Supplier, Product, 
-    ProductStockHistory, RealtimeSale
+    ProductStockHistory, RealtimeSale, SessionInventory
 )
 from apps.finance.models import UserBalance, Transaction, Category
 
@@ -111,9 +111,9 @@ class TestGameFlowIntegration(TransactionTestCase):
         
         self.assertEqual(purchase_response.status_code, status.HTTP_200_OK)
         
-        # Verificar estoque atualizado
-        product.refresh_from_db()
-        self.assertEqual(product.current_stock, 50)
+        # Verificar estoque da sessão atualizado
+        inventory = SessionInventory.objects.get(game_session__user=self.user, product=product)
+        self.assertEqual(inventory.current_stock, 50)
         
         # Verificar saldo após compra (deve ter reduzido)
         self.user_balance.refresh_from_db()
@@ -158,8 +158,8 @@ class TestGameFlowIntegration(TransactionTestCase):
         self.assertEqual(sale_response_2.status_code, status.HTTP_200_OK)
         
         # Verificar estoque após vendas
-        product.refresh_from_db()
-        self.assertEqual(product.current_stock, 35)  # 50 - 5 - 10
+        inventory = SessionInventory.objects.get(game_session__user=self.user, product=product)
+        self.assertEqual(inventory.current_stock, 35)  # 50 - 5 - 10
         
         # Verificar saldo após vendas
         self.user_balance.refresh_from_db()
@@ -390,8 +390,8 @@ class TestPerformanceIntegration(TransactionTestCase):
         
         # Verificar que todos os produtos foram reabastecidos
         for product in products:
-            product.refresh_from_db()
-            self.assertEqual(product.current_stock, product.max_stock)
+            inventory = SessionInventory.objects.get(game_session__user=self.user, product=product)
+            self.assertEqual(inventory.current_stock, product.max_stock)
 
     def test_bulk_sales_performance(self):
         """
@@ -434,8 +434,8 @@ class TestPerformanceIntegration(TransactionTestCase):
                        f"100 vendas levaram {execution_time:.2f}s, esperado < 10s")
         
         # Verificar estoque final
-        product.refresh_from_db()
-        self.assertEqual(product.current_stock, 500)  # 1000 - (100 * 5)
+        inventory = SessionInventory.objects.get(game_session__user=self.user, product=product)
+        self.assertEqual(inventory.current_stock, 500)  # 1000 - (100 * 5)
 
 
 @pytest.mark.integration
@@ -525,27 +525,27 @@ class TestConcurrencyIntegration(TransactionTestCase):
         successful_sales = sum(results)
         
         # Verificar estoque final
-        product.refresh_from_db()
+        inventory = SessionInventory.objects.get(game_session__user=self.user, product=product)
         
         # O estoque não deve ser negativo
-        self.assertGreaterEqual(product.current_stock, 0)
+        self.assertGreaterEqual(inventory.current_stock, 0)
         
         # Verificar que nem todas as vendas foram bem-sucedidas (devido ao estoque limitado)
         # ou que o estoque nunca ficou negativo
         self.assertLessEqual(successful_sales, 15)
         
         # Verificar que o estoque nunca ficou negativo
-        self.assertGreaterEqual(product.current_stock, 0)
+        self.assertGreaterEqual(inventory.current_stock, 0)
         
         # Se todas as vendas foram bem-sucedidas, verificar se o estoque era suficiente
         # ou verificar que houve controle adequado
         if successful_sales == 15:
             # Todas vendas foram bem-sucedidas, estoque deve estar zerado ou próximo
-            self.assertLessEqual(product.current_stock, 100)
+            self.assertLessEqual(inventory.current_stock, 100)
         else:
             # Algumas falharam, verificar lógica de estoque
             expected_max_stock = 100 - (successful_sales * 10)
-            self.assertLessEqual(product.current_stock, expected_max_stock)
+            self.assertLessEqual(inventory.current_stock, expected_max_stock)
 
     def test_concurrent_balance_updates(self):
         """
@@ -673,10 +673,10 @@ class TestConcurrencyIntegration(TransactionTestCase):
                     results[operation_type] += 1
         
         # Verificar estoque final
-        product.refresh_from_db()
+        inventory = SessionInventory.objects.get(game_session__user=self.user, product=product)
         
         # Verificar que o estoque não ficou negativo
-        self.assertGreaterEqual(product.current_stock, 0)
+        self.assertGreaterEqual(inventory.current_stock, 0)
         
         # Verificar que houve alguma movimentação
         self.assertGreater(results['purchase'] + results['sale'], 0)
@@ -0,0 +1,117 @@
+"""
+Testes para o modelo de estoque por sessão.
+"""
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+
+from apps.game.models import GameSession, ProductCategory, Supplier, Product, ProductStockHistory, SessionInventory
+
+User = get_user_model()
+
+
+class TestSessionInventoryModel(TestCase):
+    """Testes para o modelo SessionInventory."""
+
+    def setUp(self):
+        self.category = ProductCategory.objects.create(name='Alimentos')
+        self.supplier = Supplier.objects.create(name='Fornecedor Teste')
+        self.product = Product.objects.create(
+            name='Arroz 5kg',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('15.00'),
+            sale_price=Decimal('20.00'),
+            current_stock=50,
+            min_stock=10,
+            max_stock=100
+        )
+        self.sessions = []
+        for index in range(2):
+            user = User.objects.create_user(
+                username=f'player{index}',
+                email=f'player{index}@example.com',
+                password='testpass123',
+                first_name='Player',
+                last_name=str(index)
+            )
+            self.sessions.append(GameSession.objects.get(user=user))
+
+    def _stock(self, game_session, product=None):
+        return game_session.inventory.get(product=product or self.product).current_stock
+
+    def test_new_session_copies_initial_stock(self):
+        """Testa que cada sessão nova recebe o estoque inicial do catálogo."""
+        for game_session in self.sessions:
+            self.assertEqual(self._stock(game_session), 50)
+
+    def test_new_product_is_added_to_every_session(self):
+        """Testa que um produto novo entra no estoque de todas as sessões."""
+        product = Product.objects.create(
+            name='Feijão 1kg',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('8.00'),
+            sale_price=Decimal('12.00'),
+            current_stock=30
+        )
+
+        for game_session in self.sessions:
+            self.assertEqual(self._stock(game_session, product), 30)
+
+    def test_sessions_do_not_share_stock(self):
+        """Testa que vendas e compras de uma sessão não afetam as outras."""
+        SessionInventory.remove(self.sessions[0], self.product, 20)
+        SessionInventory.add(self.sessions[1], self.product, 30)
+
+        self.assertEqual(self._stock(self.sessions[0]), 30)
+        self.assertEqual(self._stock(self.sessions[1]), 80)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 50)
+
+    def test_stock_limits(self):
+        """Testa os limites de estoque mínimo (zero) e máximo."""
+        inventory = self.sessions[0].inventory.get(product=self.product)
+
+        with self.assertRaisesMessage(ValueError, 'Estoque insuficiente'):
+            inventory.remove_stock(51)
+        with self.assertRaisesMessage(ValueError, 'Máximo permitido: 100'):
+            inventory.add_stock(51)
+
+        self.assertEqual(inventory.add_stock(50), 100)
+        self.assertEqual(inventory.remove_stock(100), 0)
+        self.assertTrue(inventory.is_out_of_stock)
+
+    def test_reset_only_touches_own_session(self):
+        """Testa que o reset restaura apenas o estoque e o histórico da própria sessão."""
+        for game_session in self.sessions:
+            SessionInventory.remove(game_session, self.product, 40)
+            ProductStockHistory.objects.create(
+                game_session=game_session,
+                product=self.product,
+                operation='SALE',
+                quantity=40,
+                previous_stock=50,
+                new_stock=10
+            )
+
+        self.sessions[0].reset_game()
+
+        self.assertEqual(self._stock(self.sessions[0]), 50)
+        self.assertEqual(self._stock(self.sessions[1]), 10)
+        self.assertFalse(ProductStockHistory.objects.filter(game_session=self.sessions[0]).exists())
+        self.assertTrue(ProductStockHistory.objects.filter(game_session=self.sessions[1]).exists())
+
+    def test_annotate_products_uses_user_session(self):
+        """Testa que os produtos exibem o estoque da sessão do usuário."""
+        SessionInventory.remove(self.sessions[0], self.product, 45)
+
+        product = SessionInventory.annotate_products(
+            Product.objects.filter(pk=self.product.pk), self.sessions[0].user
+        ).get()
+
+        self.assertEqual(product.session_stock, 5)
+        self.assertEqual(product.stock, 5)
+        self.assertTrue(product.is_low_stock)
+        self.assertEqual(product.current_stock, 50)
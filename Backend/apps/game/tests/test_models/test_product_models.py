@@ -6,8 +6,11 @@ from django.test import TestCase
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from datetime import date
+from django.contrib.auth import get_user_model
 
-from apps.game.models import ProductCategory, Supplier, Product
+from apps.game.models import GameSession, ProductCategory, Supplier, Product
+
+User = get_user_model()
 
 
 class TestProductCategoryModel(TestCase):
@@ -165,6 +168,14 @@ class TestProductModel(TestCase):
             name='Distribuidora Central'
         )
 
+    def _game_session(self):
+        user = User.objects.create_user(
+            username='player',
+            email='player@example.com',
+            password='testpass123'
+        )
+        return GameSession.objects.get(user=user)
+
     def test_create_product(self):
         """Testa a criação de produto."""
         product = Product.objects.create(
@@ -348,9 +359,14 @@ class TestProductModel(TestCase):
             sale_price=Decimal('15.00'),
             current_stock=10
         )
+        game_session = self._game_session()
         
-        product.add_stock(5)
-        self.assertEqual(product.current_stock, 15)
+        product.add_stock(game_session, 5)
+        self.assertEqual(product.stock, 15)
+        self.assertEqual(game_session.inventory.get(product=product).current_stock, 15)
+        # O estoque inicial do catálogo não muda
+        product.refresh_from_db()
+        self.assertEqual(product.current_stock, 10)
 
     def test_add_stock_negative_quantity(self):
         """Testa adicionar estoque com quantidade negativa."""
@@ -362,9 +378,10 @@ class TestProductModel(TestCase):
             sale_price=Decimal('15.00'),
             current_stock=10
         )
+        game_session = self._game_session()
         
         with self.assertRaises(ValueError):
-            product.add_stock(-5)
+            product.add_stock(game_session, -5)
 
     def test_remove_stock(self):
         """Testa remover estoque."""
@@ -376,9 +393,11 @@ class TestProductModel(TestCase):
             sale_price=Decimal('15.00'),
             current_stock=10
         )
+        game_session = self._game_session()
         
-        product.remove_stock(3)
-        self.assertEqual(product.current_stock, 7)
+        product.remove_stock(game_session, 3)
+        self.assertEqual(product.stock, 7)
+        self.assertEqual(game_session.inventory.get(product=product).current_stock, 7)
 
     def test_remove_stock_insufficient(self):
         """Testa remover estoque insuficiente."""
@@ -390,9 +409,34 @@ class TestProductModel(TestCase):
             sale_price=Decimal('15.00'),
             current_stock=5
         )
+        game_session = self._game_session()
+        
+        with self.assertRaises(ValueError):
+            product.remove_stock(game_session, 10)
+
+    def test_stock_changes_are_applied_in_the_database(self):
+        """Testa que instâncias desatualizadas não perdem nem vendem além do estoque."""
+        product = Product.objects.create(
+            name='Teste',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('10.00'),
+            sale_price=Decimal('15.00'),
+            current_stock=5,
+            max_stock=10
+        )
+        game_session = self._game_session()
+        stale = Product.objects.get(pk=product.pk)
         
+        self.assertEqual(product.remove_stock(game_session, 3), 2)
+        # A cópia antiga ainda vê 5 unidades, mas o UPDATE usa o valor do banco
         with self.assertRaises(ValueError):
-            product.remove_stock(10)
+            stale.remove_stock(game_session, 3)
+        self.assertEqual(stale.add_stock(game_session, 4), 6)
+        with self.assertRaises(ValueError):
+            stale.add_stock(game_session, 5)
+        
+        self.assertEqual(game_session.inventory.get(product=product).current_stock, 6)
 
     def test_remove_stock_negative_quantity(self):
         """Testa remover estoque com quantidade negativa."""
@@ -404,9 +448,10 @@ class TestProductModel(TestCase):
             sale_price=Decimal('15.00'),
             current_stock=10
         )
+        game_session = self._game_session()
         
         with self.assertRaises(ValueError):
-            product.remove_stock(-5)
+            product.remove_stock(game_session, -5)
 
     def test_set_stock(self):
         """Testa definir estoque."""
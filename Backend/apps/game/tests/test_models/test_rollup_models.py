@@ -0,0 +1,115 @@
+"""
+Testes para o agregado diário de vendas.
+"""
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from datetime import date
+from io import StringIO
+
+from apps.game.models import GameSession, ProductCategory, Supplier, Product, ProductStockHistory, DailySalesRollup
+from apps.game.services import SalesBatch
+
+User = get_user_model()
+
+
+class TestDailySalesRollupModel(TestCase):
+    """Testes para o modelo DailySalesRollup."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test User',
+            last_name='Test User'
+        )
+        self.game_session = GameSession.objects.get(user=self.user)
+        self.category = ProductCategory.objects.create(name='Alimentos')
+        self.supplier = Supplier.objects.create(name='Fornecedor Teste')
+        self.product = Product.objects.create(
+            name='Arroz Teste',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('15.00'),
+            sale_price=Decimal('20.00'),
+            current_stock=50
+        )
+
+    def _history(self, quantity, unit_price, game_date, operation='SALE'):
+        return ProductStockHistory.objects.create(
+            game_session=self.game_session,
+            product=self.product,
+            operation=operation,
+            quantity=quantity,
+            previous_stock=50,
+            new_stock=50 - quantity,
+            unit_price=unit_price,
+            total_value=unit_price * quantity,
+            game_date=game_date
+        )
+
+    def _rollup(self):
+        return list(DailySalesRollup.objects.filter(game_session=self.game_session).order_by('game_date').values_list(
+            'game_date', 'quantity', 'revenue', 'sale_count', 'unit_price_total'
+        ))
+
+    def test_sale_history_updates_rollup(self):
+        """Testa que cada venda registrada no histórico é somada ao dia."""
+        self._history(2, Decimal('20.00'), date(2025, 1, 1))
+        self._history(3, Decimal('10.00'), date(2025, 1, 1))
+        self._history(1, Decimal('20.00'), date(2025, 1, 2))
+        self._history(5, Decimal('15.00'), date(2025, 1, 2), operation='PURCHASE')
+
+        self.assertEqual(self._rollup(), [
+            (date(2025, 1, 1), 5, Decimal('70.00'), 2, Decimal('30.00')),
+            (date(2025, 1, 2), 1, Decimal('20.00'), 1, Decimal('20.00')),
+        ])
+
+    def test_sales_batch_updates_rollup(self):
+        """Testa que o lote de vendas atualiza o agregado na mesma gravação."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.product, 2)
+        batch.add(self.product, 3)
+        batch.commit()
+
+        history = ProductStockHistory.objects.get(game_session=self.game_session, quantity=2)
+        self.assertEqual(self._rollup(), [(history.game_date, 5, Decimal('100.00'), 2, Decimal('40.00'))])
+
+    def test_catch_up_keys_rollup_by_game_date(self):
+        """Testa que o avanço de vários dias soma as vendas de cada dia do jogo na sua própria data."""
+        self.game_session.start_game()
+        self.game_session.inventory.update(current_stock=1000)
+        Product.objects.update(max_stock=1000)
+
+        self.assertEqual(self.game_session.fast_forward(3), 3)
+
+        self.assertEqual(
+            sorted(set(DailySalesRollup.objects.filter(game_session=self.game_session).values_list('game_date', flat=True))),
+            [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)]
+        )
+        self.assertEqual(
+            sorted(set(ProductStockHistory.objects.filter(operation='SALE').values_list('game_date', flat=True))),
+            [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)]
+        )
+
+    def test_rebuild_matches_history(self):
+        """Testa que o comando de reconstrução recalcula o agregado a partir do histórico."""
+        self._history(2, Decimal('20.00'), date(2025, 1, 1))
+        self._history(1, Decimal('20.00'), date(2025, 1, 2))
+        expected = self._rollup()
+
+        DailySalesRollup.objects.filter(game_date=date(2025, 1, 1)).update(quantity=99)
+        call_command('rebuild_sales_rollup', stdout=StringIO())
+
+        self.assertEqual(self._rollup(), expected)
+
+    def test_reset_game_clears_rollup(self):
+        """Testa que reiniciar o jogo apaga o agregado da sessão."""
+        self._history(2, Decimal('20.00'), date(2025, 1, 1))
+
+        self.game_session.reset_game()
+
+        self.assertEqual(self._rollup(), [])
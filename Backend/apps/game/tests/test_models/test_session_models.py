@@ -9,7 +9,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import patch
 
-from apps.game.models import GameSession
+from apps.game.models import GameSession, Product, ProductStockHistory
 from apps.finance.models import UserBalance, Transaction, Category
 
 User = get_user_model()
@@ -240,3 +240,253 @@ class TestGameSessionModel(TestCase):
         except Exception as e:
             # Esperado quando não há produtos disponíveis
             self.assertIn("Não há produtos disponíveis", str(e))
+
+    def test_fast_forward_processes_days_in_one_pass(self):
+        """Testa que o avanço rápido processa as vendas de todos os dias."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        Product.objects.update(max_stock=1000)
+        game_session.inventory.update(current_stock=1000)
+        
+        days_passed = game_session.fast_forward(5)
+        
+        self.assertEqual(days_passed, 5)
+        self.assertEqual(game_session.current_game_date, date(2025, 1, 6))
+        self.assertEqual(game_session.days_survived, 5)
+        
+        # Um lançamento financeiro por dia processado
+        income = Transaction.objects.filter(user=self.user, transaction_type='INCOME')
+        self.assertEqual(
+            sorted(income.values_list('transaction_date', flat=True)),
+            [date(2025, 1, 1) + timedelta(days=day) for day in range(5)]
+        )
+        self.assertTrue(ProductStockHistory.objects.filter(operation='SALE').exists())
+
+    def test_fast_forward_stops_at_game_end(self):
+        """Testa que o avanço rápido não passa do fim do jogo."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.current_game_date = date(2025, 12, 30)
+        
+        days_passed = game_session.fast_forward(10)
+        
+        self.assertEqual(days_passed, 2)
+        self.assertEqual(game_session.current_game_date, date(2026, 1, 1))
+        self.assertEqual(game_session.status, 'COMPLETED')
+
+    def test_process_daily_sales_follows_demand_plan(self):
+        """Testa que o tick vende todas as chegadas previstas até o momento."""
+        from apps.game.models import RealtimeSale
+        
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.daily_sales_target = 200
+        Product.objects.update(max_stock=1000)
+        game_session.inventory.update(current_stock=1000)
+        
+        game_session.process_daily_sales(15)
+        
+        self.assertGreater(game_session.current_day_sales_count, 3)
+        self.assertEqual(
+            RealtimeSale.objects.filter(game_session=game_session).count(),
+            game_session.current_day_sales_count
+        )
+        
+        # Um novo tick no mesmo instante não gera vendas repetidas
+        game_session.process_daily_sales(15)
+        self.assertEqual(
+            RealtimeSale.objects.filter(game_session=game_session).count(),
+            game_session.current_day_sales_count
+        )
+
+    def test_catch_up_volume_follows_demand_plan(self):
+        """
+        Testa o volume da recuperação de dias: uma venda por chegada do plano,
+        de 1 a max_quantity unidades, como nas vendas em tempo real.
+        """
+        from apps.game.models import RealtimeSale
+        from apps.game.services import get_demand_engine
+        
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        Product.objects.update(max_stock=1000)
+        game_session.inventory.update(current_stock=1000)
+        
+        self.assertEqual(game_session.fast_forward(1), 1)
+        
+        plan = game_session._day_demand(date(2025, 1, 1))
+        sales = RealtimeSale.objects.filter(game_session=game_session, game_date=date(2025, 1, 1))
+        self.assertEqual(sales.count(), len(plan))
+        self.assertEqual(
+            sorted(sales.values_list('quantity', flat=True)),
+            sorted(int(quantity) for quantity in plan.quantities)
+        )
+        self.assertLessEqual(max(plan.quantities), get_demand_engine().max_quantity)
+    
+    def _active_session_mid_day(self):
+        """Sessão ativa com estoque folgado, na metade do primeiro dia e já com as vendas da manhã."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        Product.objects.update(max_stock=1000)
+        game_session.inventory.update(current_stock=1000)
+        game_session.last_update_time = timezone.now() - timedelta(seconds=10)
+        game_session.save()
+        
+        game_session.update_game_time()
+        self.assertGreater(game_session.current_day_sales_count, 0)
+        return game_session
+    
+    def _sales_on(self, game_session, game_date):
+        from apps.game.models import RealtimeSale
+        
+        return RealtimeSale.objects.filter(game_session=game_session, game_date=game_date).count()
+    
+    def test_day_rollover_does_not_resell_customers_served_mid_day(self):
+        """Testa que a virada do dia vende só as chegadas ainda não atendidas em tempo real."""
+        game_session = self._active_session_mid_day()
+        
+        # Próximo tick já depois da meia-noite
+        game_session.last_update_time -= timedelta(seconds=20)
+        game_session.save()
+        self.assertEqual(game_session.update_game_time(), 1)
+        
+        self.assertEqual(self._sales_on(game_session, date(2025, 1, 1)), len(game_session._day_demand(date(2025, 1, 1))))
+        self.assertEqual(game_session.last_sales_reset_date, date(2025, 1, 2))
+        self.assertEqual(game_session.current_day_sales_count, self._sales_on(game_session, date(2025, 1, 2)))
+    
+    def test_fast_forward_from_mid_day_does_not_resell_current_day(self):
+        """Testa que o avanço rápido a partir do meio do dia completa o dia sem repetir clientes."""
+        game_session = self._active_session_mid_day()
+        
+        self.assertEqual(game_session.fast_forward(2), 2)
+        
+        for game_date in (date(2025, 1, 1), date(2025, 1, 2)):
+            self.assertEqual(self._sales_on(game_session, game_date), len(game_session._day_demand(game_date)))
+    
+    def test_catch_up_from_mid_day_does_not_resell_current_day(self):
+        """Testa que a recuperação de vários dias em uma passagem não repete os clientes do dia parcial."""
+        game_session = self._active_session_mid_day()
+        
+        game_session.last_update_time -= timedelta(seconds=60)
+        game_session.save()
+        self.assertEqual(game_session.update_game_time(), 3)
+        
+        for game_date in (date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)):
+            self.assertEqual(self._sales_on(game_session, game_date), len(game_session._day_demand(game_date)))
+    
+    def test_concurrent_update_game_time_is_coalesced(self):
+        """Testa que uma segunda chamada com estado antigo reaproveita o tick."""
+        from apps.game.models import RealtimeSale
+        
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        Product.objects.update(max_stock=1000)
+        game_session.inventory.update(current_stock=1000)
+        game_session.last_update_time = timezone.now() - timedelta(seconds=45)
+        game_session.save()
+        
+        # Segunda requisição carregou a sessão antes do primeiro tick gravar
+        stale_session = GameSession.objects.get(pk=game_session.pk)
+        
+        self.assertEqual(game_session.update_game_time(), 2)
+        sales_count = RealtimeSale.objects.filter(game_session=game_session).count()
+        
+        self.assertEqual(stale_session.update_game_time(), 0)
+        self.assertEqual(stale_session.current_game_date, date(2025, 1, 3))
+        self.assertEqual(stale_session.days_survived, 2)
+        self.assertEqual(RealtimeSale.objects.filter(game_session=game_session).count(), sales_count)
+    
+    def test_stale_update_game_time_resumes_from_stored_state(self):
+        """Testa que fora da janela de reaproveitamento o tick parte do estado gravado."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.last_update_time = timezone.now() - timedelta(seconds=45)
+        game_session.save()
+        stale_session = GameSession.objects.get(pk=game_session.pk)
+        
+        game_session.update_game_time()
+        
+        with self.settings(GAME_TICK_COALESCE_SECONDS=0):
+            self.assertEqual(stale_session.update_game_time(), 0)
+        self.assertEqual(stale_session.current_game_date, date(2025, 1, 3))
+    
+    def test_update_game_time_keeps_day_fraction(self):
+        """Testa que o avanço dos dias não descarta a fração do dia atual."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.status = 'ACTIVE'
+        anchor = timezone.now() - timedelta(seconds=50)
+        game_session.last_update_time = anchor
+        
+        days_passed = game_session.update_game_time()
+        
+        self.assertEqual(days_passed, 2)
+        self.assertEqual(game_session.last_update_time, anchor + timedelta(seconds=40))
+        self.assertGreaterEqual(game_session.clock.day_fraction, 0.5)
+    
+    def test_pause_and_resume_preserve_game_clock(self):
+        """Testa que a pausa congela o relógio e a retomada continua do mesmo ponto."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.last_update_time = timezone.now() - timedelta(seconds=10)
+        
+        game_session.pause_game()
+        self.assertIsNotNone(game_session.paused_at)
+        paused_fraction = game_session.clock.day_fraction
+        
+        # Tempo em pausa não avança o jogo
+        game_session.paused_at -= timedelta(seconds=60)
+        game_session.last_update_time -= timedelta(seconds=60)
+        self.assertEqual(game_session.update_game_time(), 0)
+        self.assertEqual(game_session.current_game_date, date(2025, 1, 1))
+        
+        game_session.resume_game()
+        self.assertIsNone(game_session.paused_at)
+        self.assertEqual(game_session.clock.pending_days, 0)
+        self.assertAlmostEqual(game_session.clock.day_fraction, paused_fraction, places=2)
+    
+    def test_early_tick_is_short_circuited(self):
+        """Testa que um tick antes do próximo evento não consulta o banco."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.process_daily_sales(0)
+        now = timezone.now()
+        
+        next_event = game_session.next_event_at(now)
+        self.assertGreater(next_event, now)
+        self.assertLessEqual(next_event, game_session.clock.time_at(1.0))
+        self.assertFalse(game_session.tick_due(now))
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(game_session.update_game_time(), 0)
+        
+        # No instante do evento o tick volta a ter efeito
+        self.assertTrue(game_session.tick_due(next_event + timedelta(milliseconds=1)))
+    
+    def test_next_event_at_when_paused(self):
+        """Testa que com o relógio parado não há próximo evento."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.pause_game()
+        
+        self.assertIsNone(game_session.next_event_at())
+        self.assertFalse(game_session.tick_due())
+    
+    def test_update_game_time_respects_day_budget(self):
+        """Testa que uma sessão ociosa é recuperada em vários ticks limitados."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.last_update_time = timezone.now() - timedelta(seconds=20 * 25 + 5)
+        game_session.save()
+        
+        with self.settings(GAME_TICK_MAX_DAYS=10):
+            self.assertEqual(game_session.update_game_time(), 10)
+            self.assertEqual(game_session.current_game_date, date(2025, 1, 11))
+            self.assertEqual(game_session.pending_days, 15)
+            # Dia atual ainda não alcançado: sem vendas do dia corrente
+            self.assertEqual(game_session.current_day_sales_count, 0)
+            
+            self.assertEqual(game_session.update_game_time(), 10)
+            self.assertEqual(game_session.update_game_time(max_days=0), 5)
+        
+        self.assertEqual(game_session.current_game_date, date(2025, 1, 26))
+        self.assertEqual(game_session.pending_days, 0)
@@ -0,0 +1,3 @@
+"""
+Testes para os serviços do app de jogo.
+"""
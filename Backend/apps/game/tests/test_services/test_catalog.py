@@ -0,0 +1,62 @@
+"""
+Testes para o catálogo de produtos em cache.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.game.models import GameSession, ProductCategory, Supplier, Product
+from apps.game.services.catalog import catalog_entries, catalog_version, product_listing
+
+User = get_user_model()
+
+
+class TestCatalog(TestCase):
+    """Testes para catalog_entries e product_listing."""
+
+    def setUp(self):
+        self.category = ProductCategory.objects.create(name='Alimentos')
+        self.supplier = Supplier.objects.create(name='Fornecedor Teste')
+        self.product = Product.objects.create(
+            name='Arroz 5kg',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('15.00'),
+            sale_price=Decimal('20.00'),
+            current_stock=50,
+            min_stock=10,
+            max_stock=100
+        )
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.game_session = GameSession.objects.get(user=self.user)
+
+    def test_entries_are_reused_until_catalog_changes(self):
+        """Testa que o catálogo só é serializado de novo quando a versão muda."""
+        entries = catalog_entries()
+
+        with self.assertNumQueries(1):
+            self.assertIs(catalog_entries(), entries)
+
+        self.category.name = 'Mercearia'
+        self.category.save()
+        version, _ = catalog_version()
+
+        self.assertEqual(catalog_entries(version)[0]['category_name'], 'Mercearia')
+
+    def test_listing_applies_session_stock(self):
+        """Testa que a lista aplica o estoque da sessão sobre o catálogo."""
+        _, etag, _ = product_listing(self.user)
+        self.game_session.inventory.get(product=self.product).remove_stock(50)
+
+        products, new_etag, _ = product_listing(self.user)
+
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(products[0]['current_stock'], 0)
+        self.assertEqual(products[0]['stock_status'], 'OUT_OF_STOCK')
+        self.assertEqual(catalog_entries()[0]['current_stock'], 50)
@@ -0,0 +1,68 @@
+"""
+Testes para o relógio do jogo.
+"""
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from datetime import date, time, timedelta
+
+from apps.game.models import GameSession
+from apps.game.services.clock import GameClock, business_time
+
+User = get_user_model()
+
+
+class TestGameClock(TestCase):
+    """Testes para GameClock."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test User',
+            last_name='Test User'
+        )
+        self.game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        self.game_session.start_game()
+        self.now = timezone.now()
+
+    def test_business_time(self):
+        """Testa a conversão da fração do dia em horário comercial."""
+        self.assertEqual(business_time(0), time(6, 0, 0))
+        self.assertEqual(business_time(0.5), time(14, 0, 0))
+        self.assertEqual(business_time(1), time(22, 0, 0))
+
+    def test_clock_derives_date_and_time_from_anchor(self):
+        """Testa data e hora derivadas da âncora sem gravar a sessão."""
+        self.game_session.last_update_time = self.now - timedelta(seconds=50)
+
+        clock = GameClock(self.game_session, self.now)
+
+        self.assertEqual(clock.pending_days, 2)
+        self.assertAlmostEqual(clock.day_fraction, 0.5)
+        self.assertEqual(clock.game_date, date(2025, 1, 3))
+        self.assertEqual(clock.game_time, time(14, 0, 0))
+        self.assertTrue(clock.is_market_open)
+        self.assertEqual(clock.anchor_after(2), self.now - timedelta(seconds=10))
+
+    def test_clock_is_frozen_while_paused(self):
+        """Testa que o relógio para no instante da pausa."""
+        self.game_session.last_update_time = self.now - timedelta(seconds=100)
+        self.game_session.paused_at = self.now - timedelta(seconds=90)
+
+        clock = GameClock(self.game_session, self.now)
+
+        self.assertEqual(clock.pending_days, 0)
+        self.assertAlmostEqual(clock.day_fraction, 0.5)
+
+    def test_clock_stops_at_game_end(self):
+        """Testa que o relógio não passa do fim do jogo."""
+        self.game_session.current_game_date = date(2025, 12, 31)
+        self.game_session.last_update_time = self.now - timedelta(seconds=200)
+
+        clock = GameClock(self.game_session, self.now)
+
+        self.assertEqual(clock.pending_days, 1)
+        self.assertEqual(clock.game_date, date(2026, 1, 1))
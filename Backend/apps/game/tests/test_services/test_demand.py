@@ -0,0 +1,125 @@
+"""
+Testes para os motores de demanda das vendas automáticas.
+"""
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.game.services import PythonDemandEngine, NumpyDemandEngine, get_demand_engine
+from apps.game.services.demand import _load_engine
+
+
+class DemandEngineTestsMixin:
+    """Testes comuns a todos os motores de demanda."""
+
+    engine_class = None
+
+    def setUp(self):
+        self.engine = self.engine_class()
+
+    def test_plan_day_is_deterministic(self):
+        """Testa que a mesma semente gera o mesmo dia."""
+        first = self.engine.plan_day(40, 123)
+        # Sorteio novo, sem passar pelo cache dos planos
+        second = self.engine_class.draw_day(40, 123, self.engine.max_quantity)
+
+        self.assertEqual(list(first.offsets), list(second.offsets))
+        self.assertEqual(list(first.quantities), list(second.quantities))
+
+    def test_plan_day_is_cached_by_engine_and_parameters(self):
+        """Testa que o plano do dia é reaproveitado entre instâncias do mesmo motor."""
+        class LargerOrdersEngine(self.engine_class):
+            max_quantity = 10
+
+        plan = self.engine.plan_day(40, 123)
+
+        self.assertIs(self.engine_class().plan_day(40, 123), plan)
+        self.assertIsNot(self.engine.plan_day(40, 124), plan)
+        larger = LargerOrdersEngine().plan_day(40, 123)
+        self.assertIsNot(larger, plan)
+        self.assertTrue(all(1 <= quantity <= 10 for quantity in larger.quantities))
+
+    def test_plan_day_arrivals_are_sorted_within_the_day(self):
+        """Testa que as chegadas estão ordenadas dentro do dia comercial."""
+        demand = self.engine.plan_day(200, 7)
+        offsets = list(demand.offsets)
+
+        self.assertGreater(len(demand), 100)
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertTrue(all(0 <= offset < 1 for offset in offsets))
+        self.assertTrue(all(1 <= quantity <= self.engine.max_quantity for quantity in demand.quantities))
+
+    def test_plan_day_without_target(self):
+        """Testa que sem meta de vendas não há chegadas."""
+        self.assertEqual(len(self.engine.plan_day(0, 1)), 0)
+
+    def test_arrivals_until(self):
+        """Testa o recorte das chegadas pelo progresso do dia."""
+        demand = self.engine.plan_day(100, 3)
+
+        self.assertEqual(demand.arrivals_until(0), 0)
+        self.assertEqual(demand.arrivals_until(1), len(demand))
+        middle = demand.arrivals_until(0.5)
+        self.assertTrue(all(offset < 0.5 for offset in list(demand.offsets)[:middle]))
+
+    def test_allocate_respects_stock(self):
+        """Testa que a distribuição nunca vende mais do que o estoque."""
+        demand = self.engine.plan_day(500, 11)
+        stock = [5, 0, 3, 100]
+
+        sales = self.engine.allocate(demand, stock)
+
+        sold = [0, 0, 0, 0]
+        for _, index, quantity in sales:
+            self.assertGreater(quantity, 0)
+            sold[index] += quantity
+        self.assertEqual(sold[0], 5)
+        self.assertEqual(sold[1], 0)
+        self.assertEqual(sold[2], 3)
+        self.assertEqual(stock, [0, 0, 0, 100 - sold[3]])
+
+    def test_allocate_slices_are_additive(self):
+        """Testa que processar o dia em partes equivale a processar de uma vez."""
+        demand = self.engine.plan_day(60, 5)
+        middle = demand.arrivals_until(0.5)
+
+        whole_stock = [1000, 1000]
+        whole = self.engine.allocate(demand, whole_stock)
+
+        sliced_stock = [1000, 1000]
+        sliced = self.engine.allocate(demand, sliced_stock, end=middle)
+        sliced += self.engine.allocate(demand, sliced_stock, start=middle)
+
+        self.assertEqual(whole, sliced)
+        self.assertEqual(whole_stock, sliced_stock)
+
+    def test_allocate_empty_catalog(self):
+        """Testa que sem produtos não há vendas."""
+        self.assertEqual(self.engine.allocate(self.engine.plan_day(40, 1), []), [])
+
+
+class TestPythonDemandEngine(DemandEngineTestsMixin, SimpleTestCase):
+    """Testes para o motor em Python puro."""
+
+    engine_class = PythonDemandEngine
+
+
+class TestNumpyDemandEngine(DemandEngineTestsMixin, SimpleTestCase):
+    """Testes para o motor vetorizado com NumPy."""
+
+    engine_class = NumpyDemandEngine
+
+
+class TestGetDemandEngine(SimpleTestCase):
+    """Testes para a seleção do motor de demanda."""
+
+    def tearDown(self):
+        _load_engine.cache_clear()
+
+    def test_default_engine(self):
+        """Testa que o NumPy é usado por padrão."""
+        self.assertIsInstance(get_demand_engine(), NumpyDemandEngine)
+
+    @override_settings(GAME_DEMAND_ENGINE='apps.game.services.demand.PythonDemandEngine')
+    def test_configured_engine(self):
+        """Testa a escolha do motor pela configuração."""
+        self.assertIsInstance(get_demand_engine(), PythonDemandEngine)
@@ -0,0 +1,62 @@
+"""
+Testes para a publicação de eventos em memória.
+"""
+
+from django.test import TestCase
+
+from apps.game.services.events import EventBroker, broker, publish_event
+
+
+class TestEventBroker(TestCase):
+    """Testes para EventBroker e publish_event."""
+
+    def setUp(self):
+        self.broker = EventBroker()
+
+    def test_publish_reaches_only_user_subscriptions(self):
+        """Testa que cada usuário recebe apenas os próprios eventos."""
+        first = self.broker.subscribe(1)
+        second = self.broker.subscribe(2)
+
+        self.broker.publish(1, 'balance', {'current_balance': 10})
+
+        event_id, event, data = first.get(timeout=0)
+        self.assertEqual(event, 'balance')
+        self.assertEqual(data, {'current_balance': 10})
+        self.assertIsNone(second.get(timeout=0))
+
+    def test_slow_subscriber_drops_oldest_events(self):
+        """Testa que a fila cheia descarta os eventos mais antigos."""
+        self.broker.max_queue_size = 2
+        subscription = self.broker.subscribe(1)
+
+        for value in range(3):
+            self.broker.publish(1, 'tick', value)
+
+        self.assertEqual(subscription.get(timeout=0)[2], 1)
+        self.assertEqual(subscription.get(timeout=0)[2], 2)
+
+    def test_close_unsubscribes(self):
+        """Testa o cancelamento da assinatura."""
+        subscription = self.broker.subscribe(1)
+        subscription.close()
+
+        self.assertFalse(self.broker.has_subscribers(1))
+
+    def test_publish_event_waits_for_commit(self):
+        """Testa que o evento só é entregue após a confirmação da transação."""
+        subscription = broker.subscribe('user')
+        self.addCleanup(subscription.close)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_event('user', 'day', lambda: {'days_passed': 1})
+            self.assertIsNone(subscription.get(timeout=0))
+
+        self.assertEqual(subscription.get(timeout=0)[1:], ('day', {'days_passed': 1}))
+
+    def test_publish_event_without_subscribers_skips_data(self):
+        """Testa que sem assinantes os dados nem são calculados."""
+        def fail():
+            raise AssertionError('não deveria serializar')
+
+        publish_event('nobody', 'sales', fail)
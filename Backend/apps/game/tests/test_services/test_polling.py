@@ -0,0 +1,50 @@
+"""
+Testes para o intervalo sugerido de consulta do jogo.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.game.models import GameSession
+from apps.game.services.polling import next_tick_at
+
+User = get_user_model()
+
+
+@override_settings(GAME_POLL_MIN_SECONDS=1, GAME_POLL_MAX_SECONDS=30)
+class TestNextTickAt(TestCase):
+    """Testes para next_tick_at."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        self.game_session.start_game()
+        self.now = timezone.now()
+
+    def test_pending_day_uses_minimum_interval(self):
+        """Testa que um dia pendente pede nova consulta no intervalo mínimo."""
+        self.game_session.last_update_time = self.now - timedelta(seconds=45)
+
+        self.assertEqual(next_tick_at(self.game_session, self.now), self.now + timedelta(seconds=1))
+
+    def test_next_event_is_capped_by_maximum_interval(self):
+        """Testa que um evento distante respeita o intervalo máximo."""
+        self.game_session.time_acceleration = 3600
+        self.game_session.auto_sales_enabled = False
+        self.game_session.last_update_time = self.now
+
+        self.assertEqual(next_tick_at(self.game_session, self.now), self.now + timedelta(seconds=30))
+
+    def test_next_event_within_limits(self):
+        """Testa que sem vendas o próximo evento é a virada do dia."""
+        self.game_session.auto_sales_enabled = False
+        self.game_session.last_update_time = self.now - timedelta(seconds=5)
+
+        self.assertEqual(next_tick_at(self.game_session, self.now), self.now + timedelta(seconds=15))
@@ -0,0 +1,170 @@
+"""
+Testes para a escrita em lote das vendas automáticas.
+"""
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from datetime import date, time
+
+from apps.game.models import GameSession, ProductCategory, Supplier, Product, ProductStockHistory, RealtimeSale
+from apps.game.services import SalesBatch
+from apps.finance.models import UserBalance, Transaction, BalanceHistory
+
+User = get_user_model()
+
+
+class TestSalesBatch(TestCase):
+    """Testes para SalesBatch."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test User',
+            last_name='Test User'
+        )
+        self.game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        self.category = ProductCategory.objects.create(name='Alimentos')
+        self.supplier = Supplier.objects.create(name='Fornecedor Teste')
+        self.product = Product.objects.create(
+            name='Arroz Teste',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('15.00'),
+            sale_price=Decimal('20.00'),
+            current_stock=10
+        )
+        self.other_product = Product.objects.create(
+            name='Feijão Teste',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('5.00'),
+            sale_price=Decimal('8.00'),
+            current_stock=5
+        )
+        self.initial_balance = UserBalance.objects.get(user=self.user).current_balance
+
+    def test_add_tracks_stock_in_memory(self):
+        """Testa que o lote controla o estoque sem gravar no banco."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.product, 3)
+        batch.add(self.product, 2)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.available_stock(self.product), 5)
+        self.assertEqual(batch.total_revenue, Decimal('100.00'))
+        self.assertEqual(self.game_session.inventory.get(product=self.product).current_stock, 10)
+
+    def test_add_rejects_insufficient_stock(self):
+        """Testa que o lote não vende mais do que o estoque disponível."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.other_product, 4)
+
+        with self.assertRaises(ValueError):
+            batch.add(self.other_product, 2)
+
+    def test_commit_writes_everything_once(self):
+        """Testa que o commit grava estoque da sessão, histórico, vendas e saldo."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.product, 3, game_time=time(10, 0, 0))
+        batch.add(self.other_product, 2, game_time=time(11, 0, 0))
+        batch.add(self.product, 1, game_time=time(23, 0, 0))
+
+        new_balance = batch.commit()
+
+        inventory = self.game_session.inventory
+        self.assertEqual(inventory.get(product=self.product).current_stock, 6)
+        self.assertEqual(inventory.get(product=self.other_product).current_stock, 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 10)
+
+        self.assertEqual(
+            ProductStockHistory.objects.filter(game_session=self.game_session, operation='SALE').count(), 3
+        )
+        # Venda das 23h fica fora do horário comercial
+        self.assertEqual(RealtimeSale.objects.filter(game_session=self.game_session).count(), 2)
+
+        transactions = Transaction.objects.filter(user=self.user, transaction_type='INCOME')
+        self.assertEqual(transactions.count(), 1)
+        self.assertEqual(transactions.first().amount, Decimal('96.00'))
+        self.assertTrue(transactions.first().balance_updated)
+
+        balance = UserBalance.objects.get(user=self.user)
+        self.assertEqual(balance.current_balance, self.initial_balance + Decimal('96.00'))
+        self.assertEqual(new_balance, balance.current_balance)
+        self.assertEqual(BalanceHistory.objects.filter(user_balance=balance).count(), 1)
+        self.assertEqual(len(batch), 0)
+
+    def test_commit_groups_transactions_by_game_date(self):
+        """Testa um lançamento financeiro por data de jogo."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.product, 1, game_date=date(2025, 1, 1))
+        batch.add(self.product, 1, game_date=date(2025, 1, 2))
+        batch.add(self.other_product, 1, game_date=date(2025, 1, 2))
+        batch.commit()
+
+        transactions = Transaction.objects.filter(user=self.user).order_by('transaction_date')
+        self.assertEqual(transactions.count(), 2)
+        self.assertEqual(transactions[0].amount, Decimal('20.00'))
+        self.assertEqual(transactions[1].amount, Decimal('28.00'))
+
+    def test_commit_empty_batch(self):
+        """Testa que um lote vazio não grava nada."""
+        batch = SalesBatch(self.game_session)
+
+        self.assertIsNone(batch.commit())
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_commit_clamps_sales_when_stock_changed(self):
+        """Testa que o commit ajusta as vendas ao estoque consumido por outro processo entre add() e commit()."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.other_product, 2)
+        batch.add(self.other_product, 3)
+        batch.add(self.product, 4)
+        self.game_session.inventory.filter(product=self.other_product).update(current_stock=3)
+
+        new_balance = batch.commit()
+
+        history = ProductStockHistory.objects.filter(operation='SALE').order_by('product__name', '-quantity')
+        self.assertEqual(
+            [(sale.product_id, sale.quantity, sale.previous_stock, sale.new_stock) for sale in history],
+            [(self.product.pk, 4, 10, 6), (self.other_product.pk, 2, 3, 1), (self.other_product.pk, 1, 1, 0)]
+        )
+        self.assertEqual(self.game_session.inventory.get(product=self.other_product).current_stock, 0)
+        self.assertEqual(self.game_session.inventory.get(product=self.product).current_stock, 6)
+        self.assertEqual(new_balance, self.initial_balance + Decimal('104.00'))
+
+    def test_commit_drops_batch_when_stock_sold_out(self):
+        """Testa que o commit descarta as vendas sem estoque restante sem gravar nada."""
+        batch = SalesBatch(self.game_session)
+        batch.add(self.other_product, 5)
+        self.game_session.inventory.filter(product=self.other_product).update(current_stock=0)
+
+        self.assertIsNone(batch.commit())
+
+        self.assertFalse(ProductStockHistory.objects.filter(operation='SALE').exists())
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_commit_publishes_sales_and_balance(self):
+        """Testa que o commit publica as vendas e o novo saldo para o stream."""
+        from apps.game.services.events import broker
+        
+        subscription = broker.subscribe(self.user.pk)
+        self.addCleanup(subscription.close)
+        batch = SalesBatch(self.game_session)
+        batch.add(self.product, 2, game_time=time(10, 0, 0))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            new_balance = batch.commit()
+        
+        events = {}
+        while True:
+            message = subscription.get(timeout=0)
+            if message is None:
+                break
+            events[message[1]] = message[2]
+        self.assertEqual(len(events['sales']), 1)
+        self.assertEqual(events['sales'][0]['product_name'], 'Arroz Teste')
+        self.assertEqual(events['balance'], {'current_balance': new_balance})
@@ -0,0 +1,144 @@
+"""
+Testes para a amostragem ponderada de produtos.
+"""
+
+import random
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+
+from apps.game.models import GameSession, ProductCategory, Supplier, Product
+from apps.game.services import ProductSampler, PythonDemandEngine, NumpyDemandEngine, load_catalog
+
+
+class TestProductSampler(SimpleTestCase):
+    """Testes para ProductSampler."""
+
+    def _frequencies(self, sampler, picks):
+        counts = [0] * len(sampler)
+        for index in sampler.choose(picks):
+            counts[index] += 1
+        return [count / len(picks) for count in counts]
+
+    def test_choose_follows_weights(self):
+        """Testa que as escolhas seguem os pesos configurados."""
+        sampler = ProductSampler([1, 2, 0, 5])
+        rng = random.Random(1)
+        frequencies = self._frequencies(sampler, [rng.random() for _ in range(20000)])
+
+        self.assertAlmostEqual(frequencies[0], 1 / 8, delta=0.02)
+        self.assertAlmostEqual(frequencies[1], 2 / 8, delta=0.02)
+        self.assertEqual(frequencies[2], 0)
+        self.assertAlmostEqual(frequencies[3], 5 / 8, delta=0.02)
+
+    def test_choose_array_matches_python(self):
+        """Testa que a versão vetorizada escolhe os mesmos produtos."""
+        sampler = ProductSampler([3, 1, 4, 1, 5])
+        sampler.remove(2)
+        picks = np.random.default_rng(2).random(500)
+
+        self.assertEqual(sampler.choose(picks).tolist(), sampler.choose(picks.tolist()))
+
+    def test_remove_excludes_sold_out_product(self):
+        """Testa que um produto removido não é mais escolhido."""
+        sampler = ProductSampler([1] * 10)
+        sampler.remove(4)
+        picks = np.random.default_rng(3).random(5000)
+
+        self.assertNotIn(4, set(sampler.choose(picks).tolist()))
+
+    def test_remove_rebuilds_after_half_the_weight(self):
+        """Testa a reconstrução da tabela quando metade do peso saiu."""
+        sampler = ProductSampler([1, 1, 1, 1])
+        sampler.remove(0)
+        sampler.remove(1)
+        sampler.remove(2)
+
+        self.assertEqual(sampler.prob.tolist(), [0.0, 0.0, 0.0, 1.0])
+        self.assertEqual(set(sampler.choose([0.1, 0.5, 0.9])), {3})
+
+    def test_choose_falls_back_to_products_in_stock(self):
+        """Testa que, com boa parte do peso esgotada, toda chegada ainda encontra um produto em estoque."""
+        sampler = ProductSampler([5, 5] + [1] * 10)
+        sampler.remove(0)
+        sampler.remove(1)
+        # Sem novas tentativas, toda escolha rejeitada passa pela busca direta
+        sampler.max_retries = 0
+        picks = np.random.default_rng(4).random(5000)
+
+        chosen = sampler.choose(picks).tolist()
+
+        self.assertEqual(chosen, sampler.choose(picks.tolist()))
+        self.assertTrue(set(chosen) <= set(range(2, 12)))
+        frequencies = [chosen.count(index) / len(chosen) for index in range(2, 12)]
+        self.assertTrue(all(abs(frequency - 0.1) < 0.02 for frequency in frequencies))
+
+    def test_empty_sampler_chooses_nothing(self):
+        """Testa que sem peso disponível nenhuma chegada compra."""
+        sampler = ProductSampler([0, 0])
+
+        self.assertTrue(sampler.is_empty)
+        self.assertEqual(sampler.choose([0.2, 0.7]), [-1, -1])
+
+    def test_for_catalog_returns_independent_copies(self):
+        """Testa que a tabela é reaproveitada sem compartilhar remoções."""
+        first = ProductSampler.for_catalog(['a', 'b'], [1.0, 1.0])
+        first.remove(0)
+        second = ProductSampler.for_catalog(['a', 'b'], [1.0, 1.0])
+
+        self.assertFalse(second.removed[0])
+
+    def test_engines_skip_sold_out_products(self):
+        """Testa que os motores retiram do sampler os produtos esgotados."""
+        for engine in (PythonDemandEngine(), NumpyDemandEngine()):
+            sampler = ProductSampler([1, 1, 1])
+            stock = [2, 50, 50]
+
+            engine.allocate(engine.plan_day(200, 9), stock, sampler=sampler)
+
+            self.assertEqual(stock[0], 0)
+            self.assertTrue(sampler.removed[0])
+
+
+class TestLoadCatalog(TestCase):
+    """Testes para o carregamento leve do estoque da sessão."""
+
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name='Fornecedor Teste')
+        self.bakery = ProductCategory.objects.create(name='Padaria Teste')
+        self.cleaning = ProductCategory.objects.create(name='Limpeza Teste')
+        for name, category, stock in (
+            ('Pão', self.bakery, 10),
+            ('Sabão', self.cleaning, 10),
+            ('Detergente', self.cleaning, 5),
+        ):
+            Product.objects.create(
+                name=name,
+                category=category,
+                supplier=self.supplier,
+                purchase_price=Decimal('1.00'),
+                sale_price=Decimal('2.00'),
+                current_stock=stock
+            )
+        user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+        self.game_session = GameSession.objects.get(user=user)
+        # Esgotado apenas nesta sessão
+        self.game_session.inventory.filter(product__name='Detergente').update(current_stock=0)
+
+    @override_settings(GAME_CATEGORY_POPULARITY={'Padaria Teste': 3.0})
+    def test_weights_use_category_popularity_and_stock(self):
+        """Testa os pesos por categoria e a exclusão dos produtos sem estoque na sessão."""
+        keys, stock, sampler = load_catalog(self.game_session)
+
+        names = dict(Product.objects.values_list('pk', 'name'))
+        weights = {names[key]: weight for key, weight in zip(keys, sampler.weights)}
+        self.assertEqual(weights, {'Pão': 3.0, 'Sabão': 1.0, 'Detergente': 0.0})
+        self.assertEqual(sorted(stock), [0, 10, 10])
@@ -0,0 +1,118 @@
+"""
+Testes para o avanço do tempo das sessões pelo servidor.
+"""
+
+from io import StringIO
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from apps.game.models import GameSession, ProductCategory, Supplier, Product
+from apps.game.services import active_session_ids, load_catalogs, tick_sessions
+
+User = get_user_model()
+
+
+class TestTicker(TestCase):
+    """Testes para tick_sessions e o comando run_game_ticker."""
+
+    def setUp(self):
+        self.sessions = []
+        for index in range(3):
+            user = User.objects.create_user(
+                username=f'player{index}',
+                email=f'player{index}@example.com',
+                password='testpass123',
+                first_name='Player',
+                last_name=str(index)
+            )
+            session, _ = GameSession.objects.get_or_create(user=user)
+            session.status = 'ACTIVE'
+            session.last_update_time = timezone.now() - timedelta(seconds=40)
+            session.save()
+            self.sessions.append(session)
+
+        # Sessão pausada não deve avançar
+        self.sessions[2].status = 'PAUSED'
+        self.sessions[2].save()
+
+        category = ProductCategory.objects.create(name='Alimentos')
+        supplier = Supplier.objects.create(name='Fornecedor Teste')
+        self.product = Product.objects.create(
+            name='Arroz Teste',
+            category=category,
+            supplier=supplier,
+            purchase_price=Decimal('15.00'),
+            sale_price=Decimal('20.00'),
+            current_stock=1000
+        )
+
+    def test_active_session_ids(self):
+        """Testa a seleção das sessões ativas."""
+        ids = active_session_ids()
+
+        self.assertEqual(set(ids), {self.sessions[0].pk, self.sessions[1].pk})
+
+    def test_active_session_ids_are_sharded(self):
+        """Testa que cada sessão pertence a exatamente um shard."""
+        shards = [active_session_ids(shard, 2) for shard in range(2)]
+
+        self.assertEqual(sorted(shards[0] + shards[1]), sorted(active_session_ids()))
+        self.assertFalse(set(shards[0]) & set(shards[1]))
+
+    def test_tick_sessions_advances_active_sessions(self):
+        """Testa que as sessões ativas avançam e vendem do próprio estoque."""
+        stats = tick_sessions(active_session_ids(), batch_size=1)
+
+        self.assertEqual(stats, {'sessions': 2, 'days': 4, 'errors': 0})
+        for session in self.sessions[:2]:
+            session.refresh_from_db()
+            self.assertEqual(session.current_game_date, date(2025, 1, 3))
+        self.sessions[2].refresh_from_db()
+        self.assertEqual(self.sessions[2].current_game_date, date(2025, 1, 1))
+        for session in self.sessions[:2]:
+            self.assertLess(session.inventory.get(product=self.product).current_stock, 1000)
+        # O estoque inicial do catálogo e a sessão pausada ficam intactos
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 1000)
+        self.assertEqual(self.sessions[2].inventory.get(product=self.product).current_stock, 1000)
+
+    def test_active_session_ids_filters_shard_in_query(self):
+        """Testa que cada shard consulta apenas as próprias faixas do ticker."""
+        GameSession.objects.filter(pk=self.sessions[0].pk).update(ticker_slot=4)
+        GameSession.objects.filter(pk=self.sessions[1].pk).update(ticker_slot=7)
+
+        with self.assertNumQueries(1) as context:
+            self.assertEqual(active_session_ids(0, 2), [self.sessions[0].pk])
+        self.assertIn('ticker_slot', context.captured_queries[0]['sql'])
+        self.assertEqual(active_session_ids(1, 2), [self.sessions[1].pk])
+
+    def test_tick_sessions_loads_catalogs_once_per_batch(self):
+        """Testa que o estoque das sessões de um lote é carregado em uma única consulta."""
+        with patch('apps.game.services.ticker.load_catalogs', wraps=load_catalogs) as loader:
+            stats = tick_sessions(active_session_ids(), batch_size=10)
+
+        self.assertEqual(stats['sessions'], 2)
+        loader.assert_called_once()
+        with self.assertNumQueries(1):
+            catalogs = load_catalogs(self.sessions[:2])
+        for session in self.sessions[:2]:
+            self.assertIn(self.product.pk, catalogs[session.pk][0])
+
+    def test_command_once(self):
+        """Testa uma execução única do comando."""
+        out = StringIO()
+        call_command('run_game_ticker', '--once', stdout=out)
+
+        self.assertIn('Sessões: 2, dias avançados: 4, erros: 0', out.getvalue())
+
+    def test_command_rejects_invalid_shard(self):
+        """Testa a validação dos shards."""
+        with self.assertRaises(CommandError):
+            call_command('run_game_ticker', '--once', '--shard', '2', '--shards', '2')
@@ -11,7 +11,7 @@ from rest_framework import status
 from decimal import Decimal
 from datetime import date, time
 
-from apps.game.models import GameSession, ProductCategory, Supplier, Product, RealtimeSale
+from apps.game.models import GameSession, ProductCategory, Supplier, Product, RealtimeSale, DailySalesRollup
 from apps.finance.models import UserBalance
 
 User = get_user_model()
@@ -106,6 +106,8 @@ class TestGameDashboardViewSet(TestCase):
             game_time='15:00:00',
             sale_time=timezone.now()
         )
+        # Totais do dashboard vêm do agregado diário de vendas
+        DailySalesRollup.record(self.game_session, [self.realtime_sale1, self.realtime_sale2])
 
     def test_dashboard_data_success(self):
         """Testa obtenção de dados do dashboard com sucesso."""
@@ -297,6 +299,7 @@ class TestGameDashboardViewSet(TestCase):
         """Testa dashboard sem dados de vendas."""
         # Deletar todas as vendas em tempo real
         RealtimeSale.objects.all().delete()
+        DailySalesRollup.objects.all().delete()
         
         url = reverse('game-dashboard-data')
         response = self.client.get(url)
@@ -353,7 +356,7 @@ class TestGameDashboardViewSet(TestCase):
     def test_dashboard_sales_aggregation(self):
         """Testa agregação de dados de vendas."""
         # Criar mais vendas para testar agregação
-        RealtimeSale.objects.create(
+        sale = RealtimeSale.objects.create(
             game_session=self.game_session,
             product=self.product_normal,
             quantity=3,
@@ -363,6 +366,7 @@ class TestGameDashboardViewSet(TestCase):
             game_time='16:00:00',
             sale_time=timezone.now()
         )
+        DailySalesRollup.record(self.game_session, [sale])
         
         url = reverse('game-dashboard-data')
         response = self.client.get(url)
@@ -374,3 +378,156 @@ class TestGameDashboardViewSet(TestCase):
         # Receita: 30 + 15 + 45 = 90
         self.assertEqual(sales_data['total_sales'], 6)
         self.assertEqual(sales_data['total_revenue'], 90.00)
+
+    def test_dashboard_tick_advances_time_and_returns_snapshot(self):
+        """Testa que o tick avança o tempo e retorna os dados do dashboard."""
+        self.game_session.last_update_time = timezone.now() - timezone.timedelta(seconds=45)
+        self.game_session.save()
+        
+        url = reverse('game-dashboard-tick')
+        response = self.client.post(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days_passed'], 2)
+        self.assertEqual(response.data['game_session']['current_game_date'], '2025-01-03')
+        for key in ['balance', 'products', 'sales', 'stock_alerts', 'realtime_sales']:
+            self.assertIn(key, response.data)
+        self.assertEqual(
+            response.data['balance']['current_balance'],
+            UserBalance.objects.get(user=self.user).current_balance
+        )
+
+    def test_dashboard_product_counters_use_single_query(self):
+        """Testa que os contadores de produtos vêm de uma única consulta."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        url = reverse('game-dashboard-data')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        
+        stock_queries = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and (
+                'FROM "game_product"' in query['sql'] or 'FROM "game_sessioninventory"' in query['sql']
+            )
+        ]
+        self.assertEqual(len(stock_queries), 1)
+        self.assertEqual(response.data['products']['total'], Product.objects.filter(is_active=True).count())
+        self.assertEqual(response.data['products']['low_stock'], 1)
+        self.assertEqual(response.data['products']['out_of_stock'], 1)
+
+    def test_dashboard_cursor_without_changes_returns_not_modified(self):
+        """Testa que o cursor sem alterações retorna 304."""
+        url = reverse('game-dashboard-data')
+        cursor = self.client.get(url).data['cursor']
+        
+        response = self.client.get(url, {'cursor': cursor})
+        
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_dashboard_cursor_returns_only_changes(self):
+        """Testa que o cursor retorna apenas as vendas e o estoque alterados."""
+        url = reverse('game-dashboard-data')
+        cursor = self.client.get(url).data['cursor']
+        
+        new_sale = RealtimeSale.objects.create(
+            game_session=self.game_session,
+            sequence=self.game_session.next_sales_sequence(),
+            product=self.product_normal,
+            quantity=3,
+            unit_price=Decimal('15.00'),
+            total_value=Decimal('45.00'),
+            game_date=self.game_session.current_game_date,
+            game_time='16:00:00',
+            sale_time=timezone.now()
+        )
+        DailySalesRollup.record(self.game_session, [new_sale])
+        self.game_session.inventory.get(product=self.product_normal).remove_stock(3)
+        
+        response = self.client.get(url, {'cursor': cursor})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('game_session', response.data)
+        self.assertNotIn('balance', response.data)
+        self.assertEqual([sale['id'] for sale in response.data['realtime_sales']], [str(new_sale.id)])
+        self.assertEqual(response.data['sales']['total_sales'], 6)
+        self.assertEqual(
+            response.data['stock'],
+            [{'id': self.product_normal.id, 'current_stock': 47, 'is_active': True}]
+        )
+        self.assertNotEqual(response.data['cursor'], cursor)
+        
+        response = self.client.get(url, {'cursor': response.data['cursor']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_dashboard_cursor_returns_sale_committed_late(self):
+        """
+        Testa que uma venda gravada depois do cursor, mas com created_at
+        anterior (transação que terminou depois), ainda é entregue.
+        """
+        url = reverse('game-dashboard-data')
+        sequence = self.game_session.next_sales_sequence()
+        cursor = self.client.get(url).data['cursor']
+        
+        late_sale = RealtimeSale.objects.create(
+            game_session=self.game_session,
+            sequence=sequence,
+            product=self.product_normal,
+            quantity=1,
+            unit_price=Decimal('15.00'),
+            total_value=Decimal('15.00'),
+            game_date=self.game_session.current_game_date,
+            game_time='17:00:00',
+            sale_time=timezone.now()
+        )
+        RealtimeSale.objects.filter(pk=late_sale.pk).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=5)
+        )
+        # Nenhuma venda nova foi registrada depois do cursor: nada mudou
+        self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        new_sale = RealtimeSale.objects.create(
+            game_session=self.game_session,
+            sequence=self.game_session.next_sales_sequence(),
+            product=self.product_normal,
+            quantity=2,
+            unit_price=Decimal('15.00'),
+            total_value=Decimal('30.00'),
+            game_date=self.game_session.current_game_date,
+            game_time='17:30:00',
+            sale_time=timezone.now()
+        )
+        RealtimeSale.objects.filter(pk=new_sale.pk).update(
+            created_at=timezone.now() - timezone.timedelta(minutes=10)
+        )
+        
+        response = self.client.get(url, {'cursor': cursor})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([sale['id'] for sale in response.data['realtime_sales']], [str(new_sale.id)])
+
+    def test_simulate_sale_advances_dashboard_cursor(self):
+        """Testa que a venda simulada aparece nas mudanças do cursor."""
+        url = reverse('game-dashboard-data')
+        snapshot = self.client.get(url).data
+        cursor = snapshot['cursor']
+        
+        response = self.client.post(reverse('product-sales-simulate-sale'), {
+            'product_id': self.product_normal.id,
+            'quantity': 2
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.get(url, {'cursor': cursor})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sales']['total_sales'], snapshot['sales']['total_sales'] + 2)
+        self.assertNotEqual(response.data['cursor'], cursor)
+
+    def test_dashboard_invalid_cursor(self):
+        """Testa que um cursor inválido é recusado."""
+        url = reverse('game-dashboard-data')
+        response = self.client.get(url, {'cursor': 'abc'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -7,9 +7,11 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db.models import F
 from decimal import Decimal
+from unittest.mock import patch
 
-from apps.game.models import GameSession, ProductCategory, Supplier, Product
+from apps.game.models import GameSession, ProductCategory, Supplier, Product, SessionInventory
 from apps.finance.models import UserBalance
 
 User = get_user_model()
@@ -213,6 +215,63 @@ class TestProductViewSet(TransactionTestCase):
             product_names = [product['name'] for product in response.data]
         self.assertIn('Arroz 5kg', product_names)
 
+    def test_list_products_with_cursor(self):
+        """Testa a sincronização incremental da lista de produtos."""
+        url = reverse('product-list')
+        cursor = self.client.get(url)['X-Sync-Cursor']
+        
+        response = self.client.get(url, {'cursor': cursor})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        inventory = GameSession.objects.get(user=self.user).inventory.get(product=self.product)
+        inventory.remove_stock(5)
+        response = self.client.get(url, {'cursor': cursor})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([product['current_stock'] for product in response.data['results']], [45])
+        self.assertEqual(response['X-Sync-Cursor'], response.data['cursor'])
+
+    def test_list_products_etag(self):
+        """Testa o ETag da lista: 304 sem mudanças e nova versão após alterar o estoque."""
+        url = reverse('product-list')
+        etag = self.client.get(url)['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        GameSession.objects.get(user=self.user).inventory.get(product=self.product).remove_stock(45)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        product_data = next(item for item in response.data['results'] if item['id'] == str(self.product.id))
+        self.assertEqual(product_data['current_stock'], 5)
+        self.assertEqual(product_data['stock_status'], 'LOW_STOCK')
+
+    def test_cached_list_matches_serializer(self):
+        """Testa que a lista em cache é igual à serialização completa e reaproveita o catálogo."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.game.models import SessionInventory
+        from apps.game.serializers import ProductSerializer
+        
+        GameSession.objects.get(user=self.user).inventory.get(product=self.product).remove_stock(20)
+        url = reverse('product-list')
+        self.client.get(url)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        
+        expected = ProductSerializer(
+            SessionInventory.annotate_products(Product.objects.filter(is_active=True), self.user),
+            many=True
+        ).data
+        self.assertEqual(response.data['results'], [dict(entry) for entry in expected])
+        catalog_queries = [
+            query['sql'] for query in queries.captured_queries if 'FROM "game_product"' in query['sql']
+        ]
+        self.assertEqual(len(catalog_queries), 1)
+
     def test_list_only_active_products(self):
         """Testa listagem apenas de produtos ativos."""
         Product.objects.create(
@@ -304,9 +363,10 @@ class TestProductViewSet(TransactionTestCase):
         self.assertIn('message', response.data)
         self.assertEqual(response.data['message'], 'Compra realizada com sucesso')
         
-        # Verifica se o estoque foi atualizado
-        self.product.refresh_from_db()
-        self.assertEqual(self.product.current_stock, 60)
+        # Verifica se o estoque da sessão foi atualizado
+        self.assertEqual(response.data['product']['current_stock'], 60)
+        inventory = GameSession.objects.get(user=self.user).inventory.get(product=self.product)
+        self.assertEqual(inventory.current_stock, 60)
 
     def test_purchase_product_insufficient_balance(self):
         """Testa compra de produto com saldo insuficiente."""
@@ -327,6 +387,17 @@ class TestProductViewSet(TransactionTestCase):
         self.assertIn('error', response.data)
         self.assertEqual(response.data['error'], 'Saldo insuficiente')
 
+    def test_purchase_debits_balance_once(self):
+        """Testa que a compra debita o saldo uma única vez."""
+        initial_balance = UserBalance.objects.get(user=self.user).current_balance
+        
+        url = reverse('product-purchase', kwargs={'pk': self.product.pk})
+        response = self.client.post(url, {'quantity': 10, 'unit_price': Decimal('15.00')}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user_balance = UserBalance.objects.get(user=self.user)
+        self.assertEqual(user_balance.current_balance, initial_balance - Decimal('150.00'))
+
     def test_purchase_product_invalid_data(self):
         """Testa compra de produto com dados inválidos."""
         url = reverse('product-purchase', kwargs={'pk': self.product.pk})
@@ -383,6 +454,52 @@ class TestProductViewSet(TransactionTestCase):
         user_balance = UserBalance.objects.get(user=self.user)
         self.assertEqual(user_balance.current_balance, initial_balance - expected_cost)
 
+    def test_restock_all_skips_stock_changed_concurrently(self):
+        """Testa que a reposição não sobrescreve uma venda feita depois da leitura do estoque nem a cobra."""
+        Product.objects.all().delete()
+        product1 = Product.objects.create(
+            name='Produto 1',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('15.00'),
+            sale_price=Decimal('20.00'),
+            current_stock=20,
+            max_stock=100
+        )
+        product2 = Product.objects.create(
+            name='Produto 2',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('10.00'),
+            sale_price=Decimal('15.00'),
+            current_stock=10,
+            max_stock=50
+        )
+        game_session = GameSession.objects.get(user=self.user)
+        sold_inventory = SessionInventory.objects.get(game_session=game_session, product=product1)
+        initial_balance = UserBalance.objects.get(user=self.user).current_balance
+        filter_inventory = SessionInventory.objects.filter
+
+        def concurrent_sale(*args, **kwargs):
+            # Uma venda do tick decrementa o estoque entre a leitura e a reposição
+            if kwargs.get('pk') == sold_inventory.pk:
+                filter_inventory(pk=sold_inventory.pk).update(current_stock=F('current_stock') - 5)
+            return filter_inventory(*args, **kwargs)
+
+        with patch.object(SessionInventory.objects, 'filter', side_effect=concurrent_sale):
+            response = self.client.post(reverse('product-restock-all'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.data['restocked_products']], ['Produto 2'])
+        self.assertEqual(response.data['total_cost'], 400.0)
+        sold_inventory.refresh_from_db()
+        self.assertEqual(sold_inventory.current_stock, 15)
+        self.assertEqual(SessionInventory.objects.get(game_session=game_session, product=product2).current_stock, 50)
+        self.assertEqual(
+            UserBalance.objects.get(user=self.user).current_balance,
+            initial_balance - Decimal('400.00')
+        )
+
     def test_restock_all_insufficient_balance(self):
         """Testa reposição de estoque com saldo insuficiente."""
         # Criar produto com estoque baixo e preço alto
@@ -403,6 +520,34 @@ class TestProductViewSet(TransactionTestCase):
         self.assertIn('error', response.data)
         self.assertEqual(response.data['error'], 'Saldo insuficiente')
 
+    def test_restock_all_without_cost_does_not_touch_balance(self):
+        """Testa que a reposição sem custo não debita nem registra transação."""
+        from apps.finance.models import Transaction, BalanceHistory
+
+        Product.objects.all().delete()
+        Product.objects.create(
+            name='Produto Completo',
+            category=self.category,
+            supplier=self.supplier,
+            purchase_price=Decimal('10.00'),
+            sale_price=Decimal('15.00'),
+            current_stock=100,
+            max_stock=100
+        )
+        initial_balance = UserBalance.objects.get(user=self.user).current_balance
+        transactions = Transaction.objects.filter(user=self.user).count()
+        history = BalanceHistory.objects.filter(user_balance__user=self.user).count()
+
+        url = reverse('product-restock-all')
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_cost'], 0)
+        self.assertEqual(response.data['restocked_products'], [])
+        self.assertEqual(UserBalance.objects.get(user=self.user).current_balance, initial_balance)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), transactions)
+        self.assertEqual(BalanceHistory.objects.filter(user_balance__user=self.user).count(), history)
+
     def test_restock_cost(self):
         """Testa cálculo do custo de reposição."""
         self.product.current_stock = 20
@@ -71,9 +71,11 @@ class TestProductSalesViewSet(TestCase):
         self.assertIn('message', response.data)
         self.assertEqual(response.data['message'], 'Venda realizada com sucesso')
         
-        # Verifica se o estoque foi reduzido
+        # Verifica se o estoque da sessão foi reduzido e o inicial preservado
+        inventory = self.game_session.inventory.get(product=self.product)
+        self.assertEqual(inventory.current_stock, 45)
         self.product.refresh_from_db()
-        self.assertEqual(self.product.current_stock, 45)
+        self.assertEqual(self.product.current_stock, 50)
 
     def test_simulate_sale_insufficient_stock(self):
         """Testa simulação de venda com estoque insuficiente."""
@@ -189,6 +191,7 @@ class TestProductSalesViewSet(TestCase):
         """Testa resumo de vendas."""
         # Criar algumas vendas no histórico
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='SALE',
             quantity=5,
@@ -199,6 +202,7 @@ class TestProductSalesViewSet(TestCase):
         )
         
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='SALE',
             quantity=3,
@@ -221,6 +225,82 @@ class TestProductSalesViewSet(TestCase):
         self.assertEqual(response.data['total_sales'], 8)
         self.assertEqual(response.data['total_revenue'], 160.00)
 
+    def test_sales_summary_is_cached_until_a_sale(self):
+        """Testa que o resumo vem do cache e é invalidado por uma nova venda."""
+        url = reverse('product-sales-sales-summary')
+        self.assertEqual(self.client.get(url).data['total_sales'], 0)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data['total_sales'], 0)
+
+        self.client.post(
+            reverse('product-sales-simulate-sale'),
+            {'product_id': str(self.product.id), 'quantity': 4},
+            format='json'
+        )
+
+        self.assertEqual(self.client.get(url).data['total_sales'], 4)
+
+    def _sale(self, game_date, quantity, total_value):
+        return ProductStockHistory.objects.create(
+            game_session=self.game_session,
+            product=self.product,
+            operation='SALE',
+            quantity=quantity,
+            previous_stock=50,
+            new_stock=50 - quantity,
+            unit_price=Decimal('20.00'),
+            total_value=total_value,
+            game_date=game_date
+        )
+
+    def test_sales_charts_query_count_does_not_depend_on_window(self):
+        """Testa que os gráficos usam consultas agrupadas, independente da janela."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        today = self.game_session.current_game_date
+        self._sale(today - timedelta(days=3), 2, Decimal('40.00'))
+        self._sale(today - timedelta(days=3), 1, Decimal('20.00'))
+        self._sale(today - timedelta(days=200), 5, Decimal('100.00'))
+        url = reverse('product-sales-sales-charts-data')
+
+        counts = {}
+        for days_back in (7, 365):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {'period': 'daily', 'days_back': days_back})
+            counts[days_back] = len(queries)
+            self.assertEqual(len(response.data['sales_by_period']), days_back)
+
+        self.assertEqual(counts[7], counts[365])
+        by_day = {entry['period_key']: entry for entry in response.data['sales_by_period']}
+        day = by_day[(today - timedelta(days=3)).strftime('%Y-%m-%d')]
+        self.assertEqual(day['total_quantity'], 3)
+        self.assertEqual(day['total_revenue'], 60.0)
+        self.assertEqual(sum(entry['total_quantity'] for entry in by_day.values()), 8)
+
+        for period in ('weekly', 'monthly'):
+            response = self.client.get(url, {'period': period, 'days_back': 365})
+            self.assertEqual(
+                sum(entry['total_quantity'] for entry in response.data['sales_by_period']), 8
+            )
+
+    def test_detailed_analysis_groups_by_weekday(self):
+        """Testa a análise por dia da semana, incluindo domingo, e o crescimento."""
+        today = self.game_session.current_game_date
+        sunday = today - timedelta(days=(today.weekday() + 1) % 7 or 7)
+        self._sale(sunday, 2, Decimal('40.00'))
+        self._sale(today - timedelta(days=40), 1, Decimal('20.00'))
+
+        response = self.client.get(reverse('product-sales-detailed-analysis'), {'days_back': 30})
+
+        weekdays = {entry['weekday']: entry for entry in response.data['sales_by_weekday']}
+        self.assertEqual(weekdays['Domingo']['total_quantity'], 2)
+        self.assertEqual(response.data['general_stats']['total_transactions'], 1)
+        self.assertEqual(response.data['best_selling_product']['product__name'], 'Arroz 5kg')
+        self.assertEqual(response.data['growth_analysis']['previous_revenue'], 20.0)
+        self.assertEqual(response.data['growth_analysis']['growth_percentage'], 100.0)
+
     def test_sales_summary_no_sales(self):
         """Testa resumo de vendas quando não há vendas."""
         url = reverse('product-sales-sales-summary')
@@ -237,6 +317,7 @@ class TestProductSalesViewSet(TestCase):
         # Criar mais de 10 vendas
         for i in range(15):
             ProductStockHistory.objects.create(
+                game_session=self.game_session,
                 product=self.product,
                 operation='SALE',
                 quantity=1,
@@ -267,6 +348,7 @@ class TestProductSalesViewSet(TestCase):
         
         # Criar vendas para diferentes produtos
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='SALE',
             quantity=10,
@@ -277,6 +359,7 @@ class TestProductSalesViewSet(TestCase):
         )
         
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=product2,
             operation='SALE',
             quantity=5,
@@ -330,6 +413,7 @@ class TestProductSalesViewSet(TestCase):
     def test_sales_summary_includes_product_names(self):
         """Testa se o resumo inclui nomes dos produtos."""
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='SALE',
             quantity=5,
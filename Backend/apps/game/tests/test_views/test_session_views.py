@@ -2,7 +2,7 @@
 Testes para as views de sessão de jogo.
 """
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -80,6 +80,38 @@ class TestGameSessionViewSet(TestCase):
         self.assertIn('days_passed', response.data)
         self.assertEqual(response.data['days_passed'], 2)
 
+    @override_settings(GAME_POLL_MIN_SECONDS=1, GAME_POLL_MAX_SECONDS=30)
+    def test_update_time_returns_polling_hint(self):
+        """Testa que a resposta sugere quando consultar de novo."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        game_session.pause_game()
+        
+        url = reverse('game-session-update-time')
+        response = self.client.post(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Pausado, o cliente espera o intervalo máximo
+        self.assertEqual(response.data['retry_after'], 30)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertIn('next_tick_at', response.data)
+
+    @override_settings(GAME_SERVER_TICK=True)
+    def test_update_time_with_server_tick(self):
+        """Testa que com o tick no servidor o endpoint apenas lê a sessão."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.status = 'ACTIVE'
+        game_session.last_update_time = timezone.now() - timedelta(seconds=40)
+        game_session.save()
+        
+        url = reverse('game-session-update-time')
+        response = self.client.post(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days_passed'], 0)
+        game_session.refresh_from_db()
+        self.assertEqual(game_session.current_game_date, date(2025, 1, 1))
+
     def test_pause_game(self):
         """Testa pausar o jogo."""
         game_session, _ = GameSession.objects.get_or_create(user=self.user)
@@ -279,3 +311,52 @@ class TestGameSessionViewSet(TestCase):
         
         self.assertGreater(game_session.current_game_date, initial_date)
         self.assertGreater(game_session.days_survived, initial_days)
+
+    def test_fast_forward(self):
+        """Testa avançar vários dias do jogo de uma vez."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        
+        url = reverse('game-session-fast-forward')
+        with self.settings(GAME_TICK_MAX_DAYS=30):
+            response = self.client.post(url, {'days': 30}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days_passed'], 30)
+        game_session.refresh_from_db()
+        self.assertEqual(game_session.current_game_date, date(2025, 1, 31))
+        self.assertEqual(game_session.days_survived, 30)
+
+    def test_fast_forward_respects_day_budget(self):
+        """Testa que o avanço rápido processa no máximo GAME_TICK_MAX_DAYS dias por requisição."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.start_game()
+        
+        url = reverse('game-session-fast-forward')
+        with self.settings(GAME_TICK_MAX_DAYS=10):
+            response = self.client.post(url, {'days': 366}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days_passed'], 10)
+        game_session.refresh_from_db()
+        self.assertEqual(game_session.current_game_date, date(2025, 1, 11))
+
+    def test_fast_forward_invalid_days(self):
+        """Testa avançar o jogo com quantidade de dias inválida."""
+        GameSession.objects.get_or_create(user=self.user)
+        
+        url = reverse('game-session-fast-forward')
+        response = self.client.post(url, {'days': 0}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fast_forward_finished_game(self):
+        """Testa avançar um jogo que já terminou."""
+        game_session, _ = GameSession.objects.get_or_create(user=self.user)
+        game_session.status = 'COMPLETED'
+        game_session.save()
+        
+        url = reverse('game-session-fast-forward')
+        response = self.client.post(url, {'days': 5}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
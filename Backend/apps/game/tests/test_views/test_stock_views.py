@@ -41,6 +41,7 @@ class TestProductStockHistoryViewSet(TestCase):
         Product.objects.all().delete()
         ProductCategory.objects.all().delete()
         Supplier.objects.all().delete()
+        self.game_session = GameSession.objects.get(user=self.user)
         
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
@@ -64,6 +65,7 @@ class TestProductStockHistoryViewSet(TestCase):
         """Testa listagem de histórico de estoque."""
         # Criar histórico de estoque
         history1 = ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -75,6 +77,7 @@ class TestProductStockHistoryViewSet(TestCase):
         )
         
         history2 = ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='SALE',
             quantity=5,
@@ -98,6 +101,7 @@ class TestProductStockHistoryViewSet(TestCase):
         """Testa ordenação do histórico de estoque."""
         # Criar histórico com datas diferentes
         history1 = ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -107,6 +111,7 @@ class TestProductStockHistoryViewSet(TestCase):
         )
         
         history2 = ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='SALE',
             quantity=5,
@@ -137,6 +142,7 @@ class TestProductStockHistoryViewSet(TestCase):
     def test_stock_history_includes_product_data(self):
         """Testa se o histórico inclui dados do produto."""
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -164,6 +170,7 @@ class TestProductStockHistoryViewSet(TestCase):
         
         for operation in operations:
             ProductStockHistory.objects.create(
+                game_session=self.game_session,
                 product=self.product,
                 operation=operation,
                 quantity=1,
@@ -200,6 +207,7 @@ class TestProductStockHistoryViewSet(TestCase):
         
         # Criar histórico para ambos os produtos
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -209,6 +217,7 @@ class TestProductStockHistoryViewSet(TestCase):
         )
         
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=product2,
             operation='PURCHASE',
             quantity=5,
@@ -235,6 +244,7 @@ class TestProductStockHistoryViewSet(TestCase):
     def test_stock_history_with_values(self):
         """Testa histórico com valores monetários."""
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -261,6 +271,7 @@ class TestProductStockHistoryViewSet(TestCase):
         """Testa histórico com data do jogo."""
         custom_date = date(2025, 6, 15)
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -302,6 +313,7 @@ class TestProductStockHistoryViewSet(TestCase):
         # Criar muitos registros de histórico
         for i in range(25):
             ProductStockHistory.objects.create(
+                game_session=self.game_session,
                 product=self.product,
                 operation='PURCHASE',
                 quantity=1,
@@ -328,6 +340,7 @@ class TestProductStockHistoryViewSet(TestCase):
     def test_stock_history_serializer_fields(self):
         """Testa se o serializer retorna todos os campos necessários."""
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='PURCHASE',
             quantity=10,
@@ -381,6 +394,7 @@ class TestProductStockHistoryViewSet(TestCase):
         """Testa validação de quantidade no histórico."""
         # Criar histórico com quantidade negativa (deve ser permitido para ajustes)
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='ADJUSTMENT',
             quantity=-2,
@@ -405,6 +419,7 @@ class TestProductStockHistoryViewSet(TestCase):
     def test_stock_history_with_null_values(self):
         """Testa histórico com valores nulos."""
         ProductStockHistory.objects.create(
+            game_session=self.game_session,
             product=self.product,
             operation='ADJUSTMENT',
             quantity=5,
@@ -0,0 +1,105 @@
+"""
+Testes para o stream de eventos do jogo.
+"""
+
+import json
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.game.services.events import broker
+
+User = get_user_model()
+
+
+@override_settings(GAME_SERVER_TICK=True, GAME_STREAM_ENABLED=True, GAME_STREAM_MAX_SECONDS=5)
+class TestGameEventStream(TestCase):
+    """Testes para game_event_stream."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test User',
+            last_name='Test User'
+        )
+        self.url = reverse('game-stream')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def _ticket(self):
+        response = self.client.post(
+            reverse('game-stream-ticket'), HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['ticket']
+
+    def test_stream_requires_authentication(self):
+        """Testa que o stream exige autenticação."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_rejects_invalid_ticket(self):
+        """Testa que um ticket inválido é recusado."""
+        response = self.client.get(self.url, {'ticket': 'invalido'})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_rejects_token_in_query_string(self):
+        """Testa que o JWT na URL não autentica o stream."""
+        response = self.client.get(self.url, {'token': self.token})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_ticket_is_single_use(self):
+        """Testa que o ticket abre o stream uma única vez."""
+        ticket = self._ticket()
+
+        response = self.client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        response = self.client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_ticket_requires_authentication(self):
+        """Testa que o ticket só é emitido para usuários autenticados."""
+        response = self.client.post(reverse('game-stream-ticket'))
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(GAME_STREAM_ENABLED=False)
+    def test_stream_disabled(self):
+        """Testa que o stream desativado não prende conexões."""
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(
+            reverse('game-stream-ticket'), HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream_sends_snapshot_and_published_events(self):
+        """Testa o estado inicial e a entrega dos eventos publicados."""
+        response = self.client.get(self.url, {'ticket': self._ticket()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = iter(response.streaming_content)
+        self.assertEqual(next(stream), b'retry: 3000\n\n')
+        snapshot = next(stream).decode()
+        self.assertIn('event: snapshot', snapshot)
+        self.assertIn('"current_game_date": "2025-01-01"', snapshot)
+
+        broker.publish(self.user.pk, 'balance', {'current_balance': '123.00'})
+        event = next(stream).decode()
+        self.assertIn('event: balance', event)
+        data = json.loads(event.split('data: ', 1)[1])
+        self.assertEqual(data, {'current_balance': '123.00'})
+
+        response.close()
+        self.assertFalse(broker.has_subscribers(self.user.pk))
@@ -11,7 +11,9 @@ from .views import (
     SupplierViewSet,
     ProductViewSet,
     ProductStockHistoryViewSet,
-    ProductSalesViewSet
+    ProductSalesViewSet,
+    game_event_stream,
+    game_stream_ticket
 )
 
 router = DefaultRouter()
@@ -24,5 +26,7 @@ router.register(r'stock-history', ProductStockHistoryViewSet, basename='product-
 router.register(r'sales', ProductSalesViewSet, basename='product-sales')
 
 urlpatterns = [
+    path('stream/', game_event_stream, name='game-stream'),
+    path('stream/ticket/', game_stream_ticket, name='game-stream-ticket'),
     path('', include(router.urls)),
 ]
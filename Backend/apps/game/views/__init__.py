@@ -7,6 +7,7 @@ from .product_views import ProductViewSet, ProductCategoryViewSet, SupplierViewS
 from .stock_views import ProductStockHistoryViewSet
 from .sales_views import ProductSalesViewSet
 from .dashboard_views import GameDashboardViewSet
+from .stream_views import game_event_stream, game_stream_ticket
 
 __all__ = [
     'GameSessionViewSet',
@@ -15,7 +16,9 @@ __all__ = [
     'SupplierViewSet',
     'ProductStockHistoryViewSet',
     'ProductSalesViewSet',
-    'GameDashboardViewSet'
+    'GameDashboardViewSet',
+    'game_event_stream',
+    'game_stream_ticket'
 ]
 
 
@@ -6,92 +6,97 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
-from django.db.models import Sum, Q
-from datetime import datetime, timedelta
-from calendar import monthrange
+from django.conf import settings
+from datetime import datetime
 
-from ..models import GameSession, Product, RealtimeSale
-from ..serializers import GameSessionSerializer, RealtimeSaleSerializer
-from apps.finance.models import UserBalance, Transaction
+from ..models import GameSession
+from ..services.dashboard import dashboard_changes, dashboard_snapshot
+from ..services.polling import add_polling_hint
+from ..services.sync import decode_cursor
+from apps.core.caching import cached_action
+from apps.core.views import UserContextMixin
+from apps.finance.models import MonthlyLedger, UserBalance
 
 
-class GameDashboardViewSet(viewsets.ViewSet):
+class GameDashboardViewSet(UserContextMixin, viewsets.ViewSet):
     """
     ViewSet para dados do dashboard do jogo.
     """
     permission_classes = [IsAuthenticated]
 
+    def _request_cursor(self, request):
+        """Cursor enviado pelo cliente em ?cursor= (None se ausente)."""
+        cursor = request.query_params.get('cursor')
+        if not cursor:
+            return None
+        # Posição 1: sequência de vendas da sessão
+        return decode_cursor(cursor, 4, sequences=(1,))
+
     @action(detail=False, methods=['get'])
     def data(self, request):
-        """Retorna dados do dashboard do jogo."""
+        """
+        Retorna dados do dashboard do jogo. Com ?cursor= retorna apenas o que
+        mudou desde o cursor ou 304 se nada mudou. Retry-After indica quando
+        consultar de novo.
+        """
         try:
-            # Sessão de jogo
-            game_session = GameSession.objects.get(user=request.user)
-            
-            # Saldo do usuário (Caixa da Loja)
-            user_balance = UserBalance.objects.get(user=request.user)
-            
-            # Estatísticas de produtos
-            total_products = Product.objects.filter(is_active=True).count()
-            low_stock_products = Product.objects.filter(
-                is_active=True,
-                current_stock__lte=models.F('min_stock')
-            ).count()
-            out_of_stock_products = Product.objects.filter(
-                is_active=True,
-                current_stock=0
-            ).count()
+            cursor = self._request_cursor(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            game_session = self.get_game_session()
+            user_balance = self.get_user_balance()
+            if cursor is None:
+                response = Response(dashboard_snapshot(game_session, user_balance))
+            else:
+                changes = dashboard_changes(game_session, user_balance, cursor)
+                if changes is None:
+                    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                else:
+                    response = Response(changes)
+            return add_polling_hint(response, game_session)
             
-            # Resumo de vendas da sessão atual
-            from django.db.models import Sum
-            sales_summary = RealtimeSale.objects.filter(
-                game_session=game_session
-            ).aggregate(
-                total_sales=Sum('quantity'),
-                total_revenue=Sum('total_value')
+        except GameSession.DoesNotExist:
+            return Response(
+                {'error': 'Sessão de jogo não encontrada'}, 
+                status=status.HTTP_404_NOT_FOUND
             )
+        except UserBalance.DoesNotExist:
+            return Response(
+                {'error': 'Saldo do usuário não encontrado'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+    @action(detail=False, methods=['post'])
+    def tick(self, request):
+        """
+        Avança o tempo do jogo e retorna os dados do dashboard na mesma resposta,
+        reaproveitando a sessão carregada para o tick. Com ?cursor= retorna
+        apenas o que mudou desde o cursor.
+        """
+        try:
+            cursor = self._request_cursor(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            game_session = self.get_game_session()
+            user_balance = self.get_user_balance()
             
-            # Alertas de estoque
-            low_stock_products = Product.objects.filter(
-                is_active=True,
-                current_stock__lte=models.F('min_stock'),
-                current_stock__gt=0
-            ).count()
-            
-            out_of_stock_products = Product.objects.filter(
-                is_active=True,
-                current_stock=0
-            ).count()
-            
-            # Busca vendas em tempo real apenas do dia atual do jogo (últimas 20)
-            realtime_sales = RealtimeSale.objects.filter(
-                game_session=game_session,
-                game_date=game_session.current_game_date
-            ).select_related('product', 'product__category').order_by('-game_time')[:20]
-            
-            return Response({
-                'game_session': GameSessionSerializer(game_session).data,
-                'balance': {
-                    'current_balance': user_balance.current_balance,
-                    'balance_formatted': user_balance.balance_formatted
-                },
-                'products': {
-                    'total': total_products,
-                    'low_stock': low_stock_products,
-                    'out_of_stock': out_of_stock_products
-                },
-                'sales': {
-                    'total_sales': sales_summary['total_sales'] or 0,
-                    'total_revenue': sales_summary['total_revenue'] or 0
-                },
-                'stock_alerts': {
-                    'low_stock_count': low_stock_products,
-                    'out_of_stock_count': out_of_stock_products,
-                    'has_alerts': low_stock_products > 0 or out_of_stock_products > 0
-                },
-                'realtime_sales': RealtimeSaleSerializer(realtime_sales, many=True).data
-            })
+            days_passed = 0
+            if not settings.GAME_SERVER_TICK:
+                days_passed = game_session.update_game_time()
+                # Saldo relido depois do tick para incluir as vendas processadas
+                user_balance.refresh_from_db()
+            if cursor is None:
+                snapshot = dashboard_snapshot(game_session, user_balance)
+            else:
+                snapshot = dashboard_changes(game_session, user_balance, cursor) or {
+                    'cursor': request.query_params['cursor']
+                }
+            snapshot['days_passed'] = days_passed
+            return add_polling_hint(Response(snapshot), game_session)
             
         except GameSession.DoesNotExist:
             return Response(
@@ -105,36 +110,18 @@ class GameDashboardViewSet(viewsets.ViewSet):
             )
 
     @action(detail=False, methods=['get'])
+    @cached_action('finance')
     def monthly_profits(self, request):
         """Retorna histórico de lucros mensais brutos."""
         try:
-            # Busca transações de receitas (vendas) e despesas (compras)
-            transactions = Transaction.objects.filter(
-                user=request.user,
-                is_active=True
-            )
-            
-            # Calcula lucros mensais
+            # Receitas (vendas) e despesas (compras) de cada mês, dos totais mensais
             monthly_data = []
             total_profit = 0
             
-            # Busca todos os meses que têm transações
-            months_with_transactions = transactions.values_list('transaction_date__year', 'transaction_date__month').distinct().order_by('-transaction_date__year', '-transaction_date__month')
-            
-            for year, month in months_with_transactions:
-                # Calcula receitas do mês (vendas)
-                monthly_revenue = transactions.filter(
-                    transaction_type='INCOME',
-                    transaction_date__year=year,
-                    transaction_date__month=month
-                ).aggregate(total=Sum('amount'))['total'] or 0
-                
-                # Calcula despesas do mês (compras)
-                monthly_expenses = transactions.filter(
-                    transaction_type='EXPENSE',
-                    transaction_date__year=year,
-                    transaction_date__month=month
-                ).aggregate(total=Sum('amount'))['total'] or 0
+            for totals in MonthlyLedger.monthly_totals(request.user):
+                year, month = totals['year'], totals['month']
+                monthly_revenue = totals['income_total'] or 0
+                monthly_expenses = totals['expense_total'] or 0
                 
                 # Calcula lucro bruto (receitas - despesas)
                 monthly_profit = float(monthly_revenue) - float(monthly_expenses)
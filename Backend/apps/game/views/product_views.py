@@ -7,15 +7,31 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction, models
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from decimal import Decimal
 from datetime import date
 
-from ..models import Product, ProductCategory, Supplier, ProductStockHistory
+from ..models import GameSession, Product, ProductCategory, Supplier, ProductStockHistory, SessionInventory
+from ..services.catalog import product_listing
+from ..services.reference import product_categories, suppliers
+from ..services.sync import decode_cursor, encode_cursor, latest
 from ..serializers import (
     ProductSerializer, ProductCategorySerializer, SupplierSerializer,
     ProductPurchaseSerializer
 )
-from apps.finance.models import UserBalance, Transaction, Category, BalanceHistory
+from apps.core.views import UserContextMixin
+from apps.finance.models import UserBalance, Transaction, BalanceHistory
+from apps.finance.registry import PURCHASES, system_category
+
+
+def _reference_list(viewset, entries):
+    """Resposta paginada com as linhas ativas de um registro de referência."""
+    entries = [entry for entry in entries if entry.is_active]
+    page = viewset.paginate_queryset(entries)
+    if page is not None:
+        return viewset.get_paginated_response(viewset.get_serializer(page, many=True).data)
+    return Response(viewset.get_serializer(entries, many=True).data)
 
 
 class ProductCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -28,6 +44,10 @@ class ProductCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return ProductCategory.objects.filter(is_active=True)
 
+    def list(self, request, *args, **kwargs):
+        """Lista as categorias ativas a partir do registro de dados de referência."""
+        return _reference_list(self, product_categories.all())
+
 
 class SupplierViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -39,8 +59,12 @@ class SupplierViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return Supplier.objects.filter(is_active=True)
 
+    def list(self, request, *args, **kwargs):
+        """Lista os fornecedores ativos a partir do registro de dados de referência."""
+        return _reference_list(self, suppliers.all())
 
-class ProductViewSet(viewsets.ModelViewSet):
+
+class ProductViewSet(UserContextMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar produtos.
     Consolidada das duas classes ProductViewSet originais.
@@ -49,19 +73,88 @@ class ProductViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Product.objects.filter(is_active=True).select_related('category', 'supplier')
+        # Produtos com o estoque da sessão do usuário em session_stock
+        return SessionInventory.annotate_products(
+            Product.objects.filter(is_active=True).select_related('category', 'supplier'),
+            self.request.user
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lista os produtos com o cursor de sincronização no cabeçalho
+        X-Sync-Cursor. Sem filtros nem ordenação, a lista sai do catálogo em
+        cache com ETag. Com ?cursor= retorna apenas os produtos cujo catálogo
+        ou estoque da sessão mudou desde o cursor (inclusive os desativados)
+        ou 304 se nada mudou.
+        """
+        cursor = request.query_params.get('cursor')
+        if not cursor and not set(request.query_params) - {'page'}:
+            return self._cached_list(request)
+        if not cursor:
+            # Versão lida antes da listagem: uma alteração concorrente volta no próximo delta
+            version = latest(
+                Product.objects.aggregate(version=models.Max('updated_at'))['version'],
+                SessionInventory.objects.filter(game_session__user=request.user).aggregate(
+                    version=models.Max('updated_at')
+                )['version']
+            )
+            response = super().list(request, *args, **kwargs)
+            response['X-Sync-Cursor'] = encode_cursor(version)
+            return response
+
+        try:
+            since, = decode_cursor(cursor, 1)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        changed_stock = SessionInventory.objects.filter(
+            game_session__user=request.user, updated_at__gt=since
+        ).values('product_id')
+        products = list(SessionInventory.annotate_products(
+            Product.objects.filter(
+                models.Q(updated_at__gt=since) | models.Q(pk__in=changed_stock)
+            ).select_related('category', 'supplier'),
+            request.user
+        ))
+        if not products:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+        new_cursor = encode_cursor(max(
+            latest(product.updated_at, product.session_stock_updated_at) for product in products
+        ))
+        serializer = self.get_serializer(products, many=True)
+        response = Response({'cursor': new_cursor, 'results': serializer.data})
+        response['X-Sync-Cursor'] = new_cursor
+        return response
+
+    def _cached_list(self, request):
+        """
+        Lista o catálogo em cache com o estoque da sessão aplicado, com ETag:
+        um If-None-Match igual recebe 304 sem corpo.
+        """
+        products, etag, version = product_listing(request.user)
+        etag = quote_etag(etag)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            page = self.paginate_queryset(products)
+            response = self.get_paginated_response(page) if page is not None else Response(products)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        response['X-Sync-Cursor'] = encode_cursor(version)
+        return response
 
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Retorna produtos com estoque baixo."""
-        products = self.get_queryset().filter(current_stock__lte=models.F('min_stock'))
+        products = self.get_queryset().filter(session_stock__lte=models.F('min_stock'))
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def out_of_stock(self, request):
         """Retorna produtos fora de estoque."""
-        products = self.get_queryset().filter(current_stock=0)
+        products = self.get_queryset().filter(session_stock=0)
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
 
@@ -80,52 +173,47 @@ class ProductViewSet(viewsets.ModelViewSet):
                     description = serializer.validated_data.get('description', f'Compra de {product.name}')
                     total_value = unit_price * quantity
                     
-                    # Verificar saldo disponível
-                    user_balance = UserBalance.objects.get(user=request.user)
-                    if user_balance.current_balance < total_value:
-                        return Response(
-                            {'error': 'Saldo insuficiente'}, 
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-                    
-                    # Subtrair do saldo
-                    user_balance.subtract_amount(total_value)
+                    # Debitar do saldo: a verificação de saldo faz parte do UPDATE
+                    user_balance = self.get_user_balance()
+                    new_balance = user_balance.subtract_amount(total_value, require_funds=True)
                     
-                    # Adicionar ao estoque
-                    product.add_stock(quantity)
+                    # Adicionar ao estoque da sessão
+                    game_session = self.get_game_session()
+                    new_stock = SessionInventory.add(game_session, product, quantity)
+                    product.session_stock = new_stock
                     
                     # Registrar no histórico de estoque
                     ProductStockHistory.objects.create(
+                        game_session=game_session,
                         product=product,
                         operation='PURCHASE',
                         quantity=quantity,
-                        previous_stock=product.current_stock - quantity,
-                        new_stock=product.current_stock,
+                        previous_stock=new_stock - quantity,
+                        new_stock=new_stock,
                         unit_price=unit_price,
                         total_value=total_value,
                         description=description
                     )
                     
                     # Criar transação financeira
-                    compras_category, _ = Category.objects.get_or_create(
-                        name='Compras',
-                        defaults={
-                            'description': 'Compras de produtos dos fornecedores',
-                            'color': '#EF4444',
-                            'icon': '🛒'
-                        }
-                    )
-                    # Buscar data atual do jogo
-                    from apps.game.models import GameSession
-                    game_session = GameSession.objects.get(user=request.user)
-                    
+                    compras_category = system_category(PURCHASES)
+                    # Saldo já debitado acima: a transação não debita de novo
                     Transaction.objects.create(
                         user=request.user,
                         amount=total_value,
                         transaction_type='EXPENSE',
                         category=compras_category,
                         description=f'Compra: {product.name} - {quantity} unidades',
-                        transaction_date=game_session.current_game_date
+                        transaction_date=game_session.current_game_date,
+                        balance_updated=True
+                    )
+                    BalanceHistory.objects.create(
+                        user_balance=user_balance,
+                        operation='SUBTRACT',
+                        amount=total_value,
+                        previous_balance=new_balance + total_value,
+                        new_balance=new_balance,
+                        description=f'Transação: Compra: {product.name} - {quantity} unidades'
                     )
                     
                     return Response({
@@ -150,36 +238,47 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         try:
             # Obter saldo do usuário
-            user_balance = UserBalance.objects.get(user=request.user)
+            user_balance = self.get_user_balance()
             
-            # Obter todos os produtos ativos
-            products = Product.objects.filter(is_active=True)
+            # Obter o estoque da sessão de todos os produtos ativos
+            game_session = self.get_game_session()
+            inventories = SessionInventory.objects.filter(
+                game_session=game_session, product__is_active=True
+            ).select_related('product')
             
             total_cost = Decimal('0.00')
             restocked_products = []
             
             with transaction.atomic():
-                for product in products:
+                for inventory in inventories:
+                    product = inventory.product
+                    
                     # Calcular quantidade necessária para repor ao máximo
-                    quantity_needed = product.max_stock - product.current_stock
+                    quantity_needed = product.max_stock - inventory.current_stock
                     
                     if quantity_needed > 0:
+                        # Atualizar estoque só se ninguém o alterou desde a leitura
+                        # (ex.: vendas do tick); senão o produto fica fora da reposição
+                        old_stock = inventory.current_stock
+                        if not SessionInventory.objects.filter(pk=inventory.pk, current_stock=old_stock).update(
+                            current_stock=product.max_stock,
+                            updated_at=timezone.now()
+                        ):
+                            continue
+                        inventory.current_stock = product.max_stock
+                        
                         # Calcular custo total para este produto
                         product_cost = product.purchase_price * quantity_needed
                         total_cost += product_cost
                         
-                        # Atualizar estoque
-                        old_stock = product.current_stock
-                        product.current_stock = product.max_stock
-                        product.save()
-                        
                         # Registrar no histórico de estoque
                         ProductStockHistory.objects.create(
+                            game_session=game_session,
                             product=product,
                             operation='PURCHASE',
                             quantity=quantity_needed,
                             previous_stock=old_stock,
-                            new_stock=product.current_stock,
+                            new_stock=inventory.current_stock,
                             unit_price=product.purchase_price,
                             total_value=product_cost,
                             description=f'Reposição automática para estoque máximo',
@@ -190,12 +289,27 @@ class ProductViewSet(viewsets.ModelViewSet):
                             'id': product.id,
                             'name': product.name,
                             'quantity_added': quantity_needed,
-                            'new_stock': product.current_stock,
+                            'new_stock': inventory.current_stock,
                             'cost': float(product_cost)
                         })
-                
-                # Verificar se o usuário tem saldo suficiente
-                if total_cost > user_balance.current_balance:
+
+                # Nada a cobrar: sem débito, transação ou histórico de saldo vazios
+                if total_cost == 0:
+                    return Response({
+                        'success': True,
+                        'message': f'Estoque reposto com sucesso! {len(restocked_products)} produtos foram reabastecidos.',
+                        'total_cost': 0.0,
+                        'restocked_products': restocked_products,
+                        'new_balance': float(user_balance.current_balance)
+                    })
+
+                # Debitar do saldo do usuário; a verificação de saldo faz parte do UPDATE
+                try:
+                    user_balance.subtract_amount(total_cost, require_funds=True)
+                except ValueError:
+                    user_balance.refresh_from_db(fields=['current_balance'])
+                    # Desfaz a reposição do estoque feita acima
+                    transaction.set_rollback(True)
                     return Response(
                         {
                             'error': 'Saldo insuficiente',
@@ -205,22 +319,10 @@ class ProductViewSet(viewsets.ModelViewSet):
                         },
                         status=status.HTTP_400_BAD_REQUEST
                     )
-                
-                # Debitar do saldo do usuário
-                previous_balance = user_balance.current_balance
-                user_balance.current_balance -= total_cost
-                user_balance.save()
+                previous_balance = user_balance.current_balance + total_cost
                 
                 # Registrar transação financeira (sem atualizar saldo automaticamente)
-                # Buscar categoria de Compras ou usar a primeira disponível
-                category = Category.objects.filter(name='Compras').first()
-                if not category:
-                    category = Category.objects.filter(category_type='EXPENSE').first()
-                if not category:
-                    category = Category.objects.first()
-                
-                if not category:
-                    raise Exception("Nenhuma categoria encontrada para registrar a transação")
+                category = system_category(PURCHASES)
                 
                 financial_transaction = Transaction(
                     user=request.user,
@@ -255,6 +357,11 @@ class ProductViewSet(viewsets.ModelViewSet):
                 {'error': 'Saldo do usuário não encontrado'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+        except GameSession.DoesNotExist:
+            return Response(
+                {'error': 'Sessão de jogo não encontrada'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             return Response(
                 {'error': f'Erro ao repor estoque: {str(e)}'}, 
@@ -267,13 +374,15 @@ class ProductViewSet(viewsets.ModelViewSet):
         Calcula o custo total para repor todo o estoque ao máximo.
         """
         try:
-            products = Product.objects.filter(is_active=True)
+            products = SessionInventory.annotate_products(
+                Product.objects.filter(is_active=True), request.user
+            )
             
             total_cost = Decimal('0.00')
             products_needing_restock = []
             
             for product in products:
-                quantity_needed = product.max_stock - product.current_stock
+                quantity_needed = product.max_stock - product.session_stock
                 
                 if quantity_needed > 0:
                     product_cost = product.purchase_price * quantity_needed
@@ -282,7 +391,7 @@ class ProductViewSet(viewsets.ModelViewSet):
                     products_needing_restock.append({
                         'id': product.id,
                         'name': product.name,
-                        'current_stock': product.current_stock,
+                        'current_stock': product.session_stock,
                         'max_stock': product.max_stock,
                         'quantity_needed': quantity_needed,
                         'unit_price': float(product.purchase_price),
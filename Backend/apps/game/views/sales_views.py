@@ -10,12 +10,16 @@ from django.db import transaction
 from django.utils import timezone
 from datetime import date
 
-from ..models import Product, ProductStockHistory
+from ..models import DailySalesRollup, Product, ProductStockHistory, SessionInventory
 from ..serializers import ProductStockOperationSerializer, ProductSerializer, ProductStockHistorySerializer
-from apps.finance.models import UserBalance, Transaction, Category
+from ..services import analytics
+from apps.core.caching import cached_action
+from apps.core.views import UserContextMixin
+from apps.finance.models import Transaction
+from apps.finance.registry import SALES, system_category
 
 
-class ProductSalesViewSet(viewsets.ViewSet):
+class ProductSalesViewSet(UserContextMixin, viewsets.ViewSet):
     """
     ViewSet para operações de vendas.
     """
@@ -34,50 +38,37 @@ class ProductSalesViewSet(viewsets.ViewSet):
                     description = serializer.validated_data.get('description', f'Venda de {quantity} unidades')
                     
                     product = Product.objects.get(id=product_id, is_active=True)
+                    game_session = self.get_game_session()
                     
-                    # Verificar estoque
-                    if product.current_stock < quantity:
-                        return Response(
-                            {'error': 'Estoque insuficiente'}, 
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
+                    # Bloqueia a sessão antes do estoque, na mesma ordem do tick, e
+                    # numera a venda para o cursor do dashboard
+                    game_session.next_sales_sequence()
                     
                     # Calcular valor da venda
                     unit_price = product.current_price
                     total_value = unit_price * quantity
                     
-                    # Remover do estoque
-                    product.remove_stock(quantity)
-                    
-                    # Adicionar ao saldo
-                    user_balance = UserBalance.objects.get(user=request.user)
-                    user_balance.add_amount(total_value)
+                    # Remover do estoque da sessão: a verificação de estoque faz parte do UPDATE
+                    new_stock = SessionInventory.remove(game_session, product, quantity)
+                    product.session_stock = new_stock
                     
                     # Registrar no histórico de estoque
                     ProductStockHistory.objects.create(
+                        game_session=game_session,
                         product=product,
                         operation='SALE',
                         quantity=quantity,
-                        previous_stock=product.current_stock + quantity,
-                        new_stock=product.current_stock,
+                        previous_stock=new_stock + quantity,
+                        new_stock=new_stock,
                         unit_price=unit_price,
                         total_value=total_value,
-                        description=description
+                        description=description,
+                        game_date=game_session.current_game_date
                     )
                     
                     # Criar transação financeira
-                    vendas_category, _ = Category.objects.get_or_create(
-                        name='Vendas',
-                        defaults={
-                            'description': 'Receitas de vendas de produtos',
-                            'color': '#10B981',
-                            'icon': '💰'
-                        }
-                    )
-                    # Buscar data atual do jogo
-                    from apps.game.models import GameSession
-                    game_session = GameSession.objects.get(user=request.user)
-                    
+                    vendas_category = system_category(SALES)
+                    # A transação credita o saldo (um único UPDATE) e registra o histórico
                     Transaction.objects.create(
                         user=request.user,
                         amount=total_value,
@@ -102,6 +93,7 @@ class ProductSalesViewSet(viewsets.ViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'])
+    @cached_action('sales')
     def sales_summary(self, request):
         """Retorna resumo de vendas."""
         from django.db.models import Sum, Count
@@ -109,24 +101,22 @@ class ProductSalesViewSet(viewsets.ViewSet):
         # Vendas recentes (últimos 30 dias)
         from datetime import timedelta
         recent_sales = ProductStockHistory.objects.filter(
+            game_session__user=request.user,
             operation='SALE',
             created_at__gte=timezone.now() - timedelta(days=30)
         ).order_by('-created_at')[:10]
         
-        # Produtos mais vendidos
-        top_products = ProductStockHistory.objects.filter(
-            operation='SALE'
-        ).values('product__name').annotate(
+        # Produtos mais vendidos e totais, do agregado diário de vendas
+        rollup = DailySalesRollup.objects.filter(game_session__user=request.user)
+        top_products = rollup.values('product__name').annotate(
             total_quantity=Sum('quantity'),
-            total_revenue=Sum('total_value')
+            total_revenue=Sum('revenue')
         ).order_by('-total_quantity')[:5]
         
         # Totais
-        total_sales = ProductStockHistory.objects.filter(
-            operation='SALE'
-        ).aggregate(
+        total_sales = rollup.aggregate(
             total_quantity=Sum('quantity'),
-            total_revenue=Sum('total_value')
+            total_revenue=Sum('revenue')
         )
         
         return Response({
@@ -137,121 +127,38 @@ class ProductSalesViewSet(viewsets.ViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @cached_action('sales')
     def sales_charts_data(self, request):
         """Retorna dados para gráficos de vendas."""
-        from django.db.models import Sum, Count
-        from datetime import datetime, timedelta
-        from calendar import monthrange
+        from django.db.models import Sum
+        from datetime import timedelta
         
         # Parâmetros de período
         period = request.GET.get('period', 'monthly')  # daily, weekly, monthly
         days_back = int(request.GET.get('days_back', 30))
         
-        end_date = timezone.now().date()
+        # As vendas são agregadas por dia do jogo: a janela termina no dia atual do jogo
+        end_date = self.get_game_session().current_game_date
         start_date = end_date - timedelta(days=days_back)
         
-        # Dados para gráfico de vendas por período
-        sales_by_period = []
-        
-        if period == 'daily':
-            # Vendas por dia
-            for i in range(days_back):
-                current_date = start_date + timedelta(days=i)
-                daily_sales = ProductStockHistory.objects.filter(
-                    operation='SALE',
-                    game_date=current_date
-                ).aggregate(
-                    total_quantity=Sum('quantity'),
-                    total_revenue=Sum('total_value')
-                )
-                
-                sales_by_period.append({
-                    'period': current_date.strftime('%d/%m'),
-                    'period_key': current_date.strftime('%Y-%m-%d'),
-                    'total_quantity': daily_sales['total_quantity'] or 0,
-                    'total_revenue': float(daily_sales['total_revenue'] or 0),
-                    'revenue_formatted': f"R$ {float(daily_sales['total_revenue'] or 0):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                })
-        
-        elif period == 'weekly':
-            # Vendas por semana
-            current_date = start_date
-            week_count = 0
-            while current_date <= end_date:
-                week_end = min(current_date + timedelta(days=6), end_date)
-                weekly_sales = ProductStockHistory.objects.filter(
-                    operation='SALE',
-                    game_date__range=[current_date, week_end]
-                ).aggregate(
-                    total_quantity=Sum('quantity'),
-                    total_revenue=Sum('total_value')
-                )
-                
-                sales_by_period.append({
-                    'period': f"Semana {week_count + 1}",
-                    'period_key': f"{current_date.strftime('%Y-%m-%d')}_{week_end.strftime('%Y-%m-%d')}",
-                    'total_quantity': weekly_sales['total_quantity'] or 0,
-                    'total_revenue': float(weekly_sales['total_revenue'] or 0),
-                    'revenue_formatted': f"R$ {float(weekly_sales['total_revenue'] or 0):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                })
-                
-                current_date += timedelta(days=7)
-                week_count += 1
+        sales = DailySalesRollup.objects.filter(game_session__user=request.user)
         
-        else:  # monthly
-            # Vendas por mês
-            current_date = start_date.replace(day=1)
-            while current_date <= end_date:
-                # Último dia do mês
-                last_day = monthrange(current_date.year, current_date.month)[1]
-                month_end = current_date.replace(day=last_day)
-                
-                monthly_sales = ProductStockHistory.objects.filter(
-                    operation='SALE',
-                    game_date__year=current_date.year,
-                    game_date__month=current_date.month
-                ).aggregate(
-                    total_quantity=Sum('quantity'),
-                    total_revenue=Sum('total_value')
-                )
-                
-                month_names = {
-                    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
-                    7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
-                }
-                
-                sales_by_period.append({
-                    'period': f"{month_names[current_date.month]} {current_date.year}",
-                    'period_key': f"{current_date.year}-{current_date.month:02d}",
-                    'total_quantity': monthly_sales['total_quantity'] or 0,
-                    'total_revenue': float(monthly_sales['total_revenue'] or 0),
-                    'revenue_formatted': f"R$ {float(monthly_sales['total_revenue'] or 0):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                })
-                
-                # Próximo mês
-                if current_date.month == 12:
-                    current_date = current_date.replace(year=current_date.year + 1, month=1)
-                else:
-                    current_date = current_date.replace(month=current_date.month + 1)
+        # Dados para gráfico de vendas por período (uma consulta agrupada)
+        sales_by_period = analytics.sales_by_period(sales, period, start_date, end_date, days_back)
         
         # Produtos mais vendidos (top 10)
-        top_products = ProductStockHistory.objects.filter(
-            operation='SALE',
-            game_date__range=[start_date, end_date]
-        ).values(
+        period_sales = sales.filter(game_date__range=[start_date, end_date])
+        top_products = period_sales.values(
             'product__id', 'product__name', 'product__category__name', 'product__category__color'
         ).annotate(
             total_quantity=Sum('quantity'),
-            total_revenue=Sum('total_value')
+            total_revenue=Sum('revenue')
         ).order_by('-total_revenue')[:10]
         
         # Vendas por categoria
-        sales_by_category = ProductStockHistory.objects.filter(
-            operation='SALE',
-            game_date__range=[start_date, end_date]
-        ).values('product__category__name', 'product__category__color').annotate(
+        sales_by_category = period_sales.values('product__category__name', 'product__category__color').annotate(
             total_quantity=Sum('quantity'),
-            total_revenue=Sum('total_value')
+            total_revenue=Sum('revenue')
         ).order_by('-total_revenue')
         
         return Response({
@@ -264,72 +171,38 @@ class ProductSalesViewSet(viewsets.ViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @cached_action('sales')
     def detailed_analysis(self, request):
         """Retorna análise detalhada de vendas."""
-        from django.db.models import Sum, Count, Avg
         from datetime import timedelta
         
         # Parâmetros
         days_back = int(request.GET.get('days_back', 30))
-        end_date = timezone.now().date()
+        end_date = self.get_game_session().current_game_date
         start_date = end_date - timedelta(days=days_back)
         
-        # Estatísticas gerais
-        total_sales = ProductStockHistory.objects.filter(
-            operation='SALE',
-            game_date__range=[start_date, end_date]
-        ).aggregate(
-            total_quantity=Sum('quantity'),
-            total_revenue=Sum('total_value'),
-            avg_unit_price=Avg('unit_price'),
-            total_transactions=Count('id')
-        )
+        sales = DailySalesRollup.objects.filter(game_session__user=request.user)
+        period_sales = sales.filter(game_date__range=[start_date, end_date])
         
-        # Produto com maior receita
-        best_selling_product = ProductStockHistory.objects.filter(
-            operation='SALE',
-            game_date__range=[start_date, end_date]
-        ).values('product__name').annotate(
-            total_revenue=Sum('total_value')
-        ).order_by('-total_revenue').first()
-        
-        # Produto mais vendido em quantidade
-        most_sold_product = ProductStockHistory.objects.filter(
-            operation='SALE',
-            game_date__range=[start_date, end_date]
-        ).values('product__name').annotate(
-            total_quantity=Sum('quantity')
-        ).order_by('-total_quantity').first()
+        # Estatísticas gerais e receita do período anterior (comparação de crescimento)
+        previous_start = start_date - timedelta(days=days_back)
+        total_sales = analytics.period_comparison(sales, start_date, end_date, previous_start)
+        
+        # Produto com maior receita e produto mais vendido em quantidade
+        products = analytics.sales_by_product(period_sales)
+        best_selling_product = None
+        most_sold_product = None
+        if products:
+            best = max(products, key=lambda product: product['total_revenue'])
+            most = max(products, key=lambda product: product['total_quantity'])
+            best_selling_product = {'product__name': best['product__name'], 'total_revenue': best['total_revenue']}
+            most_sold_product = {'product__name': most['product__name'], 'total_quantity': most['total_quantity']}
         
         # Vendas por dia da semana
-        sales_by_weekday = []
-        weekdays = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
-        
-        for i in range(7):
-            weekday_sales = ProductStockHistory.objects.filter(
-                operation='SALE',
-                game_date__range=[start_date, end_date],
-                game_date__week_day=i+2  # Django usa 2=Monday, 3=Tuesday, etc.
-            ).aggregate(
-                total_quantity=Sum('quantity'),
-                total_revenue=Sum('total_value')
-            )
-            
-            sales_by_weekday.append({
-                'weekday': weekdays[i],
-                'total_quantity': weekday_sales['total_quantity'] or 0,
-                'total_revenue': float(weekday_sales['total_revenue'] or 0)
-            })
-        
-        # Crescimento de vendas (comparação com período anterior)
-        previous_start = start_date - timedelta(days=days_back)
-        previous_period_sales = ProductStockHistory.objects.filter(
-            operation='SALE',
-            game_date__range=[previous_start, start_date - timedelta(days=1)]
-        ).aggregate(total_revenue=Sum('total_value'))
+        sales_by_weekday = analytics.sales_by_weekday(period_sales)
         
         current_revenue = float(total_sales['total_revenue'] or 0)
-        previous_revenue = float(previous_period_sales['total_revenue'] or 0)
+        previous_revenue = float(total_sales['previous_revenue'] or 0)
         
         growth_percentage = 0
         if previous_revenue > 0:
@@ -339,9 +212,9 @@ class ProductSalesViewSet(viewsets.ViewSet):
             'general_stats': {
                 'total_quantity': total_sales['total_quantity'] or 0,
                 'total_revenue': current_revenue,
-                'total_revenue_formatted': f"R$ {current_revenue:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+                'total_revenue_formatted': analytics.format_brl(current_revenue),
                 'avg_unit_price': float(total_sales['avg_unit_price'] or 0),
-                'avg_unit_price_formatted': f"R$ {float(total_sales['avg_unit_price'] or 0):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
+                'avg_unit_price_formatted': analytics.format_brl(total_sales['avg_unit_price'] or 0),
                 'total_transactions': total_sales['total_transactions'] or 0
             },
             'best_selling_product': best_selling_product,
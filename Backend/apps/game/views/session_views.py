@@ -2,14 +2,16 @@
 Views para gerenciamento de sessões de jogo.
 """
 
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 
 from ..models import GameSession
-from ..serializers import GameSessionSerializer
+from ..serializers import GameSessionSerializer, GameFastForwardSerializer
+from ..services.polling import add_polling_hint
 
 
 class GameSessionViewSet(viewsets.ModelViewSet):
@@ -37,13 +39,39 @@ class GameSessionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def update_time(self, request):
-        """Atualiza o tempo do jogo."""
+        """
+        Atualiza o tempo do jogo.
+        Com GAME_SERVER_TICK o tempo é avançado pelo servidor e aqui só há leitura.
+        A resposta indica em next_tick_at/Retry-After quando consultar de novo.
+        """
         game_session = self.get_object()
-        days_passed = game_session.update_game_time()
+        days_passed = 0
+        if not settings.GAME_SERVER_TICK:
+            days_passed = game_session.update_game_time()
         serializer = self.get_serializer(game_session)
-        return Response({
+        return add_polling_hint(Response({
             'game_session': serializer.data,
             'days_passed': days_passed
+        }), game_session)
+
+    @action(detail=False, methods=['post'])
+    def fast_forward(self, request):
+        """Avança vários dias do jogo de uma vez."""
+        serializer = GameFastForwardSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        game_session = self.get_object()
+        if game_session.is_game_over():
+            return Response(
+                {'error': 'O jogo já terminou'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        days_passed = game_session.fast_forward(serializer.validated_data['days'])
+        return Response({
+            'game_session': self.get_serializer(game_session).data,
+            'days_passed': days_passed
         })
 
     @action(detail=False, methods=['post'])
@@ -11,12 +11,14 @@ from ..serializers import ProductStockHistorySerializer
 
 class ProductStockHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    ViewSet para visualizar histórico de estoque.
+    ViewSet para visualizar histórico de estoque da sessão do usuário.
     """
     serializer_class = ProductStockHistorySerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return ProductStockHistory.objects.select_related('product').order_by('-created_at')
+        return ProductStockHistory.objects.filter(
+            game_session__user=self.request.user
+        ).select_related('product').order_by('-created_at')
 
 
@@ -0,0 +1,175 @@
+"""
+Stream de eventos do jogo via Server-Sent Events.
+
+Cada conexão aberta ocupa um worker (ou thread) do servidor WSGI durante até
+GAME_STREAM_MAX_SECONDS: com N workers síncronos, N navegadores conectados
+bloqueiam as demais requisições. Por isso o stream só é servido com
+GAME_STREAM_ENABLED, pensado para servidores com workers assíncronos ou de
+threads (ex.: gunicorn -k gevent/gthread) dimensionados para as conexões.
+
+O EventSource do navegador não envia cabeçalhos: em vez do JWT na URL (que
+acabaria nos logs de acesso), o cliente pede um ticket de uso único em
+stream/ticket/ e abre o stream com ?ticket=.
+"""
+
+import json
+import logging
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from ..models import GameSession
+from ..serializers import GameSessionSerializer
+from ..services.events import broker
+
+logger = logging.getLogger(__name__)
+
+# Intervalo sem eventos após o qual um comentário mantém a conexão aberta
+KEEPALIVE_SECONDS = 15
+# Tempo de espera sugerido ao navegador antes de reconectar
+RETRY_MILLISECONDS = 3000
+# Prefixo das chaves dos tickets do stream no cache
+TICKET_PREFIX = 'game:stream-ticket:'
+
+
+def format_event(event_id, event, data):
+    """Formata um evento no protocolo SSE."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+def issue_stream_ticket(user):
+    """Cria um ticket de uso único, válido por GAME_STREAM_TICKET_SECONDS."""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(f'{TICKET_PREFIX}{ticket}', user.pk, settings.GAME_STREAM_TICKET_SECONDS)
+    return ticket
+
+
+def redeem_stream_ticket(ticket):
+    """
+    Consome o ticket e retorna o usuário dono dele, ou None se o ticket não
+    existe, expirou ou já foi usado. Só quem apaga a chave o consome.
+    """
+    from django.contrib.auth import get_user_model
+
+    key = f'{TICKET_PREFIX}{ticket}'
+    user_id = cache.get(key)
+    if user_id is None or not cache.delete(key):
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+def authenticate_stream(request):
+    """
+    Autentica o stream pela sessão do Django, pelo cabeçalho Authorization ou
+    pelo parâmetro ?ticket= (ticket de uso único de game_stream_ticket).
+    """
+    if request.user.is_authenticated:
+        return request.user
+
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return redeem_stream_ticket(ticket)
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError):
+        return None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def game_stream_ticket(request):
+    """Emite o ticket de uso único para abrir o stream de eventos."""
+    if not settings.GAME_STREAM_ENABLED:
+        return Response({'error': 'Stream de eventos desativado'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'ticket': issue_stream_ticket(request.user),
+        'expires_in': settings.GAME_STREAM_TICKET_SECONDS
+    })
+
+
+@require_GET
+def game_event_stream(request):
+    """
+    Envia vendas, alterações de saldo e mudanças de dia assim que acontecem.
+    Sem o tick no servidor (GAME_SERVER_TICK), a própria conexão avança o
+    tempo do jogo, substituindo as chamadas periódicas a update_time.
+    """
+    if not settings.GAME_STREAM_ENABLED:
+        return JsonResponse({'error': 'Stream de eventos desativado'}, status=404)
+
+    user = authenticate_stream(request)
+    if user is None:
+        return JsonResponse({'error': 'Autenticação necessária'}, status=401)
+
+    try:
+        game_session = GameSession.objects.select_related('user').get(user=user)
+    except GameSession.DoesNotExist:
+        return JsonResponse({'error': 'Sessão de jogo não encontrada'}, status=404)
+
+    # Assina antes de responder para não perder eventos do intervalo
+    subscription = broker.subscribe(user.pk)
+    response = StreamingHttpResponse(
+        _event_stream(game_session, subscription),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _event_stream(game_session, subscription):
+    ticking = not settings.GAME_SERVER_TICK
+    tick_interval = settings.GAME_STREAM_TICK_SECONDS
+    deadline = time.monotonic() + settings.GAME_STREAM_MAX_SECONDS
+
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        yield format_event(0, 'snapshot', GameSessionSerializer(game_session).data)
+
+        last_sent = next_tick = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            if ticking and now >= next_tick:
+                try:
+                    game_session.update_game_time()
+                except Exception:
+                    logger.exception('Erro no tick do stream da sessão %s', game_session.pk)
+                next_tick = now + tick_interval
+
+            wake_at = min(deadline, last_sent + KEEPALIVE_SECONDS)
+            if ticking:
+                wake_at = min(wake_at, next_tick)
+
+            message = subscription.get(timeout=max(0.0, wake_at - time.monotonic()))
+            if message is not None:
+                yield format_event(*message)
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+    finally:
+        subscription.close()
+        close_old_connections()
@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from apps.core.views import UserContextMixin
 from .models import Profile
 from .serializers import (
     UserSerializer, UserProfileSerializer, UserCreateSerializer,
@@ -134,7 +135,7 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(UserContextMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciamento de perfis."""
     
     serializer_class = ProfileSerializer
@@ -149,11 +150,16 @@ class ProfileViewSet(viewsets.ModelViewSet):
     def get_object(self):
         """Retorna o perfil do usuário logado."""
         if self.kwargs.get('pk') == 'me':
-            profile, created = Profile.objects.get_or_create(
-                user=self.request.user
-            )
-            return profile
+            return self._current_profile()
         return super().get_object()
+
+    def _current_profile(self):
+        """Perfil do usuário logado (do contexto da requisição), criado se não existir."""
+        try:
+            return self.get_profile()
+        except Profile.DoesNotExist:
+            profile, created = Profile.objects.get_or_create(user=self.request.user)
+            return profile
     
     def list(self, request, *args, **kwargs):
         """Lista perfis."""
@@ -216,7 +222,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'put', 'patch'], url_path='me')
     def current_profile(self, request):
         """Retorna ou atualiza perfil do usuário logado."""
-        profile, created = Profile.objects.get_or_create(user=request.user)
+        profile = self._current_profile()
         
         if request.method == 'GET':
             serializer = self.get_serializer(profile)
@@ -251,6 +251,13 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
+# Cabeçalhos de resposta lidos pelo frontend
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'retry-after',
+    'x-sync-cursor',
+]
+
 # CSRF
 CSRF_TRUSTED_ORIGINS = config(
     'CSRF_TRUSTED_ORIGINS',
@@ -263,13 +270,35 @@ if DEBUG:
     CSRF_COOKIE_SECURE = False
     CSRF_COOKIE_HTTPONLY = False
 
-# Cache
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-        'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+# Cache: Redis quando REDIS_URL está definido; sem ele, memória do processo
+# (testes e instalações em uma só máquina)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'back-contas-system',
+        }
+    }
+
+# Cache em dois níveis (apps.core.caching): entradas e prazo do L1 no processo,
+# prazo padrão no L2 e espera antes de tentar de novo um L2 indisponível
+CACHE_L1_SIZE = config('CACHE_L1_SIZE', default=1024, cast=int)
+CACHE_L1_SECONDS = config('CACHE_L1_SECONDS', default=30, cast=int)
+CACHE_DEFAULT_SECONDS = config('CACHE_DEFAULT_SECONDS', default=300, cast=int)
+CACHE_L2_RETRY_SECONDS = config('CACHE_L2_RETRY_SECONDS', default=30, cast=int)
+
+# Coalescência de cálculos (apps.core.singleflight): prazo da trava de quem
+# calcula e espera máxima dos demais chamadores
+SINGLE_FLIGHT_LOCK_SECONDS = config('SINGLE_FLIGHT_LOCK_SECONDS', default=30, cast=int)
+SINGLE_FLIGHT_WAIT_SECONDS = config('SINGLE_FLIGHT_WAIT_SECONDS', default=10, cast=int)
 
 # Celery Configuration
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
@@ -279,6 +308,42 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Jogo
+# Caminho do motor de demanda das vendas automáticas (vazio = NumPy quando disponível)
+GAME_DEMAND_ENGINE = config('GAME_DEMAND_ENGINE', default='')
+
+# Quando ativo, o tempo é avançado pelo comando run_game_ticker e o endpoint
+# update_time apenas lê a sessão
+GAME_SERVER_TICK = config('GAME_SERVER_TICK', default=False, cast=bool)
+
+# Janela (segundos) em que um tick concorrente reaproveita o tick recém-gravado
+GAME_TICK_COALESCE_SECONDS = config('GAME_TICK_COALESCE_SECONDS', default=1.0, cast=float)
+
+# Máximo de dias processados por tick; o restante fica para os próximos (0 = sem limite)
+GAME_TICK_MAX_DAYS = config('GAME_TICK_MAX_DAYS', default=10, cast=int)
+
+# Stream SSE: cada conexão prende um worker do servidor enquanto dura, então só
+# é servido quando ativado (servidor com workers assíncronos ou de threads).
+# Intervalo do tick feito pela conexão, duração máxima antes de o navegador
+# reconectar e validade do ticket de uso único que abre o stream
+GAME_STREAM_ENABLED = config('GAME_STREAM_ENABLED', default=False, cast=bool)
+GAME_STREAM_TICK_SECONDS = config('GAME_STREAM_TICK_SECONDS', default=1.0, cast=float)
+GAME_STREAM_MAX_SECONDS = config('GAME_STREAM_MAX_SECONDS', default=60, cast=int)
+GAME_STREAM_TICKET_SECONDS = config('GAME_STREAM_TICKET_SECONDS', default=30, cast=int)
+
+# Limites (segundos) do intervalo sugerido ao cliente até a próxima consulta
+GAME_POLL_MIN_SECONDS = config('GAME_POLL_MIN_SECONDS', default=1.0, cast=float)
+GAME_POLL_MAX_SECONDS = config('GAME_POLL_MAX_SECONDS', default=30.0, cast=float)
+
+# Popularidade relativa das categorias na escolha dos produtos vendidos (padrão 1.0)
+GAME_CATEGORY_POPULARITY = {
+    'Padaria': 2.0,
+    'Alimentos': 1.5,
+    'Bebidas': 1.5,
+    'Carnes': 1.0,
+    'Limpeza': 0.7,
+}
+
 # Documentação da API
 SPECTACULAR_SETTINGS = {
     'TITLE': 'API Django REST Framework',
@@ -301,6 +366,9 @@ DEFAULT_FROM_EMAIL = config('DJANGO_DEFAULT_FROM_EMAIL', default='noreply@localh
 # Configurações adicionais do sistema
 PASSWORD_EXPIRATION_TIME = config('PASSWORD_EXPIRATION_TIME', default=90, cast=int)
 TIME_ZONE_LOCALE = config('TIME_ZONE_LOCALE', default='pt-br')
+# Tempo máximo (segundos) que um processo reaproveita os dados de referência
+# (categorias do sistema, categorias de produtos, fornecedores) sem reler o banco
+REFERENCE_CACHE_SECONDS = config('REFERENCE_CACHE_SECONDS', default=300, cast=int)
 
 # Logging
 LOGGING = {
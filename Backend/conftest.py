@@ -73,3 +73,22 @@ def admin_client(api_client, superuser):
     refresh = RefreshToken.for_user(superuser)
     api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
     return api_client
+
+
+@pytest.fixture(autouse=True)
+def _clear_reference_registries():
+    """Esvazia os registros de dados de referência entre os testes."""
+    from apps.core.registry import clear_registries
+    clear_registries()
+    yield
+    clear_registries()
+
+
+@pytest.fixture(autouse=True)
+def _clear_tiered_cache():
+    """Esvazia o cache em dois níveis entre os testes."""
+    from django.core.cache import cache
+    from apps.core.caching import tiered_cache
+    tiered_cache.clear()
+    cache.clear()
+    yield